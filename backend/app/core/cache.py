@@ -0,0 +1,683 @@
+"""Cache applicatif partagé entre workers
+
+Trois implémentations d'une même interface (`CacheBackend`), choisies par
+`CACHE_URL`:
+
+- `memory://`: LRU en mémoire du processus (un seul worker, ou données
+  qu'on accepte de voir diverger entre workers)
+- `sqlite:///chemin/cache.db`: fichier SQLite en WAL partagé par les workers
+  d'un même hôte
+- `redis://[:motdepasse@]hôte:port/db`: serveur Redis (ou compatible RESP)
+  partagé entre hôtes
+
+Toutes gèrent les TTL, l'invalidation par étiquettes (`tags`), les compteurs
+atomiques (`incr`), les seaux à jetons (`throttle`) et un verrou par clé qui sert au single-flight de
+`get_or_set`: quand une clé manque, un seul appelant (tous workers confondus)
+recalcule la valeur pendant que les autres attendent puis relisent le cache.
+
+Les valeurs sont sérialisées avec pickle pour les backends partagés: le cache
+ne doit contenir que des données produites par l'application.
+"""
+import logging
+import os
+import pickle
+import select
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import weakref
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set, Tuple
+from urllib.parse import unquote, urlparse
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Valeur absente (None est une valeur cachable)
+MISSING = object()
+
+
+class CacheError(RuntimeError):
+    """Le backend de cache est injoignable ou a répondu une erreur"""
+
+
+class CacheBackend(ABC):
+    """Interface commune des caches
+
+    Les sous-classes implémentent `get`, `set`, `delete`, `incr`,
+    `invalidate_tags`, `clear` et le couple `_acquire` / `_release`;
+    `lock`, `get_or_set` et `update` en sont dérivés.
+
+    `blocking_io`: les appels font des E/S bloquantes (fichier, réseau) et
+    doivent passer par un thread depuis du code asynchrone.
+    """
+
+    blocking_io = True
+
+    @abstractmethod
+    def get(self, key: str, default: Any = None) -> Any:
+        """Valeur de `key`, ou `default` si absente ou expirée"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        """Poser `key` (TTL par défaut: CACHE_DEFAULT_TTL), avec ses étiquettes"""
+
+    @abstractmethod
+    def delete(self, *keys: str) -> None:
+        """Supprimer les clés (absentes: ignorées)"""
+
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """Compteur atomique; le TTL s'applique à la création du compteur
+
+        Un compteur se lit avec `incr(key, 0)`, pas avec `get`.
+        """
+
+    @abstractmethod
+    def invalidate_tags(self, *tags: str) -> None:
+        """Supprimer toutes les clés posées avec l'une de ces étiquettes"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Vider le cache (Redis: seulement les clés de CACHE_KEY_PREFIX)"""
+
+    @abstractmethod
+    def _acquire(self, key: str, timeout: float, lease: float) -> Optional[str]:
+        """Prendre le verrou de `key` pour `lease` secondes (jeton), ou None si `timeout` est écoulé"""
+
+    @abstractmethod
+    def _release(self, key: str, token: str) -> None:
+        """Rendre le verrou de `key` s'il est encore détenu avec `token`"""
+
+    def ping(self) -> None:
+        """Vérifier que le backend répond (lève CacheError sinon)"""
+        self.get("__ping__")
+
+    @contextmanager
+    def lock(self, key: str, timeout: float = 10.0, lease: Optional[float] = None) -> Iterator[bool]:
+        """Verrou par clé partagé entre workers; indique s'il a été obtenu
+
+        `timeout` borne l'attente du verrou. Le verrou expire après `lease`
+        secondes (CACHE_LOCK_LEASE_SECONDS par défaut), même si son détenteur
+        meurt: la durée doit couvrir le travail fait sous le verrou.
+        """
+        token = self._acquire(key, timeout, settings.CACHE_LOCK_LEASE_SECONDS if lease is None else lease)
+        try:
+            yield token is not None
+        finally:
+            if token is not None:
+                self._release(key, token)
+
+    def get_or_set(self, key: str, loader: Callable[[], Any], ttl: Optional[float] = None,
+                   tags: Iterable[str] = (), lock_timeout: float = 10.0) -> Any:
+        """Lire `key` ou la calculer une seule fois pour tous les appelants concurrents"""
+        try:
+            value = self.get(key, MISSING)
+            if value is not MISSING:
+                return value
+
+            with self.lock(key, lock_timeout):
+                # Un autre appelant a pu la calculer pendant l'attente du verrou
+                value = self.get(key, MISSING)
+                if value is not MISSING:
+                    return value
+                value = loader()
+                self.set(key, value, ttl, tags)
+                return value
+        except CacheError as e:
+            # Cache indisponible: servir sans cache plutôt qu'échouer
+            logger.warning("Cache indisponible (%s), calcul direct de %s", e, key)
+            return loader()
+
+    def update(self, key: str, fn: Callable[[Any], Any], ttl: Optional[float] = None,
+               tags: Iterable[str] = (), lock_timeout: float = 10.0) -> bool:
+        """Remplacer une valeur déjà en cache par `fn(valeur)` (lecture-modification-écriture)
+
+        Une clé absente n'est pas créée; sans le verrou, la clé est supprimée
+        plutôt que d'écraser une écriture concurrente. Retourne True si la clé
+        a été mise à jour.
+        """
+        with self.lock(key, lock_timeout) as acquired:
+            if not acquired:
+                self.delete(key)
+                return False
+            value = self.get(key, MISSING)
+            if value is MISSING:
+                return False
+            self.set(key, fn(value), ttl, tags)
+            return True
+
+    def throttle(self, key: str, limit: int, period: float, cost: int = 1) -> Tuple[bool, float]:
+        """Seau à jetons (GCRA): `limit` jetons par `period` secondes, rafale de `limit`
+
+        Retourne (autorisé, secondes à attendre avant de réessayer). Implémentation
+        générique sous verrou; les backends qui le peuvent la font en une opération.
+        """
+        with self.lock("throttle:" + key, timeout=1.0) as acquired:
+            if not acquired:
+                return True, 0.0
+            now = time.time()
+            tat = self.get(key)
+            allowed, new_tat, retry_after = _gcra(tat, now, limit, period, cost)
+            if allowed:
+                self.set(key, new_tat, ttl=new_tat - now)
+            return allowed, retry_after
+
+
+def _gcra(tat: Optional[float], now: float, limit: int, period: float, cost: int) -> Tuple[bool, float, float]:
+    """Calcul GCRA: `tat` est l'heure théorique d'arrivée de la prochaine requête"""
+    new_tat = max(tat or 0.0, now) + period / limit * cost
+    if new_tat - now > period:
+        return False, new_tat, new_tat - now - period
+    return True, new_tat, 0.0
+
+
+def _expires_at(ttl: Optional[float]) -> Optional[float]:
+    if ttl is None:
+        ttl = settings.CACHE_DEFAULT_TTL
+    return time.time() + ttl if ttl else None
+
+
+class LocalCache(CacheBackend):
+    """LRU en mémoire du processus, thread-safe
+
+    Les valeurs ne sont pas copiées: elles doivent être traitées comme
+    immuables par les appelants (remplacer plutôt que modifier).
+    """
+
+    blocking_io = False
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        # Index inverse clé -> étiquettes: une clé supprimée, expirée ou évincée
+        # quitte ses ensembles d'étiquettes (sinon ils ne font que grossir)
+        self._key_tags: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: "weakref.WeakValueDictionary[str, threading.Lock]" = weakref.WeakValueDictionary()
+        # Un verrou de clé doit survivre tant qu'il est tenu
+        self._held: Dict[str, threading.Lock] = {}
+
+    def _discard(self, key: str) -> None:
+        """Retirer `key` et ses étiquettes (appelant: sous `_lock`)"""
+        self._data.pop(key, None)
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _evict(self) -> None:
+        """Évincer les clés les moins récemment utilisées au-delà de `maxsize`"""
+        while len(self._data) > self.maxsize:
+            self._discard(next(iter(self._data)))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.time():
+                self._discard(key)
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        with self._lock:
+            self._data[key] = (_expires_at(ttl), value)
+            self._data.move_to_end(key)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+                self._key_tags.setdefault(key, set()).add(tag)
+            self._evict()
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._discard(key)
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or (item[0] is not None and item[0] <= time.time()):
+                item = (_expires_at(ttl), 0)
+            value = item[1] + amount
+            self._data[key] = (item[0], value)
+            self._data.move_to_end(key)
+            self._evict()
+            return value
+
+    def invalidate_tags(self, *tags: str) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in tuple(self._tags.get(tag, ())):
+                    self._discard(key)
+
+    def throttle(self, key: str, limit: int, period: float, cost: int = 1) -> Tuple[bool, float]:
+        with self._lock:
+            now = time.time()
+            item = self._data.get(key)
+            allowed, new_tat, retry_after = _gcra(item[1] if item else None, now, limit, period, cost)
+            if allowed:
+                self._data[key] = (new_tat, new_tat)
+                self._data.move_to_end(key)
+                self._evict()
+            return allowed, retry_after
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+            self._key_tags.clear()
+
+    def _acquire(self, key: str, timeout: float, lease: float) -> Optional[str]:
+        # Verrou du processus: libéré à sa mort, `lease` ne sert pas
+        with self._lock:
+            key_lock = self._key_locks.get(key)
+            if key_lock is None:
+                key_lock = self._key_locks[key] = threading.Lock()
+        if not key_lock.acquire(timeout=timeout):
+            return None
+        with self._lock:
+            self._held[key] = key_lock
+        return key
+
+    def _release(self, key: str, token: str) -> None:
+        with self._lock:
+            key_lock = self._held.pop(key)
+        key_lock.release()
+
+
+class SQLiteCache(CacheBackend):
+    """Cache dans un fichier SQLite (WAL) partagé par les workers d'un hôte"""
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS cache_entries (key TEXT PRIMARY KEY, value BLOB, expires_at REAL)",
+        "CREATE TABLE IF NOT EXISTS cache_tags (tag TEXT, key TEXT, PRIMARY KEY (tag, key)) WITHOUT ROWID",
+        "CREATE TABLE IF NOT EXISTS cache_locks (key TEXT PRIMARY KEY, token TEXT, expires_at REAL)",
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as connection:
+            for statement in self.SCHEMA:
+                connection.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Une connexion par thread (mode autocommit)"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        try:
+            return self._connection().execute(sql, params)
+        except sqlite3.Error as e:
+            raise CacheError(str(e)) from e
+
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self._execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time()),
+        ).fetchone()
+        if row is None:
+            return default
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, data, _expires_at(ttl)),
+        )
+        for tag in tags:
+            self._execute("INSERT OR IGNORE INTO cache_tags (tag, key) VALUES (?, ?)", (tag, key))
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        now = time.time()
+        row = self._execute(
+            "INSERT INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            "value = CASE WHEN expires_at IS NOT NULL AND expires_at <= ? THEN excluded.value "
+            "ELSE value + excluded.value END, "
+            "expires_at = CASE WHEN expires_at IS NOT NULL AND expires_at <= ? THEN excluded.expires_at "
+            "ELSE expires_at END "
+            "RETURNING value",
+            (key, amount, _expires_at(ttl), now, now),
+        ).fetchone()
+        return int(row[0])
+
+    def invalidate_tags(self, *tags: str) -> None:
+        for tag in tags:
+            self._execute(
+                "DELETE FROM cache_entries WHERE key IN (SELECT key FROM cache_tags WHERE tag = ?)", (tag,)
+            )
+            self._execute("DELETE FROM cache_tags WHERE tag = ?", (tag,))
+
+    def clear(self) -> None:
+        for table in ("cache_entries", "cache_tags", "cache_locks"):
+            self._execute(f"DELETE FROM {table}")
+
+    def throttle(self, key: str, limit: int, period: float, cost: int = 1) -> Tuple[bool, float]:
+        # Une seule instruction: lecture, test et écriture atomiques entre workers
+        params = {"key": key, "now": time.time(), "increment": period / limit * cost, "period": period}
+        row = self._execute(
+            "INSERT INTO cache_entries (key, value, expires_at) "
+            "VALUES (:key, :now + :increment, :now + :increment) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            "value = MAX(COALESCE(value, 0), :now) + :increment, "
+            "expires_at = MAX(COALESCE(value, 0), :now) + :increment "
+            "WHERE MAX(COALESCE(value, 0), :now) + :increment - :now <= :period "
+            "RETURNING value",
+            params,
+        ).fetchone()
+        if row is not None:
+            return True, 0.0
+        tat = self._execute("SELECT value FROM cache_entries WHERE key = ?", (key,)).fetchone()
+        retry_after = (tat[0] if tat else params["now"]) + params["increment"] - params["now"] - period
+        return False, max(retry_after, 0.0)
+
+    def purge_expired(self) -> None:
+        """Supprimer les entrées expirées (elles sont sinon ignorées à la lecture)"""
+        now = time.time()
+        self._execute("DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        self._execute("DELETE FROM cache_locks WHERE expires_at <= ?", (now,))
+
+    def _acquire(self, key: str, timeout: float, lease: float) -> Optional[str]:
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + timeout
+        delay = 0.005
+        while True:
+            now = time.time()
+            # Reprendre un verrou expiré, sinon ne rien faire si la clé est déjà prise
+            acquired = self._execute(
+                "INSERT INTO cache_locks (key, token, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET token = excluded.token, expires_at = excluded.expires_at "
+                "WHERE cache_locks.expires_at <= ? RETURNING token",
+                (key, token, now + lease, now),
+            ).fetchone()
+            if acquired is not None:
+                return token
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+    def _release(self, key: str, token: str) -> None:
+        self._execute("DELETE FROM cache_locks WHERE key = ? AND token = ?", (key, token))
+
+
+# Libérer un verrou seulement s'il porte encore notre jeton (comparaison et
+# suppression atomiques: le verrou a pu expirer et être repris entre-temps)
+REDIS_RELEASE_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+)
+
+
+# Seau à jetons GCRA en une opération atomique (même calcul que `_gcra`);
+# l'heure vient du client, comme pour les autres backends
+REDIS_THROTTLE_SCRIPT = """
+local now, increment, period = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local new_tat = math.max(tonumber(redis.call('get', KEYS[1])) or 0, now) + increment
+if new_tat - now > period then
+    return {0, string.format('%.6f', new_tat - now - period)}
+end
+redis.call('set', KEYS[1], string.format('%.6f', new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, '0'}
+"""
+
+
+class RedisConnection:
+    """Connexion RESP2 minimale (socket bloquante, pipelining)
+
+    Toute erreur d'E/S ou de protocole ferme la connexion (`closed`): des
+    réponses restées sur la socket seraient lues comme celles des commandes
+    suivantes.
+    """
+
+    def __init__(self, host: str, port: int, db: int = 0, password: Optional[str] = None,
+                 timeout: float = 5.0):
+        self.closed = False
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile("rb")
+        if password:
+            self.execute("AUTH", password)
+        if db:
+            self.execute("SELECT", db)
+
+    @staticmethod
+    def _encode(args: tuple) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    def _read(self) -> Any:
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Connexion Redis fermée")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            # Renvoyée, pas levée: les réponses suivantes doivent encore être lues
+            return CacheError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self._read() for _ in range(length)]
+        raise CacheError(f"Réponse Redis invalide: {line!r}")
+
+    def pipeline(self, *commands: tuple) -> list:
+        """Envoyer plusieurs commandes en un aller-retour
+
+        Toutes les réponses sont lues avant de lever la première erreur renvoyée
+        par Redis; la connexion reste alors utilisable.
+        """
+        try:
+            self._sock.sendall(b"".join(self._encode(command) for command in commands))
+            replies = [self._read() for _ in commands]
+        except BaseException:
+            self.close()
+            raise
+        for reply in replies:
+            if isinstance(reply, CacheError):
+                raise reply
+        return replies
+
+    def execute(self, *args) -> Any:
+        return self.pipeline(args)[0]
+
+    def is_stale(self) -> bool:
+        """Connexion inactive devenue lisible: fermée par le serveur (redémarrage, timeout)"""
+        try:
+            return bool(select.select([self._sock], [], [], 0)[0])
+        except (OSError, ValueError):
+            return True
+
+    def close(self) -> None:
+        self.closed = True
+        try:
+            self._file.close()
+            self._sock.close()
+        except OSError:
+            pass
+
+
+class RedisCache(CacheBackend):
+    """Cache Redis (protocole RESP), une connexion par thread"""
+
+    def __init__(self, url: str, prefix: str = ""):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.prefix = prefix
+        self._local = threading.local()
+
+    def _connection(self) -> RedisConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and (connection.closed or connection.is_stale()):
+            connection.close()
+            connection = None
+        if connection is None:
+            connection = RedisConnection(self.host, self.port, self.db, self.password)
+            self._local.connection = connection
+        return connection
+
+    def _pipeline(self, *commands: tuple, retry: bool = True) -> list:
+        """Exécuter des commandes, avec une reconnexion si la connexion est coupée
+
+        `retry=False` pour les commandes non idempotentes (INCRBY, SET NX,
+        scripts): une fois envoyées, elles ont pu s'appliquer avant la coupure
+        et ne sont pas rejouées.
+        """
+        for attempt in (1, 2):
+            connection = None
+            try:
+                connection = self._connection()
+                return connection.pipeline(*commands)
+            except OSError as e:
+                self._local.connection = None
+                if attempt == 2 or (connection is not None and not retry):
+                    raise CacheError(f"Redis injoignable: {e}") from e
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    def get(self, key: str, default: Any = None) -> Any:
+        data = self._pipeline(("GET", self._key(key)))[0]
+        if data is None:
+            return default
+        return pickle.loads(data)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        if ttl is None:
+            ttl = settings.CACHE_DEFAULT_TTL
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        command = ("SET", self._key(key), data) + (("PX", int(ttl * 1000)) if ttl else ())
+        commands = [command]
+        for tag in tags:
+            tag_key = self._key("tag:" + tag)
+            commands.append(("SADD", tag_key, key))
+            if ttl:
+                # L'ensemble d'étiquette vit au moins aussi longtemps que ses clés
+                commands.append(("PEXPIRE", tag_key, int(ttl * 1000)))
+        self._pipeline(*commands)
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self._pipeline(("DEL",) + tuple(self._key(key) for key in keys))
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        if ttl is None:
+            ttl = settings.CACHE_DEFAULT_TTL
+        commands = []
+        if ttl:
+            # Créer le compteur avec son TTL s'il n'existe pas, puis l'incrémenter
+            commands.append(("SET", self._key(key), 0, "PX", int(ttl * 1000), "NX"))
+        commands.append(("INCRBY", self._key(key), amount))
+        return self._pipeline(*commands, retry=False)[-1]
+
+    def invalidate_tags(self, *tags: str) -> None:
+        for tag in tags:
+            tag_key = self._key("tag:" + tag)
+            members = self._pipeline(("SMEMBERS", tag_key))[0] or []
+            keys = tuple(self._key(member.decode()) for member in members)
+            self._pipeline(("DEL", tag_key) + keys)
+
+    def clear(self) -> None:
+        # SCAN par pages plutôt que KEYS, qui bloque le serveur le temps de tout parcourir
+        cursor = b"0"
+        while True:
+            cursor, keys = self._pipeline(("SCAN", cursor, "MATCH", self._key("*"), "COUNT", 1000))[0]
+            if keys:
+                self._pipeline(("DEL",) + tuple(keys))
+            if cursor == b"0":
+                return
+
+    def ping(self) -> None:
+        self._pipeline(("PING",))
+
+    def throttle(self, key: str, limit: int, period: float, cost: int = 1) -> Tuple[bool, float]:
+        # Un aller-retour au lieu de verrou + GET + SET + libération
+        allowed, retry_after = self._pipeline(
+            ("EVAL", REDIS_THROTTLE_SCRIPT, 1, self._key("throttle:" + key),
+             repr(time.time()), repr(period / limit * cost), repr(period)),
+            retry=False,
+        )[0]
+        return allowed == 1, float(retry_after)
+
+    def _acquire(self, key: str, timeout: float, lease: float) -> Optional[str]:
+        token = uuid.uuid4().hex
+        lock_key = self._key("lock:" + key)
+        deadline = time.monotonic() + timeout
+        delay = 0.005
+        while True:
+            if self._pipeline(("SET", lock_key, token, "PX", int(lease * 1000), "NX"), retry=False)[0] == "OK":
+                return token
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+    def _release(self, key: str, token: str) -> None:
+        self._pipeline(("EVAL", REDIS_RELEASE_SCRIPT, 1, self._key("lock:" + key), token))
+
+
+def create_cache(url: str) -> CacheBackend:
+    """Instancier le backend correspondant à une URL de cache"""
+    scheme = url.split(":", 1)[0]
+    if scheme == "memory":
+        return LocalCache(maxsize=settings.CACHE_MAX_ENTRIES)
+    if scheme == "sqlite":
+        path = url[len("sqlite:///"):]
+        if not path:
+            raise ValueError("CACHE_URL sqlite: chemin du fichier manquant (sqlite:///chemin/cache.db)")
+        return SQLiteCache(path)
+    if scheme in ("redis", "rediss"):
+        if scheme == "rediss":
+            raise ValueError("CACHE_URL: TLS (rediss://) non supporté, passer par un tunnel local")
+        return RedisCache(url, prefix=settings.CACHE_KEY_PREFIX)
+    raise ValueError(f"CACHE_URL non supportée: {url}")
+
+
+@lru_cache(maxsize=None)
+def get_cache() -> CacheBackend:
+    """Cache de l'application (créé au premier usage selon CACHE_URL)"""
+    return create_cache(settings.CACHE_URL)
@@ -0,0 +1,150 @@
+"""Compression des réponses (Brotli si disponible, sinon GZip)
+
+Middleware ASGI: la réponse est compressée quand le client l'accepte
+(`Accept-Encoding`), que son corps dépasse `COMPRESSION_MINIMUM_SIZE` octets
+et que son type de contenu s'y prête (JSON, texte). Brotli est utilisé si le
+paquet `brotli` est installé (chargé à la demande), GZip sinon.
+
+Une réponse envoyée en un seul message est compressée d'un bloc (avec
+`Content-Length`). Une réponse envoyée en plusieurs morceaux (StreamingResponse,
+export) n'est pas mise en mémoire: chaque morceau est compressé et transmis
+dès réception, sans `Content-Length`.
+"""
+import gzip
+import zlib
+from functools import lru_cache
+
+from app.core.config import settings
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+@lru_cache(maxsize=None)
+def get_brotli():
+    """Module brotli s'il est installé (dépendance optionnelle)"""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def choose_encoding(accept_encoding: str):
+    """Encodage à utiliser selon l'en-tête Accept-Encoding (None: pas de compression)"""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        params = params.replace(" ", "").lower()
+        try:
+            quality = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            quality = 1.0
+        # "gzip;q=0" signifie explicitement refusé
+        if quality == 0:
+            continue
+        accepted.add(name.strip().lower())
+
+    if "br" in accepted and get_brotli() is not None:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return get_brotli().compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL)
+
+
+class StreamCompressor:
+    """Compression incrémentale: chaque morceau est vidé (flush) pour partir aussitôt"""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            compressor = get_brotli().Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+            self._process, self._flush, self._finish = compressor.process, compressor.flush, compressor.finish
+        else:
+            # wbits 16 + MAX_WBITS: en-tête et somme de contrôle gzip
+            compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._process = compressor.compress
+            self._flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = compressor.flush
+
+    def compress(self, chunk: bytes, final: bool = False) -> bytes:
+        return self._process(chunk) + (self._finish() if final else self._flush())
+
+
+class CompressionMiddleware:
+    """Compresser les réponses HTTP suffisamment volumineuses"""
+
+    def __init__(self, app, minimum_size: int = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+        stream = None
+
+        def rewrite_headers(encoded: bool) -> list:
+            """En-têtes de la réponse: Vary complété, Content-Encoding si compressée"""
+            response_headers = [
+                (name, value) for name, value in start_message.get("headers", [])
+                if name not in (b"content-length", b"vary")
+            ]
+            vary = dict(start_message.get("headers", [])).get(b"vary")
+            response_headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+            if encoded:
+                response_headers.append((b"content-encoding", encoding.encode("latin-1")))
+            return response_headers
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough, stream
+
+            if message["type"] == "http.response.start":
+                response_headers = dict(message.get("headers", []))
+                content_type = response_headers.get(b"content-type", b"").decode("latin-1")
+                # Déjà encodée ou type non compressible: transmettre telle quelle
+                if b"content-encoding" in response_headers or not content_type.startswith(COMPRESSIBLE_TYPES):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            # Corps en plusieurs morceaux: compression au fil de l'eau, sans mise en mémoire
+            if stream is None and more_body:
+                stream = StreamCompressor(encoding)
+                await send({**start_message, "headers": rewrite_headers(encoded=True)})
+            if stream is not None:
+                await send({"type": "http.response.body", "body": stream.compress(body, final=not more_body),
+                            "more_body": more_body})
+                return
+
+            encoded = len(body) >= self.minimum_size
+            response_headers = rewrite_headers(encoded)
+            if encoded:
+                body = compress(body, encoding)
+            response_headers.append((b"content-length", str(len(body)).encode("latin-1")))
+            await send({**start_message, "headers": response_headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -17,8 +17,12 @@ class Settings(BaseSettings):
     
     # JWT
     SECRET_KEY: str = "changez_ceci_en_production"
-    ALGORITHM: str = "HS256"
+    ALGORITHM: str = "HS256"  # HS256/HS384/HS512 ou EdDSA
+    JWT_BACKEND: str = "hmac"  # hmac (bibliothèque standard), jose ou pyjwt (algorithmes HS*)
+    JWT_PRIVATE_KEY_FILE: str = ""  # clé privée Ed25519 PEM (ALGORITHM=EdDSA)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: float = 30.0  # jeton tout juste remplacé: pas de révocation
     
     # Google Calendar OAuth
     GOOGLE_CLIENT_ID: str = ""
@@ -26,6 +30,67 @@ class Settings(BaseSettings):
     GOOGLE_REDIRECT_URI: str = "http://localhost:8000/api/auth/google/callback"
     GOOGLE_APPLICATION_CREDENTIALS: str = "./credentials.json"
     
+    # Observabilité
+    METRICS_ENABLED: bool = True
+    # /metrics: jeton Bearer exigé; vide = réservé aux clients locaux (127.0.0.1, ::1)
+    METRICS_TOKEN: str = ""
+    
+    # Compression des réponses
+    COMPRESSION_MINIMUM_SIZE: int = 1000
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    
+    # Cache partagé: memory://, sqlite:///chemin/cache.db ou redis://hôte:6379/0
+    CACHE_URL: str = "memory://"
+    CACHE_DEFAULT_TTL: float = 3600.0  # secondes, 0 = sans expiration
+    CACHE_MAX_ENTRIES: int = 10000  # memory:// uniquement
+    CACHE_KEY_PREFIX: str = "gestion_absence:"
+    CACHE_LOCK_LEASE_SECONDS: float = 30.0  # verrous sqlite:// et redis://: expiration si le détenteur meurt
+    
+    # Verrouillage après échecs de connexion (compteurs dans le cache partagé)
+    LOGIN_MAX_FAILURES: int = 5  # par identifiant
+    LOGIN_MAX_FAILURES_PER_IP: int = 20
+    LOGIN_FAILURE_WINDOW_SECONDS: float = 900.0
+    LOGIN_LOCKOUT_SECONDS: float = 30.0  # doublé à chaque échec supplémentaire
+    LOGIN_LOCKOUT_MAX_SECONDS: float = 900.0
+    
+    # Limitation de débit (groupes auth, write, read) et contrôle d'admission
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMITS: str = "auth=10/minute;write=120/minute;read=600/minute"
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # X-Forwarded-For derrière un proxy de confiance
+    MAX_CONCURRENT_REQUESTS: int = 0  # par worker; 0 = capacité du pool SQL
+    ADMISSION_WAIT_MS: float = 100.0
+
+    # Idempotency-Key: durée de conservation des réponses et délai max d'une exécution
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_PROCESSING_SECONDS: int = 60
+
+    # /api/dashboard: sections exécutées en parallèle (PostgreSQL), une connexion chacune
+    DASHBOARD_PARALLEL_QUERIES: int = 4
+    
+    # Journal leave_events: async = lots écrits par un thread hors requête (les
+    # événements en file sont perdus si le processus est tué), transactional =
+    # dans la transaction de l'écriture sur la demande
+    LEAVE_EVENTS_DURABILITY: str = "async"
+    LEAVE_EVENTS_BATCH_SIZE: int = 500
+    LEAVE_EVENTS_FLUSH_SECONDS: float = 0.2  # attente max pour compléter un lot
+    LEAVE_EVENTS_QUEUE_SIZE: int = 10000  # file pleine: écriture immédiate, sans perte
+    LEAVE_EVENTS_SHUTDOWN_SECONDS: float = 10.0  # vidage de la file à l'arrêt
+    LEAVE_EVENTS_MAX_ATTEMPTS: int = 5  # essais d'un lot avant écriture événement par événement
+    
+    # Sondes de santé (/health/ready)
+    HEALTH_CACHE_SECONDS: float = 2.0
+    HEALTH_DB_LATENCY_MS: float = 250.0
+    HEALTH_POOL_SATURATION: float = 0.9
+    
+    # Audit SQL (développement / staging)
+    QUERY_AUDIT_ENABLED: bool = False
+    QUERY_AUDIT_STRICT: bool = False
+    QUERY_AUDIT_SLOW_MS: float = 100.0
+    QUERY_AUDIT_EXPLAIN: bool = True
+    QUERY_AUDIT_REPEAT_THRESHOLD: int = 5
+    QUERY_AUDIT_DEFAULT_BUDGET: int = 0  # 0 = pas de budget pour les endpoints non listés
+    
     # App
     DEBUG: bool = True
     APP_NAME: str = "Gestion des Congés"
@@ -1,26 +1,54 @@
 """Configuration et session de base de données"""
+from functools import lru_cache
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
 
-# Créer le moteur de base de données
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True
-)
-
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
+# Session factory (liée au moteur à sa première création: passer par get_session)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, future=True)
 
 # Base pour les modèles
 Base = declarative_base()
 
 
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    """Créer le moteur de base de données au premier usage
+
+    Le driver (psycopg2, ...) n'est importé qu'ici: importer l'application
+    ne coûte donc ni le chargement du driver ni la création du pool.
+    """
+    engine = create_engine(
+        settings.DATABASE_URL,
+        echo=settings.DEBUG,
+        future=True
+    )
+    SessionLocal.configure(bind=engine)
+    return engine
+
+
+def __getattr__(name: str):
+    """Compatibilité: `from app.core.database import engine` crée le moteur à la demande"""
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_session() -> Session:
+    """Nouvelle session, le moteur créé au besoin
+
+    `SessionLocal()` seul n'est lié à aucun moteur tant que `get_engine()`
+    n'a pas été appelé: scripts, threads et workers passent par ici.
+    """
+    get_engine()
+    return SessionLocal()
+
+
 def get_db():
     """Dépendance FastAPI pour récupérer une session DB"""
-    db = SessionLocal()
+    db = get_session()
     try:
         yield db
     finally:
@@ -0,0 +1,146 @@
+"""Vérifications de santé (liveness / readiness)
+
+La readiness contrôle la base (latence d'un aller-retour `SELECT 1`), la
+saturation du pool de connexions, le cache partagé (`CACHE_URL`) et le retard
+des workers d'arrière-plan (qui signalent leur activité via `heartbeat()`). Le résultat est mis en cache
+`HEALTH_CACHE_SECONDS` pour que les sondes du load balancer ne martèlent pas
+la base; une seule vérification s'exécute à la fois par processus.
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import get_engine
+
+# Workers d'arrière-plan: nom -> (dernier battement, retard maximal toléré en secondes)
+_workers: Dict[str, Tuple[float, float]] = {}
+_workers_lock = threading.Lock()
+
+
+def register_worker(name: str, max_lag_seconds: float) -> None:
+    """Déclarer un worker d'arrière-plan surveillé par la readiness"""
+    with _workers_lock:
+        _workers[name] = (time.monotonic(), max_lag_seconds)
+
+
+def unregister_worker(name: str) -> None:
+    """Retirer un worker arrêté normalement"""
+    with _workers_lock:
+        _workers.pop(name, None)
+
+
+def heartbeat(name: str) -> None:
+    """Signaler qu'un worker est actif"""
+    with _workers_lock:
+        if name in _workers:
+            _workers[name] = (time.monotonic(), _workers[name][1])
+
+
+def check_database() -> dict:
+    """Latence d'un aller-retour vers la base"""
+    start = time.perf_counter()
+    try:
+        with get_engine().connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception as e:
+        return {"status": "fail", "error": str(e)}
+
+    latency_ms = (time.perf_counter() - start) * 1000
+    ok = latency_ms <= settings.HEALTH_DB_LATENCY_MS
+    return {"status": "ok" if ok else "fail", "latency_ms": round(latency_ms, 2)}
+
+
+def check_pool() -> dict:
+    """Saturation du pool de connexions (connexions empruntées / capacité)"""
+    pool = get_engine().pool
+    if not hasattr(pool, "checkedout") or not hasattr(pool, "size"):
+        return {"status": "ok"}
+
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    checked_out = pool.checkedout()
+    if max_overflow < 0:
+        return {"status": "ok", "checked_out": checked_out}
+
+    capacity = pool.size() + max_overflow
+    saturation = checked_out / capacity if capacity else 0.0
+    ok = saturation < settings.HEALTH_POOL_SATURATION
+    return {
+        "status": "ok" if ok else "fail",
+        "checked_out": checked_out,
+        "capacity": capacity,
+        "saturation": round(saturation, 3),
+    }
+
+
+def check_cache() -> dict:
+    """Le cache partagé répond (rien à vérifier pour le cache en mémoire)"""
+    if settings.CACHE_URL.startswith("memory"):
+        return {"status": "ok"}
+
+    from app.core.cache import CacheError, get_cache
+
+    start = time.perf_counter()
+    try:
+        get_cache().ping()
+    except (CacheError, OSError) as e:
+        return {"status": "fail", "error": str(e)}
+    return {"status": "ok", "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+
+def check_workers() -> dict:
+    """Retard des workers d'arrière-plan par rapport à leur dernier battement"""
+    now = time.monotonic()
+    with _workers_lock:
+        workers = dict(_workers)
+
+    result = {}
+    for name, (last_beat, max_lag) in workers.items():
+        lag = now - last_beat
+        result[name] = {"status": "ok" if lag <= max_lag else "fail", "lag_seconds": round(lag, 3)}
+    return result
+
+
+class ReadinessProbe:
+    """Readiness avec résultat en cache et une seule vérification à la fois"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._result: Optional[dict] = None
+        self._checked_at = 0.0
+
+    def check(self) -> dict:
+        now = time.monotonic()
+        if self._result is not None and now - self._checked_at < settings.HEALTH_CACHE_SECONDS:
+            return self._result
+
+        # Une vérification est déjà en cours: servir le dernier résultat connu
+        if not self._lock.acquire(blocking=self._result is None):
+            return self._result
+
+        try:
+            checks = {"pool": check_pool()}
+            # Pool saturé: ne pas attendre une connexion juste pour la sonde
+            if checks["pool"]["status"] == "ok":
+                checks["database"] = check_database()
+            else:
+                checks["database"] = {"status": "skipped"}
+            checks["cache"] = check_cache()
+            checks["workers"] = check_workers()
+
+            failed = (
+                checks["pool"]["status"] == "fail"
+                or checks["database"]["status"] != "ok"
+                or checks["cache"]["status"] == "fail"
+                or any(w["status"] == "fail" for w in checks["workers"].values())
+            )
+            self._result = {"status": "fail" if failed else "ok", "checks": checks}
+            self._checked_at = time.monotonic()
+            return self._result
+        finally:
+            self._lock.release()
+
+
+readiness_probe = ReadinessProbe()
@@ -0,0 +1,182 @@
+"""Clés d'idempotence (en-tête `Idempotency-Key`) des POST d'écriture
+
+Un client qui renvoie une requête après un timeout (application mobile,
+intégration Apps Script) réutilise la même `Idempotency-Key`: la première
+exécution est enregistrée dans le cache partagé (`IDEMPOTENCY_TTL_SECONDS`) et
+les suivantes reçoivent la même réponse, marquée `Idempotent-Replayed: true`,
+sans réexécuter l'écriture.
+
+- La clé est propre au client (utilisateur du token, sinon adresse IP).
+- Réutilisée pour une autre requête (méthode, chemin ou corps différents): 422.
+- Requête d'origine encore en cours: 409 + Retry-After.
+- Les réponses 5xx ne sont pas enregistrées: le client peut réessayer.
+- Sans en-tête, ou cache indisponible, la requête passe normalement.
+
+Avec un cache fichier ou Redis, les accès au cache passent par un thread pour
+ne pas bloquer la boucle d'événements.
+"""
+import hashlib
+import json
+import logging
+import re
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY, Counter
+from app.core.cache import CacheError, get_cache
+from app.core.ratelimit import client_identity, send_error
+
+logger = logging.getLogger(__name__)
+
+# POST rejouables: création, validation et refus de congé, import CSV
+IDEMPOTENT_ROUTES = re.compile(r"^/api/(leaves/?|leaves/\d+/(approve|reject)|users/import/csv)$")
+
+MAX_KEY_LENGTH = 255
+
+# Une autre exécution de la même clé est en cours
+IN_PROGRESS = object()
+
+IDEMPOTENT_REPLAYS = REGISTRY.register(Counter(
+    "http_idempotent_replays_total", "Réponses rejouées pour une Idempotency-Key déjà vue",
+))
+
+
+async def _send_json(send, status: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1"))],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _cache_call(cache, fn, *args):
+    if cache.blocking_io:
+        return await run_in_threadpool(fn, *args)
+    return fn(*args)
+
+
+def _claim(cache, response_key: str, claim_key: str):
+    """Réponse déjà enregistrée, IN_PROGRESS, ou None si l'exécution nous revient"""
+    stored = cache.get(response_key)
+    if stored is not None:
+        return stored
+    # Une seule exécution par clé, tous workers confondus
+    if cache.incr(claim_key, 1, ttl=settings.IDEMPOTENCY_PROCESSING_SECONDS) > 1:
+        stored = cache.get(response_key)
+        return IN_PROGRESS if stored is None else stored
+    # La réponse a pu être enregistrée juste avant la prise de la clé
+    stored = cache.get(response_key)
+    if stored is not None:
+        cache.delete(claim_key)
+    return stored
+
+
+def _store(cache, response_key: str, claim_key: str, response, ttl: float) -> None:
+    """Enregistrer la réponse (None: rien à rejouer) puis rendre la clé"""
+    try:
+        if response is not None:
+            cache.set(response_key, response, ttl=ttl)
+    except CacheError as e:
+        logger.warning("Réponse idempotente non enregistrée: %s", e)
+    finally:
+        try:
+            cache.delete(claim_key)
+        except CacheError:
+            pass
+
+
+def _header(scope, name: bytes) -> str:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1").strip()
+    return ""
+
+
+class IdempotencyMiddleware:
+    """Enregistrer la réponse d'un POST par Idempotency-Key et la rejouer aux répétitions"""
+
+    def __init__(self, app, ttl: Optional[float] = None):
+        self.app = app
+        self.ttl = settings.IDEMPOTENCY_TTL_SECONDS if ttl is None else ttl
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not IDEMPOTENT_ROUTES.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        key = _header(scope, b"idempotency-key")
+        if not key:
+            await self.app(scope, receive, send)
+            return
+        if len(key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, f"Idempotency-Key trop longue (max {MAX_KEY_LENGTH})")
+            return
+
+        # Corps lu en entier: il entre dans l'empreinte (avec la query string,
+        # ex. `reject?reason=`), puis est rendu à l'application
+        messages, body = [], b""
+        while True:
+            message = await receive()
+            messages.append(message)
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        fingerprint = hashlib.sha256(
+            scope["method"].encode() + b" " + scope["path"].encode()
+            + b"?" + scope.get("query_string", b"") + b"\n" + body
+        ).hexdigest()
+
+        async def replay_receive():
+            return messages.pop(0) if messages else await receive()
+
+        cache = get_cache()
+        digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+        response_key = f"idempotency:{client_identity(scope, 'write')}:{digest}"
+        claim_key = response_key + ":claim"
+
+        try:
+            stored = await _cache_call(cache, _claim, cache, response_key, claim_key)
+        except CacheError as e:
+            logger.warning("Idempotence désactivée, cache indisponible: %s", e)
+            await self.app(scope, replay_receive, send)
+            return
+
+        if stored is IN_PROGRESS:
+            await send_error(send, 409, "Requête avec cette Idempotency-Key en cours de traitement", 1)
+            return
+        if stored is not None:
+            await self._replay(stored, fingerprint, send)
+            return
+
+        start, chunks = {}, []
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        response = None
+        try:
+            await self.app(scope, replay_receive, capture_send)
+            if start and start["status"] < 500:
+                response = (fingerprint, start["status"], list(start.get("headers", [])), b"".join(chunks))
+        finally:
+            await _cache_call(cache, _store, cache, response_key, claim_key, response, self.ttl)
+
+    async def _replay(self, stored, fingerprint: str, send) -> None:
+        stored_fingerprint, status, headers, body = stored
+        if stored_fingerprint != fingerprint:
+            await _send_json(send, 422, "Idempotency-Key déjà utilisée pour une autre requête")
+            return
+
+        IDEMPOTENT_REPLAYS.inc()
+        headers = headers + [(b"idempotent-replayed", b"true")]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,203 @@
+"""Audit des requêtes SQL (développement / staging)
+
+Activé par `QUERY_AUDIT_ENABLED=true`. Pour chaque requête HTTP:
+  - compte les requêtes SQL et les regroupe par forme (paramètres et listes
+    IN normalisés);
+  - signale les formes répétées au-delà de `QUERY_AUDIT_REPEAT_THRESHOLD`
+    (symptôme N+1: chargement paresseux de `leave.user` dans une boucle, ...);
+  - journalise les requêtes plus lentes que `QUERY_AUDIT_SLOW_MS` avec leur
+    plan d'exécution (EXPLAIN);
+  - vérifie le budget de requêtes de l'endpoint (`QUERY_BUDGETS`).
+
+Avec `QUERY_AUDIT_STRICT=true`, un N+1 ou un dépassement de budget lève
+`QueryBudgetExceeded`: la requête échoue, ce qui fait échouer les tests.
+Hors requête HTTP, `audit_queries()` donne le même contrôle à un bloc de code.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.query_audit")
+
+# Budget de requêtes SQL par endpoint ("MÉTHODE gabarit"), authentification comprise
+QUERY_BUDGETS: Dict[str, int] = {
+    "POST /api/auth/login": 2,  # utilisateur, jeton de rafraîchissement
+    "POST /api/auth/refresh": 4,  # jeton, révocation, utilisateur, nouveau jeton
+    "GET /api/leaves/": 2,
+    "GET /api/leaves": 2,
+    "GET /api/leaves/my-requests": 2,
+    "GET /api/leaves/pending-approvals": 2,
+    "GET /api/leaves/statistics": 4,
+    "GET /api/leaves/team/calendar": 2,
+    "GET /api/leaves/{leave_id}": 2,
+    "GET /api/users/": 2,
+    # utilisateur + statistiques (3) + liste + noms (cache froid); sections
+    # parallèles comprises
+    "GET /api/dashboard": 6,
+}
+
+_PLACEHOLDER_LIST_RE = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*\)")
+_NUMBER_RE = re.compile(r"\b\d+\b")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Trop de requêtes SQL (budget dépassé ou N+1 détecté)"""
+
+
+def statement_shape(statement: str) -> str:
+    """Normaliser une requête pour regrouper les exécutions identiques"""
+    shape = _WHITESPACE_RE.sub(" ", statement).strip()
+    shape = _PLACEHOLDER_LIST_RE.sub("(?)", shape)
+    return _NUMBER_RE.sub("N", shape)
+
+
+class QueryAudit:
+    """Requêtes SQL exécutées dans un contexte (requête HTTP ou bloc de code)"""
+
+    def __init__(self, label: str = "", budget: Optional[int] = None, scope: Optional[dict] = None):
+        self.label = label
+        self.budget = budget
+        self.scope = scope
+        self.statements: List[str] = []
+        self.shapes: Counter = Counter()
+        self.flagged: set = set()
+        # Sections du tableau de bord: plusieurs threads enregistrent dans le même audit
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def endpoint(self) -> str:
+        """Libellé "MÉTHODE gabarit" (gabarit connu une fois la route résolue)"""
+        if self.scope is None:
+            return self.label
+        route = self.scope.get("route")
+        return f"{self.scope['method']} {getattr(route, 'path', self.scope.get('path', ''))}"
+
+    def get_budget(self) -> Optional[int]:
+        if self.budget is not None:
+            return self.budget
+        if self.scope is not None:
+            return QUERY_BUDGETS.get(self.endpoint(), settings.QUERY_AUDIT_DEFAULT_BUDGET or None)
+        return None
+
+    def record(self, statement: str) -> None:
+        shape = statement_shape(statement)
+        with self._lock:
+            self.statements.append(statement)
+            self.shapes[shape] += 1
+            repeats = self.shapes[shape]
+            count = self.count
+            newly_flagged = repeats >= settings.QUERY_AUDIT_REPEAT_THRESHOLD and shape not in self.flagged
+            if newly_flagged:
+                self.flagged.add(shape)
+
+        if newly_flagged:
+            message = f"N+1 probable sur {self.endpoint()}: {repeats} exécutions de «{shape[:200]}»"
+            logger.warning(message)
+            if settings.QUERY_AUDIT_STRICT:
+                raise QueryBudgetExceeded(message)
+
+        budget = self.get_budget()
+        if budget is not None and count > budget:
+            message = f"Budget SQL dépassé sur {self.endpoint()}: {count} requêtes (budget {budget})"
+            if count == budget + 1:
+                logger.warning(message)
+            if settings.QUERY_AUDIT_STRICT:
+                raise QueryBudgetExceeded(message)
+
+
+current_audit: ContextVar[Optional[QueryAudit]] = ContextVar("current_query_audit", default=None)
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    """Plan d'exécution d'une requête lente, sur un curseur séparé"""
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+# Début porté par le contexte d'exécution (comme app.core.metrics): une requête
+# en erreur ne laisse rien sur la connexion du pool
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._audit_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_audit_query_start", None)
+    elapsed_ms = (time.perf_counter() - start) * 1000 if start is not None else 0.0
+
+    if elapsed_ms >= settings.QUERY_AUDIT_SLOW_MS:
+        plan = ""
+        if settings.QUERY_AUDIT_EXPLAIN and not executemany and statement.lstrip().upper().startswith("SELECT"):
+            try:
+                plan = "\n" + _explain(conn, statement, parameters)
+            except Exception as e:
+                plan = f"\n(EXPLAIN impossible: {e})"
+        logger.warning("Requête lente (%.1f ms): %s%s", elapsed_ms, statement, plan)
+
+    audit = current_audit.get()
+    if audit is not None:
+        audit.record(statement)
+
+
+def install_query_audit() -> None:
+    """Brancher les listeners d'audit sur tous les moteurs SQLAlchemy"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def audit_queries(budget: Optional[int] = None, label: str = "bloc audité"):
+    """Auditer les requêtes SQL d'un bloc (tests, scripts)
+
+        with audit_queries(budget=2) as audit:
+            LeaveService.list_team_leaves(db, start, end)
+        assert audit.count == 1
+    """
+    install_query_audit()
+    audit = QueryAudit(label=label, budget=budget)
+    token = current_audit.set(audit)
+    try:
+        yield audit
+    finally:
+        current_audit.reset(token)
+
+
+class QueryAuditMiddleware:
+    """Middleware ASGI: un audit par requête HTTP"""
+
+    def __init__(self, app):
+        self.app = app
+        install_query_audit()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        audit = QueryAudit(scope=scope)
+        token = current_audit.set(audit)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_audit.reset(token)
+            logger.debug("%s: %d requêtes SQL", audit.endpoint(), audit.count)
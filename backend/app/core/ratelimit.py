@@ -0,0 +1,206 @@
+"""Limitation de débit et contrôle d'admission
+
+`RateLimitMiddleware`: seau à jetons par client (utilisateur authentifié,
+sinon adresse IP) et par groupe de routes, avec état dans le cache partagé
+(`get_cache().throttle`) pour que la limite vaille pour tous les workers.
+Avec un cache fichier ou Redis, l'appel passe par un thread: il ne bloque pas
+la boucle d'événements (et donc les autres requêtes du worker).
+Les limites viennent de `RATE_LIMITS`, par exemple
+`auth=10/minute;write=120/minute;read=600/minute`. Au-delà: 429 + Retry-After.
+
+`AdmissionControlMiddleware`: nombre maximal de requêtes traitées en même
+temps par worker (par défaut la capacité du pool SQL). Une requête qui ne
+trouve pas de place en `ADMISSION_WAIT_MS` reçoit un 503 immédiat au lieu
+d'attendre une connexion et de faire tomber le pool en timeout.
+"""
+import asyncio
+import json
+import logging
+import math
+from typing import Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY, Counter
+
+logger = logging.getLogger(__name__)
+
+# Chemins jamais limités (sondes, métriques, documentation)
+EXEMPT_PREFIXES = ("/health", "/metrics", "/docs", "/redoc", "/openapi.json")
+
+# (méthodes, préfixe de chemin, groupe): le premier qui correspond l'emporte
+ROUTE_GROUPS = (
+    (frozenset({"POST"}), "/api/auth/login", "auth"),
+    (frozenset({"POST", "PUT", "PATCH", "DELETE"}), "/api/", "write"),
+    (frozenset({"GET", "HEAD"}), "/api/", "read"),
+)
+
+PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
+
+RATE_LIMITED = REGISTRY.register(Counter(
+    "http_requests_rate_limited_total", "Requêtes refusées par la limitation de débit (429)", ["group"],
+))
+REQUESTS_SHED = REGISTRY.register(Counter(
+    "http_requests_shed_total", "Requêtes refusées faute de capacité (503)",
+))
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[int, float]]:
+    """`auth=10/minute;read=600/minute` -> {"auth": (10, 60.0), "read": (600, 60.0)}
+
+    La période est un nom (second, minute, hour, day) ou une durée en secondes (`30s`).
+    """
+    limits = {}
+    for part in filter(None, (p.strip() for p in spec.split(";"))):
+        try:
+            group, rate = part.split("=", 1)
+            count, period = rate.split("/", 1)
+            period = period.strip()
+            seconds = PERIODS[period] if period in PERIODS else float(period.removesuffix("s"))
+            if int(count) <= 0 or seconds <= 0:
+                raise ValueError(part)
+            limits[group.strip()] = (int(count), seconds)
+        except ValueError:
+            raise ValueError(f"RATE_LIMITS: limite invalide '{part}' (attendu groupe=N/minute)")
+    return limits
+
+
+def route_group(method: str, path: str) -> Optional[str]:
+    """Groupe de limitation d'une requête (None: non limitée)"""
+    if path.startswith(EXEMPT_PREFIXES):
+        return None
+    for methods, prefix, group in ROUTE_GROUPS:
+        if method in methods and path.startswith(prefix):
+            return group
+    return None
+
+
+def client_ip(scope) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def client_identity(scope, group: str) -> str:
+    """Utilisateur du token Bearer s'il est valide, sinon adresse IP
+
+    L'authentification est toujours limitée par IP: le compte visé n'est pas
+    le client.
+    """
+    if group != "auth":
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    from app.core.security import decode_token
+
+                    payload = decode_token(token.strip())
+                    if payload and payload.get("user_id"):
+                        return f"user:{payload['user_id']}"
+                break
+    return f"ip:{client_ip(scope)}"
+
+
+async def send_error(send, status_code: int, detail: str, retry_after: float) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class RateLimitMiddleware:
+    """Seau à jetons par client et par groupe de routes (429 au-delà)"""
+
+    def __init__(self, app, limits: Optional[str] = None):
+        self.app = app
+        self.limits = parse_limits(settings.RATE_LIMITS if limits is None else limits)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        group = route_group(scope["method"], scope["path"])
+        if group is None or group not in self.limits:
+            await self.app(scope, receive, send)
+            return
+
+        from app.core.cache import CacheError, get_cache
+
+        limit, period = self.limits[group]
+        key = f"ratelimit:{group}:{client_identity(scope, group)}"
+        try:
+            cache = get_cache()
+            if cache.blocking_io:
+                allowed, retry_after = await run_in_threadpool(cache.throttle, key, limit, period)
+            else:
+                allowed, retry_after = cache.throttle(key, limit, period)
+        except CacheError as e:
+            # Cache indisponible: laisser passer plutôt que bloquer toute l'API
+            logger.warning("Limitation de débit désactivée, cache indisponible: %s", e)
+            allowed, retry_after = True, 0.0
+
+        if not allowed:
+            RATE_LIMITED.inc(1, group)
+            await send_error(send, 429, "Trop de requêtes, réessayez plus tard", retry_after)
+            return
+        await self.app(scope, receive, send)
+
+
+class AdmissionControlMiddleware:
+    """Limiter les requêtes simultanées par worker (503 au-delà)"""
+
+    def __init__(self, app, max_concurrent: Optional[int] = None, wait_ms: Optional[float] = None):
+        self.app = app
+        self.max_concurrent = settings.MAX_CONCURRENT_REQUESTS if max_concurrent is None else max_concurrent
+        self.wait = (settings.ADMISSION_WAIT_MS if wait_ms is None else wait_ms) / 1000
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._resolved = False
+
+    def _get_semaphore(self) -> Optional[asyncio.Semaphore]:
+        """Créé à la première requête: la capacité par défaut dépend du pool SQL"""
+        if not self._resolved:
+            capacity = self.max_concurrent
+            if capacity <= 0:
+                from app.core.database import get_engine
+
+                pool = get_engine().pool
+                max_overflow = getattr(pool, "_max_overflow", -1)
+                if hasattr(pool, "size") and max_overflow >= 0:
+                    capacity = pool.size() + max_overflow
+            self._semaphore = asyncio.Semaphore(capacity) if capacity > 0 else None
+            self._resolved = True
+        return self._semaphore
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        semaphore = self._get_semaphore()
+        if semaphore is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.wait)
+        except asyncio.TimeoutError:
+            REQUESTS_SHED.inc()
+            await send_error(send, 503, "Service surchargé, réessayez dans un instant", 1)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            semaphore.release()
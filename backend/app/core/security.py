@@ -1,22 +1,54 @@
-"""Utilitaires de sécurité: JWT, password hashing"""
-from datetime import datetime, timedelta
+"""Utilitaires de sécurité: JWT, password hashing
+
+passlib/bcrypt est chargé au premier usage via l'accesseur ci-dessous, pas à
+l'import de l'application. Les tokens passent par `app.core.tokens`.
+"""
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from app.core.config import settings, Role
+from app.core.metrics import PASSWORD_HASH_DURATION
+from app.core.tokens import TokenError, get_token_backend
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """Contexte de hachage des mots de passe (chargé à la demande)"""
+    from passlib.context import CryptContext
 
-# Contexte de hachage des mots de passe
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def hash_password(password: str) -> str:
     """Hacher un mot de passe"""
-    return pwd_context.hash(password)
+    pwd_context = get_pwd_context()
+    start = time.perf_counter()
+    hashed = pwd_context.hash(password)
+    PASSWORD_HASH_DURATION.observe(time.perf_counter() - start, "hash")
+    return hashed
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Vérifier un mot de passe"""
-    return pwd_context.verify(plain_password, hashed_password)
+    pwd_context = get_pwd_context()
+    start = time.perf_counter()
+    valid = pwd_context.verify(plain_password, hashed_password)
+    PASSWORD_HASH_DURATION.observe(time.perf_counter() - start, "verify")
+    return valid
+
+
+@lru_cache(maxsize=None)
+def get_dummy_hash() -> str:
+    """Hash bcrypt de référence pour les identifiants inconnus (calculé une fois)"""
+    return get_pwd_context().hash("mot-de-passe-factice-pour-temps-constant")
+
+
+def verify_dummy_password(plain_password: str) -> bool:
+    """Vérification au même coût qu'un vrai compte: un utilisateur inconnu ne se
+    distingue pas d'un mauvais mot de passe par le temps de réponse"""
+    verify_password(plain_password, get_dummy_hash())
+    return False
 
 
 def create_access_token(
@@ -25,30 +57,20 @@ def create_access_token(
 ) -> str:
     """Créer un token JWT"""
     to_encode = data.copy()
-    
+
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    
-    to_encode.update({"exp": expire})
-    
-    encoded_jwt = jwt.encode(
-        to_encode,
-        settings.SECRET_KEY,
-        algorithm=settings.ALGORITHM
-    )
-    return encoded_jwt
+
+    to_encode.update({"exp": int(expire.replace(tzinfo=timezone.utc).timestamp())})
+
+    return get_token_backend().encode(to_encode)
 
 
 def decode_token(token: str) -> Optional[dict]:
-    """Décoder un token JWT"""
+    """Décoder un token JWT (None s'il est invalide ou expiré)"""
     try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
-        return payload
-    except JWTError:
+        return get_token_backend().decode(token)
+    except TokenError:
         return None
@@ -0,0 +1,279 @@
+"""Signature et vérification des tokens d'accès (JWT)
+
+Le backend dépend de `ALGORITHM`:
+
+- HS256 / HS384 / HS512 (HMAC, clé `SECRET_KEY`): par défaut `JWT_BACKEND=hmac`,
+  une implémentation minimale (hmac + json de la bibliothèque standard) dont
+  la clé est dérivée une seule fois (état HMAC pré-calculé, copié à chaque
+  token); base64url strict, `exp`/`nbf`/`iat` vérifiés comme par les
+  bibliothèques. `JWT_BACKEND=jose` ou `pyjwt` délègue à python-jose ou PyJWT.
+- EdDSA (Ed25519, via `cryptography`): clé privée PEM `JWT_PRIVATE_KEY_FILE`.
+  Les autres services vérifient localement avec la clé publique publiée sur
+  `/api/auth/jwks`, sans connaître de secret.
+
+Tous produisent des JWT standards: un token HS256 émis par un backend est
+accepté par les autres.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import re
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Optional
+
+from app.core.config import settings
+
+HMAC_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+# Segment base64url sans remplissage (RFC 7515)
+B64URL_RE = re.compile(r"[A-Za-z0-9_-]*")
+
+
+class TokenError(ValueError):
+    """Token invalide (signature, format, algorithme ou expiration)"""
+
+
+def b64url_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def b64url_decode(data: str) -> bytes:
+    """Décodage strict: alphabet base64url sans `=`, encodage canonique
+
+    Un segment qui ne se ré-encode pas à l'identique (bits de fin non nuls,
+    caractères ignorés) est refusé: une signature n'a qu'une écriture.
+    """
+    if not B64URL_RE.fullmatch(data) or len(data) % 4 == 1:
+        raise ValueError("base64url invalide")
+    decoded = base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+    if b64url_encode(decoded) != data:
+        raise ValueError("base64url non canonique")
+    return decoded
+
+
+def _json(data: dict) -> bytes:
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def _numeric_claim(payload: dict, name: str) -> Optional[float]:
+    value = payload.get(name)
+    if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+        raise TokenError(f"Claim {name} invalide")
+    return value
+
+
+def _check_claims(payload: dict) -> dict:
+    """exp, nbf et iat (dates numériques), comme PyJWT et python-jose"""
+    now = time.time()
+    exp = _numeric_claim(payload, "exp")
+    if exp is not None and exp <= now:
+        raise TokenError("Token expiré")
+    nbf = _numeric_claim(payload, "nbf")
+    if nbf is not None and nbf > now:
+        raise TokenError("Token pas encore valide")
+    _numeric_claim(payload, "iat")
+    return payload
+
+
+class TokenBackend(ABC):
+    """Interface: encode(payload) -> str, decode(token) -> dict (lève TokenError)"""
+
+    algorithm = ""
+    kid: Optional[str] = None
+
+    @abstractmethod
+    def encode(self, payload: dict) -> str:
+        """Signer `payload`"""
+
+    @abstractmethod
+    def decode(self, token: str) -> dict:
+        """Vérifier `token` et retourner sa charge (TokenError sinon)"""
+
+    def jwks(self) -> dict:
+        """Clés publiques de vérification (aucune pour un secret partagé)"""
+        return {"keys": []}
+
+
+class CompactJWTBackend(TokenBackend):
+    """Sérialisation JWS compacte commune (en-tête.charge.signature)"""
+
+    @abstractmethod
+    def _sign(self, signing_input: bytes) -> bytes:
+        """Signature de `en-tête.charge`"""
+
+    @abstractmethod
+    def _verify(self, signing_input: bytes, signature: bytes) -> bool:
+        """Signature valide pour `en-tête.charge`"""
+
+    def _header(self) -> dict:
+        header = {"alg": self.algorithm, "typ": "JWT"}
+        if self.kid:
+            header["kid"] = self.kid
+        return header
+
+    def encode(self, payload: dict) -> str:
+        signing_input = (b64url_encode(_json(self._header())) + "." + b64url_encode(_json(payload))).encode()
+        return signing_input.decode("ascii") + "." + b64url_encode(self._sign(signing_input))
+
+    def decode(self, token: str) -> dict:
+        try:
+            header_segment, payload_segment, signature_segment = token.split(".")
+            header = json.loads(b64url_decode(header_segment))
+            signature = b64url_decode(signature_segment)
+        except (ValueError, TypeError):
+            raise TokenError("Token mal formé")
+
+        # L'algorithme est imposé par le serveur, jamais choisi par le token ("none", confusion HS/EdDSA)
+        if not isinstance(header, dict) or header.get("alg") != self.algorithm:
+            raise TokenError("Algorithme de token non accepté")
+        if not self._verify(f"{header_segment}.{payload_segment}".encode(), signature):
+            raise TokenError("Signature invalide")
+
+        try:
+            payload = json.loads(b64url_decode(payload_segment))
+        except (ValueError, TypeError):
+            raise TokenError("Token mal formé")
+        if not isinstance(payload, dict):
+            raise TokenError("Token mal formé")
+        return _check_claims(payload)
+
+
+class HMACBackend(CompactJWTBackend):
+    """HS256/384/512 avec la bibliothèque standard; clé dérivée une fois (JWT_BACKEND=hmac)"""
+
+    def __init__(self, secret: str, algorithm: str = "HS256"):
+        if algorithm not in HMAC_DIGESTS:
+            raise ValueError(f"Algorithme HMAC non supporté: {algorithm}")
+        self.algorithm = algorithm
+        # État HMAC (clé ipad/opad) pré-calculé: chaque token ne fait que copy() + update()
+        self._mac = hmac.new(secret.encode(), digestmod=HMAC_DIGESTS[algorithm])
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def _verify(self, signing_input: bytes, signature: bytes) -> bool:
+        return hmac.compare_digest(self._sign(signing_input), signature)
+
+
+class Ed25519Backend(CompactJWTBackend):
+    """EdDSA (Ed25519): signature par la clé privée, vérification par la clé publique"""
+
+    algorithm = "EdDSA"
+
+    def __init__(self, private_key_pem: bytes):
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+        private_key = serialization.load_pem_private_key(private_key_pem, password=None)
+        if not isinstance(private_key, Ed25519PrivateKey):
+            raise ValueError("JWT_PRIVATE_KEY_FILE doit contenir une clé privée Ed25519")
+        self._private_key = private_key
+        self._public_key = private_key.public_key()
+        self._invalid_signature = InvalidSignature
+        self._public_bytes = self._public_key.public_bytes(
+            serialization.Encoding.Raw, serialization.PublicFormat.Raw
+        )
+        # Identifiant de clé: empreinte RFC 7638 de la JWK publique
+        thumbprint_input = _json({"crv": "Ed25519", "kty": "OKP", "x": b64url_encode(self._public_bytes)})
+        self.kid = b64url_encode(hashlib.sha256(thumbprint_input).digest())[:16]
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        return self._private_key.sign(signing_input)
+
+    def _verify(self, signing_input: bytes, signature: bytes) -> bool:
+        try:
+            self._public_key.verify(signature, signing_input)
+            return True
+        except self._invalid_signature:
+            return False
+
+    def jwks(self) -> dict:
+        return {"keys": [{
+            "kty": "OKP",
+            "crv": "Ed25519",
+            "x": b64url_encode(self._public_bytes),
+            "kid": self.kid,
+            "alg": "EdDSA",
+            "use": "sig",
+        }]}
+
+
+class PyJWTBackend(TokenBackend):
+    """HMAC via PyJWT (dépendance optionnelle)"""
+
+    def __init__(self, secret: str, algorithm: str = "HS256"):
+        try:
+            import jwt
+        except ImportError:
+            raise ValueError("JWT_BACKEND=pyjwt: installer le paquet PyJWT")
+        self._jwt = jwt
+        self._secret = secret
+        self.algorithm = algorithm
+
+    def encode(self, payload: dict) -> str:
+        return self._jwt.encode(payload, self._secret, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        try:
+            return self._jwt.decode(token, self._secret, algorithms=[self.algorithm])
+        except self._jwt.PyJWTError as e:
+            raise TokenError(str(e))
+
+
+class JoseBackend(TokenBackend):
+    """HMAC via python-jose (JWT_BACKEND=jose)"""
+
+    def __init__(self, secret: str, algorithm: str = "HS256"):
+        from jose import jwt
+
+        self._jwt = jwt
+        self._secret = secret
+        self.algorithm = algorithm
+
+    def encode(self, payload: dict) -> str:
+        return self._jwt.encode(payload, self._secret, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        try:
+            return self._jwt.decode(token, self._secret, algorithms=[self.algorithm])
+        except self._jwt.JWTError as e:
+            raise TokenError(str(e))
+
+
+def create_token_backend(algorithm: str, backend: str = "hmac", secret: str = "",
+                         private_key_file: str = "") -> TokenBackend:
+    """Instancier le backend correspondant à la configuration"""
+    if algorithm == "EdDSA":
+        if not private_key_file:
+            raise ValueError("ALGORITHM=EdDSA: définir JWT_PRIVATE_KEY_FILE (python manage.py generate-signing-key)")
+        with open(private_key_file, "rb") as f:
+            return Ed25519Backend(f.read())
+
+    backends = {"hmac": HMACBackend, "pyjwt": PyJWTBackend, "jose": JoseBackend}
+    if backend not in backends:
+        raise ValueError(f"JWT_BACKEND inconnu: {backend} (hmac, pyjwt ou jose)")
+    return backends[backend](secret, algorithm)
+
+
+@lru_cache(maxsize=None)
+def get_token_backend() -> TokenBackend:
+    """Backend de l'application (clés chargées une fois, au premier token)"""
+    return create_token_backend(
+        settings.ALGORITHM, settings.JWT_BACKEND, settings.SECRET_KEY, settings.JWT_PRIVATE_KEY_FILE
+    )
+
+
+def generate_ed25519_private_key() -> bytes:
+    """Nouvelle clé privée Ed25519 au format PEM (PKCS#8)"""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+    return Ed25519PrivateKey.generate().private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
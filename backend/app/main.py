@@ -1,23 +1,61 @@
 """Application FastAPI principale"""
-from fastapi import FastAPI, Depends, Header
+import secrets
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
-from app.core.database import engine, Base, get_db
-from app.routes import auth, users, leaves
-from app.services.user import UserService
+from app.core.compression import CompressionMiddleware
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.metrics import MetricsMiddleware, REGISTRY
+from app.core.query_audit import QueryAuditMiddleware
+from app.core.ratelimit import AdmissionControlMiddleware, RateLimitMiddleware
+from app.routes import auth, users, leaves, dashboard, health
+from app.services import leave_events
+
+# Le schéma et l'admin par défaut sont gérés hors du démarrage:
+#   python manage.py migrate && python manage.py seed-admin
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Arrêt du worker: écrire les événements de congé encore en file"""
+    yield
+    await run_in_threadpool(leave_events.shutdown)
 
-# Créer les tables
-Base.metadata.create_all(bind=engine)
 
 # Créer l'application FastAPI
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    description="API de gestion des demandes de congé"
+    description="API de gestion des demandes de congé",
+    lifespan=lifespan
 )
 
-# CORS middleware
+# Idempotency-Key des POST d'écriture (au plus près des routes: réponses non compressées)
+app.add_middleware(IdempotencyMiddleware)
+
+# Compression Brotli/GZip des réponses volumineuses
+app.add_middleware(CompressionMiddleware)
+
+# Contrôle d'admission: 503 avant d'épuiser le pool SQL
+app.add_middleware(AdmissionControlMiddleware)
+
+# Limitation de débit par client et groupe de routes (429)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
+# Métriques Prometheus (latence par route, SQL par requête, bcrypt, pool)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Audit SQL: N+1, requêtes lentes (EXPLAIN), budget par endpoint
+if settings.QUERY_AUDIT_ENABLED:
+    app.add_middleware(QueryAuditMiddleware)
+
+# CORS middleware, ajouté en dernier donc le plus externe: les 429 et 503
+# des middlewares ci-dessus portent aussi Access-Control-Allow-Origin
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -26,24 +64,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-
-# Fonction de démarrage pour créer l'admin par défaut
-@app.on_event("startup")
-def startup_event():
-    """Créer l'utilisateur admin par défaut au démarrage"""
-    db = next(get_db())
-    try:
-        admin = UserService.create_default_admin(db)
-        if admin:
-            print(f"✓ Admin créé: {admin.username} / admin123")
-    finally:
-        db.close()
-
-
 # Inclure les routes
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(leaves.router)
+app.include_router(dashboard.router)
+app.include_router(health.router)
 
 
 @app.get("/")
@@ -52,10 +78,21 @@ def read_root():
     return {"message": "Bienvenue sur l'API de gestion des congés"}
 
 
-@app.get("/health")
-def health_check():
-    """Vérifier l'état de l'application"""
-    return {"status": "ok"}
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics(request: Request, authorization: str = Header(None)):
+        """Exposer les métriques au format texte Prometheus
+
+        Avec METRICS_TOKEN: en-tête `Authorization: Bearer <jeton>` exigé.
+        Sans: seuls les clients locaux (scraper sur la même machine) sont servis.
+        """
+        if settings.METRICS_TOKEN:
+            if not secrets.compare_digest(authorization or "", f"Bearer {settings.METRICS_TOKEN}"):
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Jeton de métriques invalide")
+        elif request.client is None or request.client.host not in ("127.0.0.1", "::1"):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                                detail="Métriques réservées aux clients locaux (définir METRICS_TOKEN)")
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 
 # Dépendance pour extraire le token du header Authorization
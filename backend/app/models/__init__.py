@@ -1,6 +1,8 @@
 # Models module
 from app.models.user import User
 from app.models.leave_request import LeaveRequest
+from app.models.leave_event import LeaveEvent
 from app.models.team import Team
+from app.models.refresh_token import RefreshToken
 
-__all__ = ["User", "LeaveRequest", "Team"]
+__all__ = ["User", "LeaveRequest", "LeaveEvent", "Team", "RefreshToken"]
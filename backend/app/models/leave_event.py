@@ -0,0 +1,45 @@
+"""Modèle LeaveEvent (journal des demandes de congé)"""
+from sqlalchemy import BigInteger, Column, Integer, DateTime, Enum as SQLEnum, ForeignKey, Index, JSON
+from enum import Enum
+from app.core.database import Base
+from app.models.leave_request import LeaveStatus
+
+
+class LeaveEventType(str, Enum):
+    """Transitions d'une demande de congé"""
+    CREATED = "created"
+    UPDATED = "updated"
+    APPROVED = "approved"
+    REJECTED = "rejected"
+
+
+class LeaveEvent(Base):
+    """Événement du cycle de vie d'une demande, en ajout seul
+
+    Jamais modifié ni supprimé (triggers de la migration 0008). Pas de clé
+    étrangère vers leave_requests: sur PostgreSQL sa clé primaire est
+    (id, start_date), et le journal survit à l'archivage d'une année.
+    """
+    __tablename__ = "leave_events"
+    __table_args__ = (
+        # Chronologie d'une demande: événements par version
+        Index("ix_leave_events_leave_id_version", "leave_id", "version"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    leave_id = Column(Integer, nullable=False)
+
+    # Version et statut de la demande après l'événement
+    version = Column(Integer, nullable=False)
+    event_type = Column(SQLEnum(LeaveEventType, native_enum=False, length=20), nullable=False)
+    status = Column(SQLEnum(LeaveStatus), nullable=False)
+
+    # Auteur et valeurs écrites (JSON: dates ISO 8601, énumérations par valeur)
+    actor_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    changes = Column(JSON, nullable=False)
+
+    # Heure de l'écriture sur la demande (pas de l'insertion, différée par lots)
+    occurred_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<LeaveEvent(id={self.id}, leave_id={self.leave_id}, version={self.version}, type={self.event_type})>"
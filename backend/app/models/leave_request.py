@@ -1,5 +1,5 @@
 """Modèle LeaveRequest"""
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, Text, Index, literal_column, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from enum import Enum
@@ -26,11 +26,20 @@ class LeaveType(str, Enum):
 class LeaveRequest(Base):
     """Modèle de demande de congé"""
     __tablename__ = "leave_requests"
+    __table_args__ = (
+        # File d'attente des validations (status = PENDING, tri par created_at): index partiel
+        Index(
+            "ix_leave_requests_pending_created_at", "created_at",
+            postgresql_where=text("status = 'PENDING'"),
+            sqlite_where=text("status = 'PENDING'"),
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     
     # Dates
+    # Clé de partitionnement sur PostgreSQL (une partition par année, migration 0004)
     start_date = Column(DateTime, nullable=False, index=True)
     end_date = Column(DateTime, nullable=False, index=True)
     
@@ -52,9 +61,19 @@ class LeaveRequest(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
+    # Concurrence optimiste: exposée en ETag, incrémentée par l'UPDATE conditionnel
+    # de LeaveService._update_pending (seul chemin d'écriture d'une demande)
+    version = Column(Integer, default=1, server_default="1", nullable=False)
+    
     # Relationships
     user = relationship("User", foreign_keys=[user_id], back_populates="leave_requests")
     approved_by = relationship("User", foreign_keys=[approved_by_id], back_populates="approved_leaves")
     
     def __repr__(self):
         return f"<LeaveRequest(id={self.id}, user_id={self.user_id}, status={self.status})>"
+
+
+# Filtre de la file d'attente, en littéral comme le prédicat de
+# ix_leave_requests_pending_created_at: avec un paramètre lié (`status = ?`),
+# le planificateur ne peut pas prouver `status = 'PENDING'` et ignore l'index
+IS_PENDING = LeaveRequest.status == literal_column("'PENDING'")
@@ -0,0 +1,32 @@
+"""Modèle RefreshToken"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.core.database import Base
+
+
+class RefreshToken(Base):
+    """Jeton de rafraîchissement (stocké haché, jamais en clair)
+    
+    Les jetons d'une même session partagent un `family_id`: chaque
+    rafraîchissement révoque le jeton utilisé et en émet un nouveau dans la
+    famille. Réutiliser un jeton révoqué révoque toute la famille.
+    """
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    
+    # SHA-256 hexadécimal du jeton: recherche par index unique
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    family_id = Column(String(32), index=True, nullable=False)
+    
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Relationships
+    user = relationship("User")
+    
+    def __repr__(self):
+        return f"<RefreshToken(id={self.id}, user_id={self.user_id}, family_id={self.family_id})>"
@@ -1,5 +1,5 @@
 """Modèle User"""
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum as SQLEnum, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
@@ -9,6 +9,24 @@ from app.core.config import Role
 class User(Base):
     """Modèle utilisateur"""
     __tablename__ = "users"
+    __table_args__ = (
+        # Listes d'utilisateurs non supprimés (filtres rôle / actif): index partiel.
+        # Le prédicat reprend le SQL émis par `User.is_deleted == False` sur chaque dialecte.
+        Index(
+            "ix_users_live_role", "role", "is_active",
+            postgresql_where=text("NOT is_deleted"),
+            sqlite_where=text("is_deleted = 0"),
+        ),
+        # Recherche dans l'annuaire (préfixe et similarité, extension pg_trgm):
+        # PostgreSQL uniquement, SQLite passe par l'index en mémoire de user_search
+        *(
+            Index(
+                f"ix_users_{column}_trgm", column,
+                postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"},
+            ).ddl_if(dialect="postgresql")
+            for column in ("username", "full_name", "email")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(100), unique=True, index=True, nullable=False)
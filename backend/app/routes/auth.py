@@ -1,27 +1,43 @@
 """Routes pour l'authentification"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import get_db
-from app.schemas.auth import LoginRequest, TokenResponse
-from app.services.auth import AuthService
+from app.core.ratelimit import client_ip
+from app.core.tokens import get_token_backend
+from app.models.user import User
+from app.schemas.auth import LoginRequest, RefreshRequest, TokenResponse
+from app.services.auth import AuthService, LoginLockedError
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
+def _token_response(user: User, refresh_token: str) -> TokenResponse:
+    return TokenResponse(
+        access_token=AuthService.create_access_token(user),
+        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        refresh_token=refresh_token,
+        user_id=user.id,
+        username=user.username,
+        role=user.role.value
+    )
+
+
 @router.post("/login", response_model=TokenResponse)
-def login(credentials: LoginRequest, db: Session = Depends(get_db)):
+def login(credentials: LoginRequest, request: Request, db: Session = Depends(get_db)):
     """Authentifier un utilisateur et retourner un token"""
     try:
-        user = AuthService.authenticate(db, credentials.username, credentials.password)
-        token = AuthService.create_access_token(user)
-        
-        return TokenResponse(
-            access_token=token,
-            user_id=user.id,
-            username=user.username,
-            role=user.role.value
+        user = AuthService.authenticate(
+            db, credentials.username, credentials.password, client_ip=client_ip(request.scope)
         )
+        return _token_response(user, AuthService.create_refresh_token(db, user))
     
+    except LoginLockedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(int(e.retry_after) + 1)}
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -32,3 +48,30 @@ def login(credentials: LoginRequest, db: Session = Depends(get_db)):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur lors de l'authentification"
         )
+
+
+@router.post("/refresh", response_model=TokenResponse)
+def refresh(body: RefreshRequest, db: Session = Depends(get_db)):
+    """Nouveau token d'accès (et nouveau jeton de rafraîchissement) sans mot de passe"""
+    try:
+        user, refresh_token = AuthService.rotate_refresh_token(db, body.refresh_token)
+        return _token_response(user, refresh_token)
+    
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e)
+        )
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(body: RefreshRequest, db: Session = Depends(get_db)):
+    """Révoquer la session du jeton de rafraîchissement"""
+    AuthService.revoke_refresh_token(db, body.refresh_token)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/jwks")
+def jwks():
+    """Clés publiques de vérification des tokens (vide avec un secret HMAC partagé)"""
+    return get_token_backend().jwks()
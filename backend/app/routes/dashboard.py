@@ -0,0 +1,44 @@
+"""Route d'amorçage des tableaux de bord"""
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.models.user import User
+from app.routes.deps import get_current_user
+from app.services.dashboard import ROLE_VIEWS, DashboardService
+
+router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
+
+
+@router.get("")
+@router.get("/", include_in_schema=False)
+def get_dashboard(
+    role_view: Optional[str] = Query(None, description="employee, manager ou admin (défaut: rôle de l'utilisateur)"),
+    year: Optional[int] = Query(None, description="Année des listes (défaut: année en cours)"),
+    month: Optional[int] = Query(None, description="Mois du calendrier (défaut: mois en cours)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Tout ce qu'un tableau de bord affiche au chargement, en une requête"""
+    role_view = role_view or current_user.role.value
+    if role_view in ROLE_VIEWS and current_user.role not in ROLE_VIEWS[role_view]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Accès refusé"
+        )
+    
+    now = datetime.utcnow()
+    try:
+        return JSONResponse(DashboardService.get_dashboard(
+            db, current_user, role_view, year or now.year, month or now.month
+        ))
+    
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
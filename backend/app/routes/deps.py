@@ -1,7 +1,7 @@
 """Dépendances pour l'authentification et l'autorisation"""
-from fastapi import Depends, HTTPException, status, Header
+from fastapi import Depends, HTTPException, status, Header, Query
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, Set
 from app.core.security import decode_token
 from app.core.database import get_db
 from app.models.user import User
@@ -63,3 +63,48 @@ def require_role(*roles: Role):
         return current_user
     
     return role_checker
+
+
+def sparse_fields(schema):
+    """Dépendance: paramètre `fields=` (champs du schéma à renvoyer, séparés par des virgules)"""
+    allowed = set(schema.model_fields)
+
+    def fields_parser(
+        fields: Optional[str] = Query(
+            None,
+            description="Champs à renvoyer, séparés par des virgules (ex: id,start_date,end_date,status)"
+        )
+    ) -> Optional[Set[str]]:
+        if not fields:
+            return None
+
+        requested = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = requested - allowed
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Champs inconnus: {', '.join(sorted(unknown))}"
+            )
+        # L'identifiant est toujours renvoyé
+        return requested | ({"id"} & allowed)
+
+    return fields_parser
+
+
+def etag(version: int) -> str:
+    """ETag d'une ressource versionnée"""
+    return f'"{version}"'
+
+
+def if_match_version(if_match: Optional[str] = Header(None)) -> Optional[int]:
+    """Dépendance: version attendue d'après l'en-tête If-Match (None: écriture sans condition)"""
+    if not if_match or if_match.strip() == "*":
+        return None
+
+    value = if_match.strip().removeprefix("W/").strip('"')
+    if not value.isdigit():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="En-tête If-Match invalide (attendu: l'ETag renvoyé par l'API)"
+        )
+    return int(value)
@@ -0,0 +1,26 @@
+"""Routes de santé pour les sondes (load balancer, orchestrateur)"""
+from fastapi import APIRouter, Response, status
+from app.core.health import readiness_probe
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("")
+def health_check():
+    """Vérifier l'état de l'application"""
+    return {"status": "ok"}
+
+
+@router.get("/live")
+def liveness():
+    """Le processus répond (aucune dépendance vérifiée)"""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+def readiness(response: Response):
+    """Le worker peut servir: base joignable et rapide, pool et workers sains (503 sinon)"""
+    result = readiness_probe.check()
+    if result["status"] != "ok":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return result
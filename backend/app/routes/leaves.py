@@ -1,17 +1,52 @@
 """Routes pour la gestion des demandes de congé"""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Set
 from datetime import datetime, timedelta
 from app.core.database import get_db
 from app.core.config import Role
 from app.models.user import User
-from app.schemas.leave import LeaveRequestCreate, LeaveRequestUpdate, LeaveRequestResponse
-from app.services.leave import LeaveService
-from app.routes.deps import require_role, get_current_user
+from app.models.leave_request import LeaveStatus
+from app.schemas.leave import (
+    LeaveEventResponse, LeaveRequestCreate, LeaveRequestUpdate, LeaveRequestResponse, LeaveSearchResult
+)
+from app.services.leave import LeaveConflictError, LeaveService
+from app.services.leave_events import LeaveEventService
+from app.services.leave_search import LeaveSearchService
+from app.services.user import UserService
+from app.services.heatmap import HeatmapService
+from app.services.calendar import CalendarService
+from app.routes.deps import require_role, get_current_user, sparse_fields, etag, if_match_version
 
 router = APIRouter(prefix="/api/leaves", tags=["leaves"])
 
+leave_fields = sparse_fields(LeaveRequestResponse)
+
+
+def _serialize_leave(leave, fields: Optional[Set[str]]):
+    """Réponse complète, ou seulement les champs demandés via `fields=`"""
+    response = LeaveRequestResponse.from_orm(leave)
+    if fields is None:
+        return response
+    return response.model_dump(mode="json", include=fields)
+
+
+def _conflict(e: LeaveConflictError) -> HTTPException:
+    """409 avec l'ETag courant: le client relit la demande avant de réessayer"""
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=str(e),
+        headers={"ETag": etag(e.version)}
+    )
+
+
+def _leave_list_response(leaves, fields: Optional[Set[str]]):
+    """Liste de congés; avec `fields=`, JSON allégé renvoyé directement"""
+    if fields is None:
+        return [LeaveRequestResponse.from_orm(l) for l in leaves]
+    return JSONResponse([_serialize_leave(l, fields) for l in leaves])
+
 
 @router.post("/", response_model=LeaveRequestResponse, status_code=status.HTTP_201_CREATED)
 def create_leave_request(
@@ -21,8 +56,7 @@ def create_leave_request(
 ):
     """Créer une nouvelle demande de congé"""
     try:
-        leave_request = LeaveService.create_leave_request(db, current_user.id, leave_create)
-        return LeaveRequestResponse.from_orm(leave_request)
+        return LeaveService.create_leave_request(db, current_user.id, leave_create)
     
     except ValueError as e:
         raise HTTPException(
@@ -36,6 +70,7 @@ def create_leave_request(
 def list_all_leaves(
     status: Optional[str] = Query(None, description="Filtrer par statut"),
     year: Optional[int] = Query(None, description="Filtrer par année"),
+    fields: Optional[Set[str]] = Depends(leave_fields),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -48,28 +83,30 @@ def list_all_leaves(
         )
     
     leaves = LeaveService.list_all_leaves(db, status, year)
-    return [LeaveRequestResponse.from_orm(l) for l in leaves]
+    return _leave_list_response(leaves, fields)
 
 
 @router.get("/my-requests", response_model=List[LeaveRequestResponse])
 def get_my_leaves(
     year: Optional[int] = Query(None, description="Filtrer par année"),
+    fields: Optional[Set[str]] = Depends(leave_fields),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Récupérer toutes mes demandes de congé"""
     leaves = LeaveService.list_user_leaves(db, current_user.id, year)
-    return [LeaveRequestResponse.from_orm(l) for l in leaves]
+    return _leave_list_response(leaves, fields)
 
 
 @router.get("/pending-approvals")
 def get_pending_approvals(
+    fields: Optional[Set[str]] = Depends(leave_fields),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(Role.MANAGER, Role.ADMIN))
 ):
     """Récupérer les demandes en attente d'approbation (manager/admin)"""
     leaves = LeaveService.list_pending_leaves(db, current_user.id)
-    return [LeaveRequestResponse.from_orm(l) for l in leaves]
+    return _leave_list_response(leaves, fields)
 
 
 @router.get("/statistics")
@@ -81,14 +118,51 @@ def get_statistics(
     return LeaveService.get_statistics(db)
 
 
-@router.get("/team/calendar")
-def get_team_calendar(
-    from_date: Optional[datetime] = Query(None, description="Date de début"),
-    to_date: Optional[datetime] = Query(None, description="Date de fin"),
+@router.get("/heatmap")
+def get_absence_heatmap(
+    year: Optional[int] = Query(None, description="Année (défaut: année en cours)"),
+    team_id: Optional[int] = Query(None, description="Limiter à une équipe"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_role(Role.MANAGER, Role.ADMIN))
 ):
-    """Récupérer le calendrier de l'équipe (congés validés)"""
+    """Nombre d'absents (congés validés) par jour de l'année, par équipe (manager/admin)"""
+    return HeatmapService.get_heatmap(db, year or datetime.utcnow().year, team_id)
+
+
+@router.get("/search", response_model=List[LeaveSearchResult])
+def search_leaves(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=2, max_length=200, description="Mots du commentaire ou du motif de refus"),
+    status: Optional[LeaveStatus] = Query(None, description="Filtrer par statut"),
+    team_id: Optional[int] = Query(None, description="Limiter à une équipe"),
+    from_date: Optional[datetime] = Query(None, description="Congés se terminant après cette date"),
+    to_date: Optional[datetime] = Query(None, description="Congés commençant avant cette date"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role(Role.MANAGER, Role.ADMIN))
+):
+    """Recherche plein texte dans les congés, les plus pertinents d'abord (manager/admin)
+    
+    Une page pleine porte l'en-tête `Link: <...>; rel="next"`.
+    """
+    results = LeaveSearchService.search(db, q, status, team_id, from_date, to_date, limit, offset)
+    if len(results) == limit:
+        next_url = request.url.include_query_params(offset=offset + limit)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    
+    names = UserService.get_names(
+        db, [user_id for leave, _ in results for user_id in (leave.user_id, leave.approved_by_id)]
+    )
+    return [
+        LeaveSearchResult(**LeaveRequestResponse.from_orm(leave, names).model_dump(), rank=rank)
+        for leave, rank in results
+    ]
+
+
+def _calendar_period(from_date: Optional[datetime], to_date: Optional[datetime]):
+    """Période du calendrier: par défaut le mois en cours"""
     if not from_date:
         from_date = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0)
     
@@ -96,28 +170,45 @@ def get_team_calendar(
         # Dernier jour du mois actuel
         next_month = from_date.replace(day=28) + timedelta(days=4)
         to_date = (next_month - timedelta(days=next_month.day)).replace(hour=23, minute=59, second=59)
+    return from_date, to_date
+
+
+@router.get("/team/calendar")
+def get_team_calendar(
+    from_date: Optional[datetime] = Query(None, description="Date de début"),
+    to_date: Optional[datetime] = Query(None, description="Date de fin"),
+    fields: Optional[Set[str]] = Depends(leave_fields),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Récupérer le calendrier de l'équipe (congés validés)"""
+    from_date, to_date = _calendar_period(from_date, to_date)
     
-    leaves = LeaveService.list_team_leaves(db, from_date, to_date)
-    
-    # Grouper par utilisateur
-    by_user = {}
-    for leave in leaves:
-        user_id = leave.user_id
-        if user_id not in by_user:
-            by_user[user_id] = {
-                "user_id": user_id,
-                "username": leave.user.username if leave.user else "Unknown",
-                "email": leave.user.email if leave.user else "",
-                "leaves": []
-            }
-        by_user[user_id]["leaves"].append(LeaveRequestResponse.from_orm(leave))
+    calendar = CalendarService.get_team_calendar(db, from_date, to_date)
     
-    return list(by_user.values())
+    if fields is not None:
+        for group in calendar:
+            group["leaves"] = [l.model_dump(mode="json", include=fields) for l in group["leaves"]]
+        return JSONResponse(calendar)
+    return calendar
+
+
+@router.get("/team/calendar/days")
+def get_team_calendar_days(
+    from_date: Optional[datetime] = Query(None, description="Date de début"),
+    to_date: Optional[datetime] = Query(None, description="Date de fin"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Calendrier de l'équipe indexé par jour (affichage d'un mois)"""
+    from_date, to_date = _calendar_period(from_date, to_date)
+    return JSONResponse(CalendarService.get_day_index(db, from_date, to_date))
 
 
 @router.get("/{leave_id}", response_model=LeaveRequestResponse)
 def get_leave_request(
     leave_id: int,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -137,21 +228,53 @@ def get_leave_request(
             detail="Accès refusé"
         )
     
+    response.headers["ETag"] = etag(leave_request.version)
     return LeaveRequestResponse.from_orm(leave_request)
 
 
+@router.get("/{leave_id}/timeline", response_model=List[LeaveEventResponse])
+def get_leave_timeline(
+    leave_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Historique d'une demande: événements par version et état après chacun"""
+    leave_request = LeaveService.get_leave_request(db, leave_id)
+    
+    if not leave_request:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Demande de congé non trouvée"
+        )
+    
+    if current_user.id != leave_request.user_id and current_user.role not in [Role.MANAGER, Role.ADMIN]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Accès refusé"
+        )
+    
+    return LeaveEventService.get_timeline(db, leave_id)
+
+
 @router.put("/{leave_id}", response_model=LeaveRequestResponse)
 def update_leave_request(
     leave_id: int,
     leave_update: LeaveRequestUpdate,
+    response: Response,
+    expected_version: Optional[int] = Depends(if_match_version),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Mettre à jour une demande de congé"""
+    """Mettre à jour une demande de congé (If-Match: ETag pour une écriture conditionnelle)"""
     try:
-        leave_request = LeaveService.update_leave_request(db, leave_id, leave_update, current_user.id)
-        return LeaveRequestResponse.from_orm(leave_request)
+        leave_request = LeaveService.update_leave_request(
+            db, leave_id, leave_update, current_user.id, expected_version
+        )
+        response.headers["ETag"] = etag(leave_request.version)
+        return leave_request
     
+    except LeaveConflictError as e:
+        raise _conflict(e)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -162,14 +285,19 @@ def update_leave_request(
 @router.post("/{leave_id}/approve", response_model=LeaveRequestResponse)
 def approve_leave(
     leave_id: int,
+    response: Response,
+    expected_version: Optional[int] = Depends(if_match_version),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(Role.MANAGER, Role.ADMIN))
 ):
     """Approuver une demande de congé (manager/admin)"""
     try:
-        leave_request = LeaveService.approve_leave(db, leave_id, current_user.id)
-        return LeaveRequestResponse.from_orm(leave_request)
+        leave_request = LeaveService.approve_leave(db, leave_id, current_user.id, expected_version)
+        response.headers["ETag"] = etag(leave_request.version)
+        return leave_request
     
+    except LeaveConflictError as e:
+        raise _conflict(e)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -180,15 +308,20 @@ def approve_leave(
 @router.post("/{leave_id}/reject")
 def reject_leave(
     leave_id: int,
+    response: Response,
     reason: str = "",
+    expected_version: Optional[int] = Depends(if_match_version),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(Role.MANAGER, Role.ADMIN))
 ):
     """Rejeter une demande de congé (manager/admin)"""
     try:
-        leave_request = LeaveService.reject_leave(db, leave_id, reason, current_user.id)
-        return LeaveRequestResponse.from_orm(leave_request)
+        leave_request = LeaveService.reject_leave(db, leave_id, reason, current_user.id, expected_version)
+        response.headers["ETag"] = etag(leave_request.version)
+        return leave_request
     
+    except LeaveConflictError as e:
+        raise _conflict(e)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
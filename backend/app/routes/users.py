@@ -1,7 +1,7 @@
 """Routes pour la gestion des utilisateurs (admin uniquement)"""
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile, File
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.core.database import get_db
 from app.core.config import Role
 from app.models.user import User
@@ -32,12 +32,19 @@ def create_user(
 
 @router.get("/", response_model=List[UserResponse])
 def list_users(
+    request: Request,
+    response: Response,
     role: str = None,
     is_active: bool = None,
+    after_id: Optional[int] = Query(None, description="Dernier id de la page précédente"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Taille de page (défaut: tout)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(Role.ADMIN))
 ):
-    """Lister les utilisateurs (admin uniquement)"""
+    """Lister les utilisateurs (admin uniquement)
+    
+    Avec `limit`, une page pleine porte l'en-tête `Link: <...>; rel="next"`.
+    """
     role_enum = None
     if role:
         try:
@@ -48,7 +55,22 @@ def list_users(
                 detail=f"Rôle invalide: {role}"
             )
     
-    users = UserService.list_users(db, role=role_enum, is_active=is_active)
+    users = UserService.list_users(db, role=role_enum, is_active=is_active, after_id=after_id, limit=limit)
+    if limit is not None and len(users) == limit:
+        next_url = request.url.include_query_params(after_id=users[-1].id)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return [UserResponse.from_orm(u) for u in users]
+
+
+@router.get("/search", response_model=List[UserResponse])
+def search_users(
+    q: str = Query(..., min_length=2, max_length=100, description="Début ou approximation d'un username, nom ou email"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role(Role.ADMIN, Role.MANAGER))
+):
+    """Rechercher dans l'annuaire: préfixes d'abord, puis correspondances approchées"""
+    users = UserService.search_users(db, q, limit)
     return [UserResponse.from_orm(u) for u in users]
 
 
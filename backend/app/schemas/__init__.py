@@ -1,10 +1,10 @@
 # Schemas module
 from app.schemas.user import UserCreate, UserUpdate, UserResponse
-from app.schemas.auth import LoginRequest, TokenResponse
+from app.schemas.auth import LoginRequest, RefreshRequest, TokenResponse
 from app.schemas.leave import LeaveRequestCreate, LeaveRequestUpdate, LeaveRequestResponse
 
 __all__ = [
     "UserCreate", "UserUpdate", "UserResponse",
-    "LoginRequest", "TokenResponse",
+    "LoginRequest", "RefreshRequest", "TokenResponse",
     "LeaveRequestCreate", "LeaveRequestUpdate", "LeaveRequestResponse"
 ]
@@ -1,4 +1,5 @@
 """Schémas Pydantic pour l'authentification"""
+from typing import Optional
 from pydantic import BaseModel
 
 
@@ -8,10 +9,17 @@ class LoginRequest(BaseModel):
     password: str
 
 
+class RefreshRequest(BaseModel):
+    """Demande de rafraîchissement ou de déconnexion"""
+    refresh_token: str
+
+
 class TokenResponse(BaseModel):
     """Réponse avec token"""
     access_token: str
     token_type: str = "bearer"
+    expires_in: int
+    refresh_token: Optional[str] = None
     user_id: int
     username: str
     role: str
@@ -2,6 +2,7 @@
 from pydantic import BaseModel, validator
 from datetime import datetime
 from typing import Optional
+from app.models.leave_event import LeaveEventType
 from app.models.leave_request import LeaveStatus, LeaveType
 
 
@@ -26,12 +27,18 @@ class LeaveRequestCreate(LeaveRequestBase):
 
 
 class LeaveRequestUpdate(BaseModel):
-    """Schéma pour mettre à jour une demande de congé"""
+    """Schéma pour mettre à jour une demande de congé
+
+    Le statut ne se modifie pas ici (approve / reject): un champ inconnu,
+    `status` compris, est refusé (422) plutôt qu'ignoré.
+    """
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
     leave_type: Optional[LeaveType] = None
     comment: Optional[str] = None
-    status: Optional[LeaveStatus] = None
+
+    class Config:
+        extra = "forbid"
 
 
 class LeaveRequestResponse(LeaveRequestBase):
@@ -45,6 +52,7 @@ class LeaveRequestResponse(LeaveRequestBase):
     calendar_event_id: Optional[str] = None
     created_at: datetime
     updated_at: datetime
+    version: int = 1
     
     # Champs calculés
     number_of_days: int
@@ -57,8 +65,12 @@ class LeaveRequestResponse(LeaveRequestBase):
         orm_mode = True
 
     @staticmethod
-    def from_orm(leave_request):
-        """Créer une réponse à partir d'un objet ORM"""
+    def from_orm(leave_request, names: Optional[dict] = None):
+        """Créer une réponse à partir d'un objet ORM
+
+        `names` ({user_id: (username, email)}) remplace les relations `user` et
+        `approved_by`, qui ne sont alors pas chargées.
+        """
         # Calculer le nombre de jours
         delta = leave_request.end_date - leave_request.start_date
         # Inclure le jour de début et de fin
@@ -81,9 +93,17 @@ class LeaveRequestResponse(LeaveRequestBase):
             "calendar_event_id": leave_request.calendar_event_id,
             "created_at": leave_request.created_at,
             "updated_at": leave_request.updated_at,
+            "version": leave_request.version,
             "number_of_days": number_of_days,
         }
         
+        if names is not None:
+            if leave_request.user_id in names:
+                data["employee_name"], data["employee_email"] = names[leave_request.user_id]
+            if leave_request.approved_by_id in names:
+                data["approved_by_name"] = names[leave_request.approved_by_id][0]
+            return LeaveRequestResponse(**data)
+        
         # Ajouter les informations de l'employé si disponibles
         if hasattr(leave_request, 'user') and leave_request.user:
             data["employee_name"] = leave_request.user.username
@@ -93,4 +113,22 @@ class LeaveRequestResponse(LeaveRequestBase):
         if hasattr(leave_request, 'approved_by') and leave_request.approved_by:
             data["approved_by_name"] = leave_request.approved_by.username
         
-        return LeaveRequestResponse(**data)
\ No newline at end of file
+        return LeaveRequestResponse(**data)
+
+class LeaveSearchResult(LeaveRequestResponse):
+    """Congé trouvé par la recherche plein texte, avec son score"""
+    rank: float
+
+
+class LeaveEventResponse(BaseModel):
+    """Événement de la chronologie d'une demande, avec l'état rejoué après lui"""
+    id: Optional[int] = None  # None: encore en file d'écriture
+    leave_id: int
+    version: int
+    event_type: LeaveEventType
+    status: LeaveStatus
+    actor_id: Optional[int] = None
+    actor_name: Optional[str] = None
+    changes: dict
+    state: dict
+    occurred_at: datetime
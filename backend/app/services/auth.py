@@ -1,9 +1,34 @@
 """Service d'authentification"""
+import hashlib
+import logging
+import secrets
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from sqlalchemy import update
 from sqlalchemy.orm import Session
+from app.models.refresh_token import RefreshToken
 from app.models.user import User
-from app.core.security import hash_password, verify_password, create_access_token
+from app.core.cache import CacheError, get_cache
+from app.core.config import settings
+from app.core.metrics import REGISTRY, Counter
+from app.core.security import hash_password, verify_password, verify_dummy_password, create_access_token
 from app.schemas.user import UserCreate
 
+logger = logging.getLogger(__name__)
+
+LOGIN_FAILURES = REGISTRY.register(Counter(
+    "auth_login_failures_total", "Connexions refusées", ["reason"],
+))
+
+
+class LoginLockedError(ValueError):
+    """Connexion refusée sans vérification: identifiant ou IP verrouillé"""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"Trop de tentatives de connexion, réessayez dans {int(retry_after) + 1} secondes")
+
 
 class AuthService:
     """Service pour la gestion de l'authentification"""
@@ -34,16 +59,86 @@ class AuthService:
         return user
     
     @staticmethod
-    def authenticate(db: Session, username: str, password: str) -> User:
-        """Authentifier un utilisateur"""
+    def _lockout_keys(username: str, client_ip: Optional[str]) -> list:
+        """(clé de comptage, clé de verrou, seuil) pour l'identifiant et l'IP"""
+        keys = [(
+            f"login:failures:user:{username.strip().lower()}",
+            f"login:locked:user:{username.strip().lower()}",
+            settings.LOGIN_MAX_FAILURES,
+        )]
+        if client_ip:
+            keys.append((
+                f"login:failures:ip:{client_ip}",
+                f"login:locked:ip:{client_ip}",
+                settings.LOGIN_MAX_FAILURES_PER_IP,
+            ))
+        return keys
+    
+    @staticmethod
+    def check_lockout(username: str, client_ip: Optional[str] = None) -> None:
+        """Refuser d'emblée (ni requête SQL ni bcrypt) un identifiant ou une IP verrouillés"""
+        now = time.time()
+        try:
+            cache = get_cache()
+            locked_until = max(
+                (cache.get(lock_key) or 0.0 for _, lock_key, _ in AuthService._lockout_keys(username, client_ip)),
+                default=0.0
+            )
+        except CacheError as e:
+            logger.warning("Verrouillage des connexions indisponible: %s", e)
+            return
+        
+        if locked_until > now:
+            LOGIN_FAILURES.inc(1, "locked")
+            raise LoginLockedError(locked_until - now)
+    
+    @staticmethod
+    def record_failure(username: str, client_ip: Optional[str] = None) -> None:
+        """Compter un échec; au-delà du seuil, verrouiller avec une durée qui double"""
+        LOGIN_FAILURES.inc(1, "invalid")
+        try:
+            cache = get_cache()
+            for failures_key, lock_key, threshold in AuthService._lockout_keys(username, client_ip):
+                failures = cache.incr(failures_key, 1, ttl=settings.LOGIN_FAILURE_WINDOW_SECONDS)
+                if failures >= threshold:
+                    duration = min(
+                        settings.LOGIN_LOCKOUT_SECONDS * 2 ** (failures - threshold),
+                        settings.LOGIN_LOCKOUT_MAX_SECONDS
+                    )
+                    cache.set(lock_key, time.time() + duration, ttl=duration)
+        except CacheError as e:
+            logger.warning("Verrouillage des connexions indisponible: %s", e)
+    
+    @staticmethod
+    def clear_failures(username: str) -> None:
+        """Remettre à zéro les échecs de l'identifiant (pas ceux de l'IP) après un succès"""
+        (failures_key, lock_key, _), = AuthService._lockout_keys(username, None)
+        try:
+            get_cache().delete(failures_key, lock_key)
+        except CacheError as e:
+            logger.warning("Verrouillage des connexions indisponible: %s", e)
+    
+    @staticmethod
+    def authenticate(db: Session, username: str, password: str, client_ip: Optional[str] = None) -> User:
+        """Authentifier un utilisateur
+        
+        Lève LoginLockedError (avant toute requête SQL) si l'identifiant ou l'IP
+        est verrouillé après trop d'échecs.
+        """
+        AuthService.check_lockout(username, client_ip)
+        
         user = db.query(User).filter(User.username == username).first()
         
-        if not user or not verify_password(password, user.hashed_password):
+        # Identifiant inconnu: même coût bcrypt qu'un mauvais mot de passe
+        valid = verify_password(password, user.hashed_password) if user else verify_dummy_password(password)
+        if not valid:
+            AuthService.record_failure(username, client_ip)
             raise ValueError("Identifiants invalides")
         
         if not user.is_active:
             raise ValueError("Utilisateur désactivé")
         
+        AuthService.clear_failures(username)
         return user
     
     @staticmethod
@@ -55,3 +150,108 @@ class AuthService:
             "role": user.role.value
         }
         return create_access_token(token_data)
+    
+    @staticmethod
+    def _hash_refresh_token(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+    
+    @staticmethod
+    def create_refresh_token(db: Session, user: User, family_id: Optional[str] = None) -> str:
+        """Émettre un jeton de rafraîchissement (nouvelle session si family_id est None)
+        
+        `user` est détaché de la session avant le commit: ses colonnes restent
+        lisibles pour la réponse, sans SELECT de rechargement.
+        """
+        token = secrets.token_urlsafe(32)
+        db.expunge(user)
+        db.add(RefreshToken(
+            user_id=user.id,
+            token_hash=AuthService._hash_refresh_token(token),
+            family_id=family_id or secrets.token_hex(16),
+            expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        ))
+        db.commit()
+        return token
+    
+    @staticmethod
+    def _recently_replaced(db: Session, stored: RefreshToken, now: datetime) -> bool:
+        """Jeton remplacé depuis moins de REFRESH_TOKEN_REUSE_GRACE_SECONDS, session encore active
+        
+        Cas légitimes: deux onglets qui rafraîchissent en même temps avec le
+        même jeton, ou réponse du rafraîchissement perdue sur le réseau.
+        """
+        revoked_at = db.query(RefreshToken.revoked_at).filter(RefreshToken.id == stored.id).scalar()
+        if revoked_at is None or now - revoked_at > timedelta(seconds=settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS):
+            return False
+        # Déconnexion ou session révoquée: plus aucun jeton actif dans la famille
+        return db.query(RefreshToken.id).filter(
+            RefreshToken.family_id == stored.family_id, RefreshToken.revoked_at.is_(None)
+        ).first() is not None
+    
+    @staticmethod
+    def rotate_refresh_token(db: Session, token: str) -> Tuple[User, str]:
+        """Échanger un jeton de rafraîchissement contre un nouveau (sans bcrypt)
+        
+        Le jeton présenté est révoqué. S'il l'était déjà (jeton volé puis
+        réutilisé), toute la session est révoquée, sauf s'il vient d'être
+        remplacé (`_recently_replaced`): un autre jeton de la session est émis.
+        """
+        stored = db.query(RefreshToken).filter(
+            RefreshToken.token_hash == AuthService._hash_refresh_token(token)
+        ).first()
+        
+        if not stored:
+            raise ValueError("Jeton de rafraîchissement invalide")
+        
+        now = datetime.utcnow()
+        # Révocation conditionnelle: deux rafraîchissements concurrents ne peuvent pas réussir tous les deux
+        revoked = db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.id == stored.id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+        ).rowcount
+        
+        if not revoked and not AuthService._recently_replaced(db, stored, now):
+            AuthService.revoke_family(db, stored.family_id)
+            logger.warning("Réutilisation d'un jeton de rafraîchissement révoqué (utilisateur %s)", stored.user_id)
+            raise ValueError("Jeton de rafraîchissement révoqué")
+        
+        if stored.expires_at <= now:
+            db.commit()
+            raise ValueError("Jeton de rafraîchissement expiré")
+        
+        user = db.query(User).filter(User.id == stored.user_id).first()
+        if not user or not user.is_active or user.is_deleted:
+            AuthService.revoke_family(db, stored.family_id)
+            raise ValueError("Utilisateur désactivé")
+        
+        return user, AuthService.create_refresh_token(db, user, stored.family_id)
+    
+    @staticmethod
+    def revoke_family(db: Session, family_id: str) -> None:
+        """Révoquer tous les jetons d'une session"""
+        db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.utcnow())
+        )
+        db.commit()
+    
+    @staticmethod
+    def revoke_refresh_token(db: Session, token: str) -> None:
+        """Déconnexion: révoquer la session du jeton (sans erreur s'il est inconnu)"""
+        stored = db.query(RefreshToken.family_id).filter(
+            RefreshToken.token_hash == AuthService._hash_refresh_token(token)
+        ).first()
+        if stored:
+            AuthService.revoke_family(db, stored.family_id)
+    
+    @staticmethod
+    def purge_refresh_tokens(db: Session, older_than_days: int = 0) -> int:
+        """Supprimer les jetons expirés ou révoqués depuis plus de `older_than_days` jours"""
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        deleted = db.query(RefreshToken).filter(
+            (RefreshToken.expires_at < cutoff) | (RefreshToken.revoked_at < cutoff)
+        ).delete(synchronize_session=False)
+        db.commit()
+        return deleted
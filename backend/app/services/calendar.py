@@ -0,0 +1,247 @@
+"""Service du calendrier d'équipe (congés validés), avec cache mensuel"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.cache import CacheError, get_cache
+from app.models.leave_request import LeaveRequest, LeaveStatus
+from app.schemas.leave import LeaveRequestResponse
+
+logger = logging.getLogger(__name__)
+
+# Périmètre du calendrier: toute l'organisation (clé prévue pour un découpage par équipe)
+DEFAULT_SCOPE = "all"
+
+# Étiquette commune des mois en cache (invalidation globale du calendrier)
+CALENDAR_TAG = "calendar"
+
+# Format des instantanés (LeaveRequestResponse sérialisées): à incrémenter quand
+# le schéma change, pour ne pas relire ceux d'une version précédente du code
+SNAPSHOT_FORMAT = 2
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(value: datetime) -> datetime:
+    return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _months_between(from_date: datetime, to_date: datetime) -> List[datetime]:
+    months, current = [], _month_start(from_date)
+    while current <= to_date:
+        months.append(current)
+        current = _next_month(current)
+    return months
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Les dates sont stockées en UTC sans fuseau"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _overlaps(response: LeaveRequestResponse, from_date: datetime, to_date: datetime) -> bool:
+    return response.start_date <= to_date and response.end_date >= from_date
+
+
+class CalendarService:
+    """Calendrier d'équipe servi depuis des instantanés mensuels
+
+    Chaque mois est chargé une fois puis gardé dans le cache partagé
+    (`calendar:v<format>:<périmètre>:AAAA-MM` -> {leave_id: (réponse, username, email)});
+    les validations et refus mettent à jour les mois déjà en cache au lieu de
+    les recalculer.
+    """
+
+    @staticmethod
+    def _key(scope: str, month: datetime) -> str:
+        return f"calendar:v{SNAPSHOT_FORMAT}:{scope}:{month.strftime('%Y-%m')}"
+
+    @staticmethod
+    def _entry(leave: LeaveRequest) -> tuple:
+        user = leave.user
+        return (
+            LeaveRequestResponse.from_orm(leave),
+            user.username if user else "Unknown",
+            user.email if user else "",
+        )
+
+    @staticmethod
+    def _load_months(db: Session, scope: str, months: List[datetime]) -> Dict[str, dict]:
+        """Charger plusieurs mois en une requête et les mettre en cache"""
+        period_start = months[0]
+        period_end = _next_month(months[-1]) - timedelta(microseconds=1)
+
+        leaves = db.query(LeaveRequest).options(
+            joinedload(LeaveRequest.user),
+            joinedload(LeaveRequest.approved_by)
+        ).filter(
+            LeaveRequest.status == LeaveStatus.APPROVED,
+            LeaveRequest.start_date <= period_end,
+            LeaveRequest.end_date >= period_start
+        ).order_by(LeaveRequest.start_date).all()
+
+        buckets = {CalendarService._key(scope, month): {} for month in months}
+        for leave in leaves:
+            entry = CalendarService._entry(leave)
+            for month in months:
+                if _overlaps(entry[0], month, _next_month(month) - timedelta(microseconds=1)):
+                    buckets[CalendarService._key(scope, month)][leave.id] = entry
+
+        cache = get_cache()
+        for key, bucket in buckets.items():
+            cache.set(key, bucket, tags=(CALENDAR_TAG,))
+        return buckets
+
+    @staticmethod
+    def _get_months(db: Session, scope: str, months: List[datetime]) -> Dict[str, dict]:
+        cache = get_cache()
+        buckets = {}
+        missing = []
+        for month in months:
+            key = CalendarService._key(scope, month)
+            bucket = cache.get(key)
+            if bucket is None:
+                missing.append(month)
+            else:
+                buckets[key] = bucket
+
+        if missing:
+            # Un seul chargement à la fois par périmètre: les autres relisent le cache
+            with cache.lock(f"calendar:{scope}:load"):
+                still_missing = []
+                for month in missing:
+                    key = CalendarService._key(scope, month)
+                    bucket = cache.get(key)
+                    if bucket is None:
+                        still_missing.append(month)
+                    else:
+                        buckets[key] = bucket
+                if still_missing:
+                    buckets.update(CalendarService._load_months(db, scope, still_missing))
+        return buckets
+
+    @staticmethod
+    def _entries(db: Session, from_date: datetime, to_date: datetime, scope: str) -> List[tuple]:
+        """Entrées (réponse, username, email) de la période, triées par date de début"""
+        months = _months_between(from_date, to_date)
+        buckets = CalendarService._get_months(db, scope, months) if months else {}
+
+        entries = {}
+        for bucket in buckets.values():
+            for leave_id, entry in bucket.items():
+                if _overlaps(entry[0], from_date, to_date):
+                    entries[leave_id] = entry
+        return sorted(entries.values(), key=lambda e: (e[0].start_date, e[0].id))
+
+    @staticmethod
+    def get_team_calendar(db: Session, from_date: datetime, to_date: datetime,
+                          scope: str = DEFAULT_SCOPE) -> List[dict]:
+        """Congés validés sur la période, groupés par utilisateur"""
+        from_date, to_date = _naive_utc(from_date), _naive_utc(to_date)
+
+        by_user = {}
+        for response, username, email in CalendarService._entries(db, from_date, to_date, scope):
+            if response.user_id not in by_user:
+                by_user[response.user_id] = {
+                    "user_id": response.user_id,
+                    "username": username,
+                    "email": email,
+                    "leaves": []
+                }
+            by_user[response.user_id]["leaves"].append(response)
+
+        return list(by_user.values())
+
+    @staticmethod
+    def get_day_index(db: Session, from_date: datetime, to_date: datetime,
+                      scope: str = DEFAULT_SCOPE) -> dict:
+        """Calendrier indexé par jour, prêt à afficher
+
+        `days` associe chaque date (AAAA-MM-JJ) aux identifiants des congés
+        validés ce jour-là; les congés (`leaves`) et les utilisateurs (`users`)
+        n'apparaissent qu'une fois. Construit en un seul passage sur les jours
+        couverts par chaque congé: le client affiche une case en lisant
+        `days[date]`, sans parcourir tous les congés.
+        """
+        from_date, to_date = _naive_utc(from_date), _naive_utc(to_date)
+        users, leaves, days = {}, {}, {}
+
+        for response, username, email in CalendarService._entries(db, from_date, to_date, scope):
+            if response.user_id not in users:
+                users[response.user_id] = {"username": username, "email": email}
+            leaves[response.id] = {
+                "user_id": response.user_id,
+                "leave_type": response.leave_type.value,
+                "start": response.start_date.date().isoformat(),
+                "end": response.end_date.date().isoformat(),
+            }
+
+            day = max(response.start_date, from_date).date()
+            last = min(response.end_date, to_date).date()
+            while day <= last:
+                days.setdefault(day.isoformat(), []).append(response.id)
+                day += timedelta(days=1)
+
+        return {
+            "from": from_date.date().isoformat(),
+            "to": to_date.date().isoformat(),
+            "users": users,
+            "leaves": leaves,
+            "days": days,
+        }
+
+    @staticmethod
+    def apply_leave(leave: LeaveRequestResponse, scope: str = DEFAULT_SCOPE) -> None:
+        """Répercuter un congé traité sur les mois en cache qu'il recouvre
+
+        Seules les demandes en attente sont modifiables: un congé validé ne
+        change plus de dates, ses mois suffisent donc à le retrouver. Un mois
+        absent du cache n'est pas créé; s'il est en cours de chargement, la
+        mise à jour attend la fin du chargement (même verrou).
+
+        Appelé après le commit: ne lève pas. Cache en erreur: les mois du congé
+        sont supprimés (rechargés depuis la base à la prochaine lecture).
+        """
+        entry = None
+        if leave.status == LeaveStatus.APPROVED:
+            entry = (leave, leave.employee_name or "Unknown", leave.employee_email or "")
+
+        def apply(bucket: dict) -> dict:
+            # Copie puis remplacement: les lecteurs concurrents gardent un instantané cohérent
+            bucket = dict(bucket)
+            if entry is not None:
+                bucket[leave.id] = entry
+            else:
+                bucket.pop(leave.id, None)
+            return bucket
+
+        cache = get_cache()
+        keys = [CalendarService._key(scope, month) for month in _months_between(leave.start_date, leave.end_date)]
+        try:
+            missing = [key for key in keys if not cache.update(key, apply, tags=(CALENDAR_TAG,))]
+            if missing:
+                # Un chargement en cours (`_get_months`) a pu lire la base avant ce
+                # congé: attendre qu'il ait écrit ses mois, puis les corriger
+                with cache.lock(f"calendar:{scope}:load") as acquired:
+                    for key in missing:
+                        if acquired:
+                            cache.update(key, apply, tags=(CALENDAR_TAG,))
+                        else:
+                            cache.delete(key)
+        except CacheError as e:
+            logger.warning("Calendrier en cache non mis à jour pour le congé %s: %s", leave.id, e)
+            try:
+                cache.delete(*keys)
+            except CacheError as e:
+                logger.error("Mois du calendrier %r non invalidés (jusqu'à expiration): %s", keys, e)
+
+    @staticmethod
+    def invalidate() -> None:
+        """Oublier tous les mois en cache (import en masse, suppression d'utilisateur...)"""
+        get_cache().invalidate_tags(CALENDAR_TAG)
@@ -0,0 +1,116 @@
+"""Données d'amorçage des tableaux de bord (une requête HTTP par chargement)"""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Callable, Dict
+
+from sqlalchemy.orm import Session
+
+from app.core.config import Role, settings
+from app.core.database import get_session
+from app.models.user import User
+from app.schemas.leave import LeaveRequestResponse
+from app.schemas.user import UserResponse
+from app.services.calendar import CalendarService
+from app.services.leave import LeaveService
+from app.services.user import UserService
+
+Section = Callable[[Session], Any]
+
+# Vue demandée -> rôles autorisés
+ROLE_VIEWS = {
+    "employee": (Role.EMPLOYEE, Role.MANAGER, Role.ADMIN),
+    "manager": (Role.MANAGER, Role.ADMIN),
+    "admin": (Role.ADMIN,),
+}
+
+
+@lru_cache(maxsize=None)
+def get_executor() -> ThreadPoolExecutor:
+    """Threads partagés par toutes les requêtes (créés au premier tableau de bord parallèle)"""
+    return ThreadPoolExecutor(max_workers=settings.DASHBOARD_PARALLEL_QUERIES, thread_name_prefix="dashboard")
+
+
+def _leaves(leaves) -> list:
+    return [LeaveRequestResponse.from_orm(leave).model_dump(mode="json") for leave in leaves]
+
+
+def _run_in_session(section: Section) -> Any:
+    db = get_session()
+    try:
+        return section(db)
+    finally:
+        db.close()
+
+
+class DashboardService:
+    """Sections indépendantes d'un tableau de bord, exécutées en parallèle si possible"""
+
+    @staticmethod
+    def sections(user: User, role_view: str, year: int, month_start: datetime, month_end: datetime) -> Dict[str, Section]:
+        """Requêtes nécessaires à chaque vue (chacune reçoit sa session)"""
+        # Lu ici: `user` appartient à la session de la requête, pas aux threads des sections
+        user_id = user.id
+        if role_view == "employee":
+            return {
+                "my_requests": lambda db: _leaves(LeaveService.list_user_leaves(db, user_id, year)),
+                "team_calendar": lambda db: [
+                    {**group, "leaves": [leave.model_dump(mode="json") for leave in group["leaves"]]}
+                    for group in CalendarService.get_team_calendar(db, month_start, month_end)
+                ],
+            }
+        if role_view == "manager":
+            return {
+                "statistics": LeaveService.get_statistics,
+                "leaves": lambda db: _leaves(LeaveService.list_all_leaves(db, year=year)),
+            }
+        return {
+            "statistics": LeaveService.get_statistics,
+            "users": lambda db: [
+                UserResponse.from_orm(u).model_dump(mode="json") for u in UserService.list_users(db)
+            ],
+        }
+
+    @staticmethod
+    def run_sections(db: Session, sections: Dict[str, Section]) -> Dict[str, Any]:
+        """PostgreSQL: une session (connexion) par section, en parallèle
+
+        SQLite, ou DASHBOARD_PARALLEL_QUERIES <= 1: à la suite, sur la session
+        de la requête.
+        """
+        parallel = settings.DASHBOARD_PARALLEL_QUERIES
+        if parallel <= 1 or len(sections) <= 1 or db.get_bind().dialect.name != "postgresql":
+            return {name: section(db) for name, section in sections.items()}
+
+        # Rendre au pool la connexion de la requête (chargement de l'utilisateur)
+        # avant d'en emprunter une par section
+        db.commit()
+        # Chaque section dans une copie du contexte de la requête: l'audit SQL
+        # (current_audit) compte aussi les requêtes des threads
+        futures = {
+            name: get_executor().submit(contextvars.copy_context().run, _run_in_session, section)
+            for name, section in sections.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+    @staticmethod
+    def get_dashboard(db: Session, user: User, role_view: str, year: int, month: int) -> dict:
+        """Tout ce qu'affiche la vue au chargement"""
+        if role_view not in ROLE_VIEWS:
+            raise ValueError(f"Vue inconnue: {role_view} (employee, manager ou admin)")
+        if not 1 <= month <= 12:
+            raise ValueError("Le mois doit être compris entre 1 et 12")
+
+        month_start = datetime(year, month, 1)
+        month_end = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(seconds=1)
+
+        payload = {
+            "role_view": role_view,
+            "year": year,
+            "month": month_start.strftime("%Y-%m"),
+            "user": UserResponse.from_orm(user).model_dump(mode="json"),
+        }
+        sections = DashboardService.sections(user, role_view, year, month_start, month_end)
+        payload.update(DashboardService.run_sections(db, sections))
+        return payload
@@ -0,0 +1,135 @@
+"""Service de carte de chaleur des absences (nombre d'absents par jour)"""
+import logging
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import CacheError, get_cache
+from app.models.leave_request import LeaveRequest, LeaveStatus
+from app.models.team import Team, team_members
+
+logger = logging.getLogger(__name__)
+
+# Clé de cache: (team_id, année); team_id None = toute l'organisation
+CacheKey = Tuple[Optional[int], int]
+
+
+class HeatmapService:
+    """Absences quotidiennes par équipe, calculées par tableaux de différences
+
+    Pour chaque congé validé: +1 au jour de début, -1 au lendemain du jour de
+    fin, puis somme cumulée sur l'année. Le coût est O(congés + jours) par
+    équipe au lieu de O(congés × jours). Les séries sont mises dans le cache
+    partagé par (équipe, année) et invalidées à la validation d'un congé.
+    """
+
+    @staticmethod
+    def _key(key: CacheKey) -> str:
+        team_id, year = key
+        return f"heatmap:{'all' if team_id is None else team_id}:{year}"
+
+    @staticmethod
+    def compute_year(db: Session, year: int) -> Dict[CacheKey, List[int]]:
+        """Calculer les séries de l'année pour toutes les équipes et l'organisation"""
+        import numpy as np
+
+        year_start = datetime(year, 1, 1)
+        year_end = datetime(year, 12, 31, 23, 59, 59)
+        days = (date(year, 12, 31) - date(year, 1, 1)).days + 1
+
+        rows = db.query(
+            LeaveRequest.id, LeaveRequest.start_date, LeaveRequest.end_date, team_members.c.team_id
+        ).outerjoin(
+            team_members, team_members.c.user_id == LeaveRequest.user_id
+        ).filter(
+            LeaveRequest.status == LeaveStatus.APPROVED,
+            LeaveRequest.start_date <= year_end,
+            LeaveRequest.end_date >= year_start,
+        ).all()
+
+        team_ids = [team_id for (team_id,) in db.query(Team.id).filter(Team.is_active == True)]  # noqa: E712
+        result: Dict[CacheKey, List[int]] = {}
+
+        if rows:
+            leave_ids, starts, ends, teams = zip(*rows)
+            origin = np.datetime64(f"{year}-01-01", "D")
+            start_idx = np.clip((np.array(starts, dtype="datetime64[D]") - origin).astype(np.int64), 0, days - 1)
+            end_idx = np.clip((np.array(ends, dtype="datetime64[D]") - origin).astype(np.int64), 0, days - 1)
+
+            # Organisation: un congé compte une fois même si l'employé est dans plusieurs équipes
+            _, first = np.unique(np.array(leave_ids), return_index=True)
+            total = np.zeros(days + 1, dtype=np.int64)
+            np.add.at(total, start_idx[first], 1)
+            np.add.at(total, end_idx[first] + 1, -1)
+            result[(None, year)] = np.cumsum(total)[:-1].tolist()
+
+            # Équipes: une ligne du tableau de différences par équipe
+            row_of = {team_id: i for i, team_id in enumerate(team_ids)}
+            team_idx = np.array([row_of.get(t, -1) for t in teams], dtype=np.int64)
+            in_team = team_idx >= 0
+            diff = np.zeros((len(team_ids), days + 1), dtype=np.int64)
+            np.add.at(diff, (team_idx[in_team], start_idx[in_team]), 1)
+            np.add.at(diff, (team_idx[in_team], end_idx[in_team] + 1), -1)
+            counts = np.cumsum(diff, axis=1)[:, :-1]
+            for team_id, i in row_of.items():
+                result[(team_id, year)] = counts[i].tolist()
+        else:
+            result[(None, year)] = [0] * days
+            for team_id in team_ids:
+                result[(team_id, year)] = [0] * days
+
+        return result
+
+    @staticmethod
+    def get_heatmap(db: Session, year: int, team_id: Optional[int] = None) -> dict:
+        """Absences par jour de l'année, pour une équipe ou pour toutes"""
+        teams = db.query(Team.id, Team.name).filter(Team.is_active == True)  # noqa: E712
+        if team_id is not None:
+            teams = teams.filter(Team.id == team_id)
+        teams = teams.order_by(Team.id).all()
+
+        keys = [(None, year)] + [(t.id, year) for t in teams]
+        cache = get_cache()
+        cached = {key: cache.get(HeatmapService._key(key)) for key in keys}
+
+        if any(series is None for series in cached.values()):
+            # Un seul calcul de l'année à la fois, tous workers confondus
+            with cache.lock(f"heatmap:compute:{year}"):
+                cached = {key: cache.get(HeatmapService._key(key)) for key in keys}
+                if any(series is None for series in cached.values()):
+                    computed = HeatmapService.compute_year(db, year)
+                    for key, series in computed.items():
+                        cache.set(HeatmapService._key(key), series, tags=(f"heatmap:{year}",))
+                    cached = {key: computed.get(key, [0] * len(computed[(None, year)])) for key in keys}
+
+        return {
+            "year": year,
+            "start": date(year, 1, 1).isoformat(),
+            "days": len(cached[(None, year)]),
+            "total": cached[(None, year)],
+            "teams": [
+                {"team_id": t.id, "name": t.name, "counts": cached[(t.id, year)]}
+                for t in teams
+            ],
+        }
+
+    @staticmethod
+    def invalidate(years: Iterable[int], team_ids: Iterable[int] = ()) -> None:
+        """Oublier les séries des années (et équipes) touchées par un changement"""
+        years = set(years)
+        keys = {(None, year) for year in years} | {(t, year) for t in team_ids for year in years}
+        try:
+            get_cache().delete(*(HeatmapService._key(key) for key in keys))
+        except CacheError as e:
+            # Appelé après le commit de l'écriture: ne pas la faire échouer
+            logger.error("Séries de heatmap non invalidées (jusqu'à expiration): %s", e)
+
+    @staticmethod
+    def invalidate_leave(db: Session, leave_request: LeaveRequest) -> None:
+        """Invalider les séries concernées par un congé (ses années, les équipes de l'employé)"""
+        years = range(leave_request.start_date.year, leave_request.end_date.year + 1)
+        team_ids = [team_id for (team_id,) in db.query(team_members.c.team_id).filter(
+            team_members.c.user_id == leave_request.user_id
+        )]
+        HeatmapService.invalidate(years, team_ids)
@@ -1,38 +1,107 @@
 """Service pour la gestion des congés"""
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import datetime
-from app.models.leave_request import LeaveRequest, LeaveStatus, LeaveType
-from app.schemas.leave import LeaveRequestCreate, LeaveRequestUpdate
+from app.models.leave_event import LeaveEventType
+from app.models.leave_request import IS_PENDING, LeaveRequest, LeaveStatus, LeaveType
+from app.schemas.leave import LeaveRequestCreate, LeaveRequestResponse, LeaveRequestUpdate
+from app.services.calendar import CalendarService
+from app.services.heatmap import HeatmapService
+from app.services.leave_events import LeaveEventService
+from app.services.partitions import year_bounds
+from app.services.user import UserService
+
+
+class LeaveConflictError(ValueError):
+    """Écriture refusée: la demande a changé (version) ou a déjà été traitée"""
+
+    def __init__(self, message: str, version: int):
+        self.version = version
+        super().__init__(message)
 
 
 class LeaveService:
     """Service pour gérer les demandes de congé"""
     
     @staticmethod
-    def create_leave_request(db: Session, user_id: int, leave_data: LeaveRequestCreate) -> LeaveRequest:
-        """Créer une nouvelle demande de congé"""
+    def _response(db: Session, leave_request: LeaveRequest) -> LeaveRequestResponse:
+        """Réponse construite des colonnes renvoyées et des noms en cache (sans relation)"""
+        names = UserService.get_names(db, (leave_request.user_id, leave_request.approved_by_id))
+        return LeaveRequestResponse.from_orm(leave_request, names)
+    
+    @staticmethod
+    def _write_error(db: Session, leave_id: int, processed_message: str, user_id: Optional[int] = None) -> ValueError:
+        """Cause d'un UPDATE conditionnel qui n'a touché aucune ligne"""
+        row = db.query(LeaveRequest.user_id, LeaveRequest.status, LeaveRequest.version).filter(
+            LeaveRequest.id == leave_id
+        ).first()
+        if row is None:
+            return ValueError("Demande de congé non trouvée")
+        if user_id is not None and row.user_id != user_id:
+            return ValueError("Vous n'avez pas le droit de modifier cette demande")
+        if row.status != LeaveStatus.PENDING:
+            return LeaveConflictError(processed_message, row.version)
+        return LeaveConflictError(
+            f"La demande a été modifiée entre-temps (version actuelle: {row.version})", row.version
+        )
+    
+    @staticmethod
+    def _update_pending(db: Session, leave_id: int, values: dict, processed_message: str,
+                        event_type: LeaveEventType, actor_id: int,
+                        user_id: Optional[int] = None, expected_version: Optional[int] = None) -> LeaveRequestResponse:
+        """UPDATE ... WHERE status = PENDING [AND version = ...] RETURNING
+
+        Vérification et écriture en une requête, sans verrou: de deux validations
+        concurrentes, la seconde ne trouve plus de ligne en attente et reçoit un
+        LeaveConflictError. `expected_version` (If-Match) protège aussi les
+        modifications d'une demande encore en attente. La transition est
+        journalisée (leave_events) avec les valeurs écrites.
+        """
+        conditions = [LeaveRequest.id == leave_id, LeaveRequest.status == LeaveStatus.PENDING]
+        if user_id is not None:
+            conditions.append(LeaveRequest.user_id == user_id)
+        if expected_version is not None:
+            conditions.append(LeaveRequest.version == expected_version)
+        
+        leave_request = db.execute(
+            update(LeaveRequest)
+            .where(*conditions)
+            .values(**values, updated_at=datetime.utcnow(), version=LeaveRequest.version + 1)
+            .returning(LeaveRequest)
+        ).scalar_one_or_none()
+        
+        if leave_request is None:
+            raise LeaveService._write_error(db, leave_id, processed_message, user_id)
+        
+        LeaveEventService.record(db, leave_request, event_type, actor_id, values)
+        response = LeaveService._response(db, leave_request)
+        db.commit()
+        return response
+    
+    @staticmethod
+    def create_leave_request(db: Session, user_id: int, leave_data: LeaveRequestCreate) -> LeaveRequestResponse:
+        """Créer une nouvelle demande de congé (INSERT ... RETURNING)"""
         # Vérifier que les dates sont valides
         if leave_data.end_date < leave_data.start_date:
             raise ValueError("La date de fin doit être après la date de début")
         
-        leave_request = LeaveRequest(
-            user_id=user_id,
-            start_date=leave_data.start_date,
-            end_date=leave_data.end_date,
-            leave_type=leave_data.leave_type,
-            comment=leave_data.comment,
-            status=LeaveStatus.PENDING
-        )
-        
-        db.add(leave_request)
+        values = {
+            "user_id": user_id,
+            "start_date": leave_data.start_date,
+            "end_date": leave_data.end_date,
+            "leave_type": leave_data.leave_type,
+            "comment": leave_data.comment,
+            "status": LeaveStatus.PENDING,
+        }
+        leave_request = db.execute(
+            insert(LeaveRequest).values(**values).returning(LeaveRequest)
+        ).scalar_one()
+        
+        LeaveEventService.record(db, leave_request, LeaveEventType.CREATED, user_id, values)
+        response = LeaveService._response(db, leave_request)
         db.commit()
-        db.refresh(leave_request)
-        
-        # Charger les relations
-        db.refresh(leave_request, ['user'])
-        
-        return leave_request
+        return response
     
     @staticmethod
     def get_leave_request(db: Session, leave_id: int) -> Optional[LeaveRequest]:
@@ -51,9 +120,10 @@ class LeaveService:
         ).filter(LeaveRequest.user_id == user_id)
         
         if year:
-            query = query.filter(
-                db.func.extract('year', LeaveRequest.start_date) == year
-            )
+            # Intervalle sur start_date (et non extract): utilise l'index et
+            # limite la lecture à la partition de l'année sur PostgreSQL
+            start, end = year_bounds(year)
+            query = query.filter(LeaveRequest.start_date >= start, LeaveRequest.start_date < end)
         
         return query.order_by(LeaveRequest.start_date.desc()).all()
     
@@ -69,9 +139,10 @@ class LeaveService:
             query = query.filter(LeaveRequest.status == status)
         
         if year:
-            query = query.filter(
-                db.func.extract('year', LeaveRequest.start_date) == year
-            )
+            # Intervalle sur start_date (et non extract): utilise l'index et
+            # limite la lecture à la partition de l'année sur PostgreSQL
+            start, end = year_bounds(year)
+            query = query.filter(LeaveRequest.start_date >= start, LeaveRequest.start_date < end)
         
         return query.order_by(LeaveRequest.start_date.desc()).all()
     
@@ -81,9 +152,7 @@ class LeaveService:
         return db.query(LeaveRequest).options(
             joinedload(LeaveRequest.user),
             joinedload(LeaveRequest.approved_by)
-        ).filter(
-            LeaveRequest.status == LeaveStatus.PENDING
-        ).order_by(LeaveRequest.created_at.desc()).all()
+        ).filter(IS_PENDING).order_by(LeaveRequest.created_at.desc()).all()
     
     @staticmethod
     def list_team_leaves(db: Session, from_date: datetime, to_date: datetime) -> List[LeaveRequest]:
@@ -98,80 +167,56 @@ class LeaveService:
         ).order_by(LeaveRequest.start_date).all()
     
     @staticmethod
-    def update_leave_request(db: Session, leave_id: int, leave_data: LeaveRequestUpdate, user_id: int) -> LeaveRequest:
-        """Mettre à jour une demande de congé"""
-        leave_request = LeaveService.get_leave_request(db, leave_id)
-        
-        if not leave_request:
-            raise ValueError("Demande de congé non trouvée")
-        
-        if leave_request.user_id != user_id:
-            raise ValueError("Vous n'avez pas le droit de modifier cette demande")
-        
-        if leave_request.status != LeaveStatus.PENDING:
-            raise ValueError("Impossible de modifier une demande déjà traitée")
-        
-        # Mettre à jour les champs
-        update_data = leave_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(leave_request, field, value)
-        
-        leave_request.updated_at = datetime.utcnow()
+    def update_leave_request(db: Session, leave_id: int, leave_data: LeaveRequestUpdate, user_id: int,
+                             expected_version: Optional[int] = None) -> LeaveRequestResponse:
+        """Mettre à jour une demande de congé (seulement la sienne, en attente)"""
+        response = LeaveService._update_pending(
+            db, leave_id, leave_data.model_dump(exclude_unset=True),
+            "Impossible de modifier une demande déjà traitée",
+            LeaveEventType.UPDATED, user_id,
+            user_id=user_id, expected_version=expected_version
+        )
         
-        db.commit()
-        db.refresh(leave_request)
+        CalendarService.apply_leave(response)
         
-        return leave_request
+        return response
     
     @staticmethod
-    def approve_leave(db: Session, leave_id: int, approver_id: int) -> LeaveRequest:
+    def approve_leave(db: Session, leave_id: int, approver_id: int,
+                      expected_version: Optional[int] = None) -> LeaveRequestResponse:
         """Approuver une demande de congé"""
-        leave_request = LeaveService.get_leave_request(db, leave_id)
-        
-        if not leave_request:
-            raise ValueError("Demande de congé non trouvée")
+        response = LeaveService._update_pending(db, leave_id, {
+            "status": LeaveStatus.APPROVED,
+            "approved_by_id": approver_id,
+            "approved_at": datetime.utcnow(),
+        }, "Cette demande a déjà été traitée", LeaveEventType.APPROVED, approver_id,
+            expected_version=expected_version)
         
-        if leave_request.status != LeaveStatus.PENDING:
-            raise ValueError("Cette demande a déjà été traitée")
+        HeatmapService.invalidate_leave(db, response)
+        CalendarService.apply_leave(response)
         
-        leave_request.status = LeaveStatus.APPROVED
-        leave_request.approved_by_id = approver_id
-        leave_request.approved_at = datetime.utcnow()
-        leave_request.updated_at = datetime.utcnow()
-        
-        db.commit()
-        db.refresh(leave_request)
-        
-        return leave_request
+        return response
     
     @staticmethod
-    def reject_leave(db: Session, leave_id: int, reason: str, rejector_id: int) -> LeaveRequest:
+    def reject_leave(db: Session, leave_id: int, reason: str, rejector_id: int,
+                     expected_version: Optional[int] = None) -> LeaveRequestResponse:
         """Rejeter une demande de congé"""
-        leave_request = LeaveService.get_leave_request(db, leave_id)
-        
-        if not leave_request:
-            raise ValueError("Demande de congé non trouvée")
+        response = LeaveService._update_pending(db, leave_id, {
+            "status": LeaveStatus.REJECTED,
+            "rejection_reason": reason,
+            "approved_by_id": rejector_id,
+            "approved_at": datetime.utcnow(),
+        }, "Cette demande a déjà été traitée", LeaveEventType.REJECTED, rejector_id,
+            expected_version=expected_version)
         
-        if leave_request.status != LeaveStatus.PENDING:
-            raise ValueError("Cette demande a déjà été traitée")
+        CalendarService.apply_leave(response)
         
-        leave_request.status = LeaveStatus.REJECTED
-        leave_request.rejection_reason = reason
-        leave_request.approved_by_id = rejector_id
-        leave_request.approved_at = datetime.utcnow()
-        leave_request.updated_at = datetime.utcnow()
-        
-        db.commit()
-        db.refresh(leave_request)
-        
-        return leave_request
+        return response
     
     @staticmethod
     def get_statistics(db: Session) -> dict:
         """Obtenir les statistiques des congés"""
-        pending_count = db.query(LeaveRequest).filter(
-            LeaveRequest.status == LeaveStatus.PENDING
-        ).count()
+        pending_count = db.query(LeaveRequest).filter(IS_PENDING).count()
         
         approved_count = db.query(LeaveRequest).filter(
             LeaveRequest.status == LeaveStatus.APPROVED
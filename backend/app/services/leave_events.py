@@ -0,0 +1,315 @@
+"""Journal des demandes de congé (table leave_events, migration 0008)
+
+Chaque écriture sur une demande (création, modification, validation, refus)
+ajoute un événement: version et statut qui en résultent, auteur, valeurs
+écrites. `GET /api/leaves/{id}/timeline` rejoue ces événements.
+
+`LEAVE_EVENTS_DURABILITY`:
+
+- `async` (défaut): l'événement est mis en file au commit de la transaction
+  (rien n'est journalisé pour une écriture annulée) et un thread l'insère par
+  lots (`LEAVE_EVENTS_BATCH_SIZE`, `LEAVE_EVENTS_FLUSH_SECONDS`), hors du
+  chemin de la requête. La file est vidée à l'arrêt du worker; un processus
+  tué perd les événements encore en file.
+- `transactional`: l'événement est inséré dans la transaction de l'écriture
+  (un INSERT de plus par requête, aucune perte possible).
+
+Le thread signale son activité à la readiness (`/health/ready`, worker
+`leave_events`). Un lot en échec est retenté (`LEAVE_EVENTS_MAX_ATTEMPTS`),
+puis écrit événement par événement: un événement que la base refuse est
+abandonné et journalisé (`leave_events_lost_total{reason="rejected"}`), une
+base indisponible fait retenter le reste jusqu'à ce qu'elle réponde.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from enum import Enum
+from functools import lru_cache
+from typing import List, Optional
+
+from sqlalchemy import event, insert
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import get_session
+from app.core.health import heartbeat, register_worker, unregister_worker
+from app.core.metrics import REGISTRY, Counter, Gauge
+from app.models.leave_event import LeaveEvent, LeaveEventType
+from app.models.leave_request import LeaveRequest
+from app.services.user import UserService
+
+logger = logging.getLogger(__name__)
+
+WORKER_NAME = "leave_events"
+
+# Événements de la transaction en cours (mode async), mis en file au commit
+_SESSION_KEY = "leave_events"
+
+LEAVE_EVENTS_WRITTEN = REGISTRY.register(Counter(
+    "leave_events_written_total", "Événements de congé insérés dans leave_events",
+))
+LEAVE_EVENTS_OVERFLOW = REGISTRY.register(Counter(
+    "leave_events_overflow_total", "Événements écrits sur le chemin de la requête (file pleine)",
+))
+LEAVE_EVENTS_LOST = REGISTRY.register(Counter(
+    "leave_events_lost_total",
+    "Événements de congé abandonnés, conservés dans le journal applicatif "
+    "(shutdown: arrêt du worker, rejected: refusé par la base, "
+    "overflow: file pleine et écriture directe en échec, enqueue: mise en file en échec)",
+    ["reason"],
+))
+LEAVE_EVENTS_QUEUED = REGISTRY.register(Gauge(
+    "leave_events_queue_depth", "Événements de congé en attente d'écriture",
+))
+
+
+def _json_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _abandon(events: List[dict], reason: str) -> None:
+    """Dernière trace exploitable d'événements non écrits: le journal applicatif"""
+    LEAVE_EVENTS_LOST.inc(len(events), reason)
+    logger.error("%d événement(s) de congé non écrits (%s): %r", len(events), reason, events)
+
+
+def _insert(events: List[dict]) -> None:
+    db = get_session()
+    try:
+        db.execute(insert(LeaveEvent), events)
+        db.commit()
+    finally:
+        db.close()
+    LEAVE_EVENTS_WRITTEN.inc(len(events))
+
+
+class EventWriter:
+    """File en mémoire et thread d'écriture par lots"""
+
+    def __init__(self, batch_size: int, flush_seconds: float, queue_size: int):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=queue_size)
+        self._inflight: List[dict] = []
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def put(self, events: List[dict]) -> None:
+        """Mettre en file (file pleine: écriture immédiate plutôt que perte)
+
+        Appelé après le commit de l'écriture: ne lève pas, un événement qui ne
+        peut être ni mis en file ni écrit est abandonné et journalisé.
+        """
+        self._start()
+        overflow = []
+        for leave_event in events:
+            try:
+                self._queue.put_nowait(leave_event)
+            except queue.Full:
+                overflow.append(leave_event)
+        LEAVE_EVENTS_QUEUED.set(self._queue.qsize())
+        if overflow:
+            LEAVE_EVENTS_OVERFLOW.inc(len(overflow))
+            try:
+                _insert(overflow)
+            except Exception:
+                logger.exception("File du journal des congés pleine et écriture directe en échec")
+                _abandon(overflow, "overflow")
+
+    def pending(self, leave_id: int) -> List[dict]:
+        """Événements d'une demande pas encore écrits (lecture de ses propres écritures)"""
+        with self._queue.mutex:
+            queued = list(self._queue.queue)
+        return [e for e in list(self._inflight) + queued if e["leave_id"] == leave_id]
+
+    def _start(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                # Readiness en échec si le thread ne bat plus pendant 10 intervalles
+                register_worker(WORKER_NAME, max(30.0, self.flush_seconds * 10))
+                self._thread = threading.Thread(target=self._run, name=WORKER_NAME, daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def _fill_batch(self) -> None:
+        """Premier événement (attente bornée), puis complétion du lot jusqu'au délai
+
+        Le lot se construit dans `_inflight`: ses événements restent visibles de
+        `pending()` entre leur sortie de la file et leur insertion.
+        """
+        try:
+            self._inflight.append(self._queue.get(timeout=self.flush_seconds or 1.0))
+        except queue.Empty:
+            return
+        deadline = time.monotonic() + self.flush_seconds
+        while len(self._inflight) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                self._inflight.append(
+                    self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+
+    def _insert_each(self) -> None:
+        """Lot refusé à répétition: écrire événement par événement
+
+        Un événement refusé par la base (contrainte, valeur invalide) est
+        abandonné; si la base est indisponible, le reste du lot reste dans
+        `_inflight` pour le prochain essai.
+        """
+        while self._inflight:
+            leave_event = self._inflight[0]
+            try:
+                _insert([leave_event])
+            except (OperationalError, InterfaceError):
+                logger.exception("Base indisponible pour le journal des congés, nouvel essai")
+                return
+            except Exception:
+                logger.exception("Événement de congé refusé par la base")
+                _abandon([leave_event], "rejected")
+            self._inflight = self._inflight[1:]
+
+    def _run(self) -> None:
+        retry_delay = 0.5
+        attempts = 0
+        while True:
+            if not self._inflight:
+                if self._stopping.is_set() and self._queue.empty():
+                    return
+                self._fill_batch()
+                LEAVE_EVENTS_QUEUED.set(self._queue.qsize())
+
+            if self._inflight:
+                try:
+                    _insert(self._inflight)
+                    self._inflight = []
+                except Exception:
+                    attempts += 1
+                    logger.exception("Écriture de %d événement(s) de congé en échec (essai %d)",
+                                     len(self._inflight), attempts)
+                    if attempts >= settings.LEAVE_EVENTS_MAX_ATTEMPTS:
+                        self._insert_each()
+                        attempts = 0
+                if self._inflight:
+                    if self._stopping.is_set():
+                        return
+                    time.sleep(retry_delay)
+                    retry_delay = min(retry_delay * 2, 10.0)
+                    continue
+                retry_delay = 0.5
+                attempts = 0
+            heartbeat(WORKER_NAME)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Vider la file puis arrêter le thread (arrêt du worker)"""
+        if self._thread is None or self._stopping.is_set():
+            return
+        self._stopping.set()
+        self._thread.join(settings.LEAVE_EVENTS_SHUTDOWN_SECONDS if timeout is None else timeout)
+        unregister_worker(WORKER_NAME)
+
+        lost = list(self._inflight) + list(self._queue.queue)
+        if lost:
+            _abandon(lost, "shutdown")
+
+
+@lru_cache(maxsize=None)
+def get_writer() -> EventWriter:
+    """Writer du processus (thread démarré au premier événement)"""
+    return EventWriter(
+        settings.LEAVE_EVENTS_BATCH_SIZE, settings.LEAVE_EVENTS_FLUSH_SECONDS, settings.LEAVE_EVENTS_QUEUE_SIZE
+    )
+
+
+def shutdown() -> None:
+    """Arrêt de l'application: écrire les événements encore en file"""
+    if get_writer.cache_info().currsize:
+        get_writer().stop()
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_committed(session: Session) -> None:
+    """Ne lève jamais: l'écriture est déjà validée, une erreur ici renverrait
+    un 500 au client (et un nouvel essai créerait un doublon)"""
+    events = session.info.pop(_SESSION_KEY, None)
+    if not events:
+        return
+    try:
+        get_writer().put(events)
+    except Exception:
+        logger.exception("Mise en file du journal des congés en échec")
+        _abandon(events, "enqueue")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_SESSION_KEY, None)
+
+
+class LeaveEventService:
+    """Écriture et relecture du journal des demandes"""
+
+    @staticmethod
+    def record(db: Session, leave_request: LeaveRequest, event_type: LeaveEventType,
+               actor_id: Optional[int], changes: dict) -> None:
+        """Journaliser une écriture sur `leave_request` (état renvoyé par RETURNING), avant le commit"""
+        leave_event = {
+            "leave_id": leave_request.id,
+            "version": leave_request.version,
+            "event_type": event_type,
+            "status": leave_request.status,
+            "actor_id": actor_id,
+            "changes": {key: _json_value(value) for key, value in changes.items()},
+            "occurred_at": leave_request.updated_at,
+        }
+        if settings.LEAVE_EVENTS_DURABILITY == "transactional":
+            db.execute(insert(LeaveEvent).values(**leave_event))
+        else:
+            db.info.setdefault(_SESSION_KEY, []).append(leave_event)
+
+    @staticmethod
+    def get_timeline(db: Session, leave_id: int) -> List[dict]:
+        """Événements d'une demande par version, avec l'état rejoué après chacun
+
+        Les événements encore en file dans ce processus sont inclus (`id` None).
+        """
+        events = {
+            row.version: {
+                "id": row.id,
+                "leave_id": row.leave_id,
+                "version": row.version,
+                "event_type": row.event_type,
+                "status": row.status,
+                "actor_id": row.actor_id,
+                "changes": row.changes,
+                "occurred_at": row.occurred_at,
+            }
+            for row in db.query(LeaveEvent).filter(LeaveEvent.leave_id == leave_id)
+        }
+        for leave_event in get_writer().pending(leave_id) if get_writer.cache_info().currsize else []:
+            events.setdefault(leave_event["version"], {**leave_event, "id": None})
+
+        names = UserService.get_names(db, [e["actor_id"] for e in events.values()])
+        timeline, state = [], {}
+        for version in sorted(events):
+            leave_event = events[version]
+            state.update(leave_event["changes"])
+            state.update(status=_json_value(leave_event["status"]), version=version)
+            timeline.append({
+                **leave_event,
+                "actor_name": names[leave_event["actor_id"]][0] if leave_event["actor_id"] in names else None,
+                "state": dict(state),
+            })
+        return timeline
@@ -0,0 +1,73 @@
+"""Recherche plein texte dans les commentaires et motifs de refus (migration 0007)
+
+PostgreSQL: `websearch_to_tsquery('french', q)` sur la colonne générée
+`search_vector` (index GIN): racinisation française ("mariages" trouve
+"mariage"), guillemets pour une expression, `or`, `-mot` pour exclure.
+Classement par `ts_rank_cd` (commentaire pondéré plus haut que le motif).
+
+SQLite: table FTS5 `leave_requests_fts`; chaque mot devient un préfixe
+("hospitalis" trouve "hospitalisation"), tous requis, classement bm25.
+"""
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import column, func, literal_column, select, table
+from sqlalchemy.orm import Session
+
+from app.models.leave_request import LeaveRequest, LeaveStatus
+from app.models.team import team_members
+
+# Configuration de la colonne générée (0007): à changer avec elle
+TEXT_SEARCH_CONFIG = "french"
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts5_query(query: str) -> str:
+    """Mots de la saisie, entre guillemets (pas de syntaxe FTS5 injectée) et en préfixe"""
+    return " ".join(f'"{word}"*' for word in _WORD.findall(query.lower()))
+
+
+def _ranked_postgresql(query: str):
+    tsquery = func.websearch_to_tsquery(literal_column(f"'{TEXT_SEARCH_CONFIG}'::regconfig"), query)
+    search_vector = literal_column("leave_requests.search_vector")
+    return search_vector.op("@@")(tsquery), func.ts_rank_cd(search_vector, tsquery)
+
+
+class LeaveSearchService:
+    """Recherche des congés par mots du commentaire ou du motif de refus"""
+
+    @staticmethod
+    def search(db: Session, query: str, status: Optional[LeaveStatus] = None, team_id: Optional[int] = None,
+               from_date: Optional[datetime] = None, to_date: Optional[datetime] = None,
+               limit: int = 20, offset: int = 0) -> List[Tuple[LeaveRequest, float]]:
+        """(congé, score) les plus pertinents d'abord; période = chevauchement du congé"""
+        if db.get_bind().dialect.name == "postgresql":
+            match, rank = _ranked_postgresql(query)
+            leaves = db.query(LeaveRequest, rank.label("rank")).filter(match)
+        else:
+            match_query = _fts5_query(query)
+            if not match_query:
+                return []
+            fts = table("leave_requests_fts", column("rowid"))
+            # bm25: plus petit = plus pertinent; commentaire pondéré plus haut que le motif
+            rank = -func.bm25(literal_column("leave_requests_fts"), 2.0, 1.0)
+            leaves = db.query(LeaveRequest, rank.label("rank")).join(
+                fts, fts.c.rowid == LeaveRequest.id
+            ).filter(literal_column("leave_requests_fts").op("MATCH")(match_query))
+
+        if status:
+            leaves = leaves.filter(LeaveRequest.status == status)
+        if team_id is not None:
+            leaves = leaves.filter(LeaveRequest.user_id.in_(
+                select(team_members.c.user_id).where(team_members.c.team_id == team_id)
+            ))
+        if from_date:
+            leaves = leaves.filter(LeaveRequest.end_date >= from_date)
+        if to_date:
+            # Borne sur start_date: élague les partitions des années suivantes
+            leaves = leaves.filter(LeaveRequest.start_date <= to_date)
+
+        rows = leaves.order_by(rank.desc(), LeaveRequest.id.desc()).offset(offset).limit(limit).all()
+        return [(leave, float(score)) for leave, score in rows]
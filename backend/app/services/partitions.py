@@ -0,0 +1,201 @@
+"""Partitions annuelles de leave_requests et archivage des années closes
+
+PostgreSQL (migration 0004): une partition par année de start_date, plus une
+partition par défaut. `ensure_partitions` crée les années à venir et y déplace
+les lignes tombées dans la partition par défaut; `archive_year` sort une année
+close de la table chaude, soit vers `leave_requests_archive` (partition sans
+index secondaires), soit vers un fichier Parquet.
+
+SQLite: table unique; seul l'archivage Parquet est disponible (les lignes de
+l'année sont exportées puis supprimées).
+"""
+import os
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.cache import get_cache
+from app.models.leave_request import LeaveRequest, LeaveStatus
+from app.services.calendar import CalendarService
+
+PARENT_TABLE = "leave_requests"
+ARCHIVE_TABLE = "leave_requests_archive"
+DEFAULT_PARTITION = "leave_requests_default"
+# Verrou consultatif (transaction) sérialisant les créations de partitions:
+# `migrate` et la tâche planifiée peuvent tourner en même temps
+PARTITIONS_LOCK_ID = 0x6C72_7061  # "lrpa"
+
+
+def year_bounds(year: int) -> Tuple[datetime, datetime]:
+    """[1er janvier, 1er janvier suivant): bornes des partitions, et filtre qui permet l'élagage"""
+    return datetime(year, 1, 1), datetime(year + 1, 1, 1)
+
+
+def partition_name(year: int) -> str:
+    return f"{PARENT_TABLE}_y{year}"
+
+
+class PartitionService:
+    """Gestion des partitions annuelles de leave_requests"""
+
+    @staticmethod
+    def is_partitioned(db: Session) -> bool:
+        if db.get_bind().dialect.name != "postgresql":
+            return False
+        return db.execute(text(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = :name"
+        ), {"name": PARENT_TABLE}).first() is not None
+
+    @staticmethod
+    def list_partitions(db: Session) -> List[dict]:
+        """Partitions chaudes et archivées (nom, table mère, bornes, lignes estimées)"""
+        if not PartitionService.is_partitioned(db):
+            return []
+        rows = db.execute(text(
+            "SELECT c.relname AS name, p.relname AS parent, "
+            "pg_get_expr(c.relpartbound, c.oid) AS bounds, c.reltuples::bigint AS rows "
+            "FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname IN (:parent, :archive) "
+            "ORDER BY c.relname"
+        ), {"parent": PARENT_TABLE, "archive": ARCHIVE_TABLE}).mappings().all()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def ensure_partitions(db: Session, years_ahead: int = 1) -> List[str]:
+        """Créer les partitions de l'année en cours et des suivantes
+
+        Les années présentes dans la partition par défaut reçoivent aussi leur
+        partition: leurs lignes y sont déplacées avant l'attachement (sinon
+        PostgreSQL refuse d'attacher une partition qui recouvre des lignes du
+        défaut).
+        """
+        if not PartitionService.is_partitioned(db):
+            return []
+
+        db.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": PARTITIONS_LOCK_ID})
+        existing = {partition["name"] for partition in PartitionService.list_partitions(db)}
+        current_year = datetime.utcnow().year
+        years = set(range(current_year, current_year + years_ahead + 1))
+        years.update(year for (year,) in db.execute(text(
+            f"SELECT DISTINCT extract(year FROM start_date)::integer FROM {DEFAULT_PARTITION}"
+        )))
+
+        # Colonnes écrites explicitement: search_vector (0007) est générée, non insérable
+        columns = ", ".join(column.name for column in LeaveRequest.__table__.columns)
+        created = []
+        for year in sorted(years):
+            name = partition_name(year)
+            if name in existing:
+                continue
+            start, end = year_bounds(year)
+            db.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING GENERATED)"))
+            db.execute(text(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                f"WHERE start_date >= :start AND start_date < :end RETURNING {columns}) "
+                f"INSERT INTO {name} ({columns}) SELECT {columns} FROM moved"
+            ), {"start": start, "end": end})
+            db.execute(text(
+                f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{start.date()}') TO ('{end.date()}')"
+            ))
+            created.append(name)
+
+        db.commit()
+        return created
+
+    @staticmethod
+    def archive_year(db: Session, year: int, parquet_dir: Optional[str] = None) -> dict:
+        """Sortir une année close et entièrement traitée de la table chaude
+
+        Sans `parquet_dir`: la partition est détachée, perd ses index secondaires
+        et rejoint `leave_requests_archive` (PostgreSQL). Avec `parquet_dir`:
+        les lignes sont exportées en Parquet (zstd) puis supprimées.
+        """
+        start, end = year_bounds(year)
+        if end > datetime.utcnow():
+            raise ValueError(f"L'année {year} n'est pas close")
+
+        in_year = (LeaveRequest.start_date >= start, LeaveRequest.start_date < end)
+        pending = db.query(func.count(LeaveRequest.id)).filter(
+            *in_year, LeaveRequest.status == LeaveStatus.PENDING
+        ).scalar()
+        if pending:
+            raise ValueError(f"{pending} demande(s) encore en attente en {year}")
+
+        open_leaves = db.query(func.count(LeaveRequest.id)).filter(
+            *in_year, LeaveRequest.end_date >= datetime.utcnow()
+        ).scalar()
+        if open_leaves:
+            raise ValueError(f"{open_leaves} congé(s) de {year} ne sont pas terminés")
+
+        partitioned = PartitionService.is_partitioned(db)
+        name = partition_name(year)
+        if partitioned:
+            hot = {p["name"] for p in PartitionService.list_partitions(db) if p["parent"] == PARENT_TABLE}
+            if name not in hot:
+                raise ValueError(f"Aucune partition {name} dans {PARENT_TABLE}")
+        elif parquet_dir is None:
+            raise ValueError("Archivage en partition: PostgreSQL partitionné uniquement (utiliser --parquet)")
+
+        rows = db.query(func.count(LeaveRequest.id)).filter(*in_year).scalar()
+        if parquet_dir is not None:
+            destination = PartitionService._export_parquet(db, year, parquet_dir)
+            if partitioned:
+                db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+                db.execute(text(f"DROP TABLE {name}"))
+            else:
+                db.query(LeaveRequest).filter(*in_year).delete(synchronize_session=False)
+        else:
+            db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            # Index secondaires inutiles hors du chemin chaud: seule la clé primaire reste
+            secondary = db.execute(text(
+                "SELECT i.indexrelid::regclass::text FROM pg_index i "
+                "WHERE i.indrelid = CAST(:name AS regclass) AND NOT i.indisprimary"
+            ), {"name": name}).scalars().all()
+            for index in secondary:
+                db.execute(text(f"DROP INDEX {index}"))
+            db.execute(text(
+                f"ALTER TABLE {ARCHIVE_TABLE} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{start.date()}') TO ('{end.date()}')"
+            ))
+            destination = f"{ARCHIVE_TABLE}.{name}"
+
+        db.commit()
+
+        # L'année disparaît des lectures: calendrier et carte de chaleur à recalculer
+        CalendarService.invalidate()
+        get_cache().invalidate_tags(f"heatmap:{year}")
+        return {"year": year, "rows": rows, "destination": destination}
+
+    @staticmethod
+    def _export_parquet(db: Session, year: int, parquet_dir: str) -> str:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Archivage Parquet: installer le paquet pyarrow")
+
+        path = os.path.join(parquet_dir, f"{PARENT_TABLE}_{year}.parquet")
+        if os.path.exists(path):
+            raise ValueError(f"{path} existe déjà")
+
+        start, end = year_bounds(year)
+        table = LeaveRequest.__table__
+        result = db.execute(
+            select(table).where(table.c.start_date >= start, table.c.start_date < end).order_by(table.c.id)
+        )
+        # Enum exportés comme en base (nom du membre)
+        records = [
+            {key: value.name if isinstance(value, Enum) else value for key, value in row.items()}
+            for row in result.mappings()
+        ]
+
+        os.makedirs(parquet_dir, exist_ok=True)
+        pq.write_table(pa.Table.from_pylist(records), path, compression="zstd")
+        return path
@@ -1,21 +1,30 @@
 """Service de gestion des utilisateurs"""
+import logging
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
-from typing import List, Optional
-import csv
-from io import StringIO
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.core.cache import CacheError, get_cache
 from app.models.user import User
 from app.core.security import hash_password
 from app.schemas.user import UserCreate, UserUpdate
 from app.core.config import Role
+from app.services import user_search
+from app.services.calendar import CalendarService
+
+logger = logging.getLogger(__name__)
 
 
 class UserService:
     """Service pour la gestion des utilisateurs"""
     
     @staticmethod
-    def list_users(db: Session, role: Optional[Role] = None, is_active: Optional[bool] = None) -> List[User]:
-        """Lister les utilisateurs avec filtres"""
+    def list_users(db: Session, role: Optional[Role] = None, is_active: Optional[bool] = None,
+                   after_id: Optional[int] = None, limit: Optional[int] = None) -> List[User]:
+        """Lister les utilisateurs avec filtres
+        
+        Pagination par clé (`after_id` = dernier id de la page précédente): la
+        page suivante reprend dans l'index de la clé primaire, sans OFFSET.
+        """
         query = db.query(User).filter(User.is_deleted == False)
         
         if role:
@@ -24,8 +33,19 @@ class UserService:
         if is_active is not None:
             query = query.filter(User.is_active == is_active)
         
+        if after_id is not None:
+            query = query.filter(User.id > after_id)
+        
+        if limit is not None:
+            query = query.order_by(User.id).limit(limit)
+        
         return query.all()
     
+    @staticmethod
+    def search_users(db: Session, query: str, limit: int = 20) -> List[User]:
+        """Recherche par préfixe et approchée (username, nom complet, email)"""
+        return user_search.search_users(db, query, limit)
+    
     @staticmethod
     def get_user(db: Session, user_id: int) -> Optional[User]:
         """Récupérer un utilisateur par ID"""
@@ -33,6 +53,43 @@ class UserService:
             and_(User.id == user_id, User.is_deleted == False)
         ).first()
     
+    @staticmethod
+    def _names_key(user_id: int) -> str:
+        return f"user:{user_id}:names"
+
+    @staticmethod
+    def get_names(db: Session, user_ids: Iterable[Optional[int]]) -> Dict[int, Tuple[str, str]]:
+        """(username, email) par identifiant, servis depuis le cache partagé
+
+        Les réponses d'écriture des congés en ont besoin sans charger les
+        relations; seuls les absents du cache sont lus, en une requête. Cache
+        indisponible: tout est lu en base (l'écriture ne doit pas échouer).
+        """
+        cache = get_cache()
+        wanted = {user_id for user_id in user_ids if user_id is not None}
+        names, missing = {}, []
+        try:
+            for user_id in wanted:
+                cached = cache.get(UserService._names_key(user_id))
+                if cached is None:
+                    missing.append(user_id)
+                else:
+                    names[user_id] = cached
+        except CacheError as e:
+            logger.warning("Cache indisponible (%s), noms lus en base", e)
+            cache, names, missing = None, {}, list(wanted)
+
+        if missing:
+            for user_id, username, email in db.query(User.id, User.username, User.email).filter(User.id.in_(missing)):
+                names[user_id] = (username, email)
+                if cache is not None:
+                    try:
+                        cache.set(UserService._names_key(user_id), (username, email))
+                    except CacheError as e:
+                        logger.warning("Cache indisponible (%s), noms non mis en cache", e)
+                        cache = None
+        return names
+    
     @staticmethod
     def create_user(db: Session, user_create: UserCreate) -> User:
         """Créer un nouvel utilisateur"""
@@ -57,6 +114,7 @@ class UserService:
         db.add(user)
         db.commit()
         db.refresh(user)
+        user_search.bump_generation()
         return user
     
     @staticmethod
@@ -70,6 +128,7 @@ class UserService:
         if user_update.full_name is not None:
             user.full_name = user_update.full_name
         
+        email_changed = user_update.email is not None and user_update.email != user.email
         if user_update.email is not None:
             user.email = user_update.email
         
@@ -81,6 +140,12 @@ class UserService:
         
         db.commit()
         db.refresh(user)
+        user_search.bump_generation()
+        
+        # Le calendrier et les noms en cache portent l'email de chaque employé
+        if email_changed:
+            get_cache().delete(UserService._names_key(user.id))
+            CalendarService.invalidate()
         return user
     
     @staticmethod
@@ -93,10 +158,15 @@ class UserService:
         
         user.is_deleted = True
         db.commit()
+        user_search.bump_generation()
     
     @staticmethod
     def import_users_from_csv(db: Session, csv_content: str) -> tuple[int, List[str]]:
         """Importer des utilisateurs depuis un CSV"""
+        # Chargé à la demande: l'import CSV est une opération admin ponctuelle
+        import csv
+        from io import StringIO
+
         csv_reader = csv.DictReader(StringIO(csv_content))
         
         created_count = 0
@@ -140,6 +210,7 @@ class UserService:
                 errors.append(f"Ligne {row_num}: {str(e)}")
         
         db.commit()
+        user_search.bump_generation()
         return created_count, errors
     
     @staticmethod
@@ -162,4 +233,5 @@ class UserService:
         db.add(admin)
         db.commit()
         db.refresh(admin)
+        user_search.bump_generation()
         return admin
@@ -0,0 +1,151 @@
+"""Recherche dans l'annuaire des utilisateurs (username, nom complet, email)
+
+PostgreSQL (migration 0006): index GIN `gin_trgm_ops` (extension pg_trgm) sur
+les trois colonnes. Un préfixe (`ILIKE 'dup%'`, aussi en début de mot du nom
+complet) et une correspondance approchée (`<%`, similarité de mot) passent
+par ces index; les préfixes sortent en premier, puis par similarité.
+
+SQLite: index en mémoire par processus, liste triée de (terme, id) où les
+termes sont le username, l'email, sa partie locale et chaque mot du nom
+complet. Un préfixe est une recherche dichotomique; si elle ne remplit pas la
+page, les termes proches (difflib) complètent. L'index est reconstruit quand
+la génération `users:generation` du cache partagé change (écriture sur un
+utilisateur dans n'importe quel worker).
+"""
+import bisect
+import difflib
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, literal, or_
+from sqlalchemy.orm import Session
+
+from app.core.cache import CacheError, get_cache
+from app.models.user import User
+
+GENERATION_KEY = "users:generation"
+
+
+def _like_prefix(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+def _terms(username: str, email: str, full_name: Optional[str]) -> set:
+    email = email.lower()
+    terms = {username.lower(), email, email.split("@", 1)[0]}
+    if full_name:
+        terms.add(full_name.lower())
+        terms.update(full_name.lower().split())
+    return terms
+
+
+class PrefixIndex:
+    """Termes triés -> identifiants d'utilisateurs non supprimés"""
+
+    def __init__(self, rows: List[Tuple[int, str, str, Optional[str]]]):
+        self.entries = sorted(
+            (term, user_id)
+            for user_id, username, email, full_name in rows
+            for term in _terms(username, email, full_name)
+        )
+        self.terms = [term for term, _ in self.entries]
+        self.vocabulary = sorted(set(self.terms))
+
+    def prefix(self, query: str, limit: int) -> List[int]:
+        """Identifiants dont un terme commence par `query`, par terme croissant"""
+        found = {}
+        position = bisect.bisect_left(self.terms, query)
+        while len(found) < limit and position < len(self.entries) and self.terms[position].startswith(query):
+            found.setdefault(self.entries[position][1], None)
+            position += 1
+        return list(found)
+
+    def fuzzy(self, query: str, limit: int) -> List[int]:
+        """Identifiants des termes les plus proches (ratio difflib >= 0.7)"""
+        found = {}
+        for term in difflib.get_close_matches(query, self.vocabulary, n=limit, cutoff=0.7):
+            position = bisect.bisect_left(self.terms, term)
+            while position < len(self.entries) and self.terms[position] == term:
+                found.setdefault(self.entries[position][1], None)
+                position += 1
+        return list(found)
+
+
+_index: Optional[PrefixIndex] = None
+_index_generation: Optional[int] = None
+_index_lock = threading.Lock()
+
+
+def _generation() -> Optional[int]:
+    try:
+        return get_cache().get(GENERATION_KEY, 0)
+    except CacheError:
+        # Sans cache partagé, pas de signal d'écriture: reconstruire à chaque recherche
+        return None
+
+
+def bump_generation() -> None:
+    """Signaler une écriture sur les utilisateurs (index en mémoire à reconstruire)"""
+    try:
+        get_cache().incr(GENERATION_KEY)
+    except CacheError:
+        pass
+
+
+def _prefix_index(db: Session) -> PrefixIndex:
+    global _index, _index_generation
+    generation = _generation()
+    with _index_lock:
+        if _index is None or generation is None or generation != _index_generation:
+            rows = db.query(User.id, User.username, User.email, User.full_name).filter(
+                User.is_deleted == False
+            ).all()
+            _index, _index_generation = PrefixIndex(rows), generation
+        return _index
+
+
+def _search_postgresql(db: Session, query: str, limit: int) -> List[User]:
+    pattern = _like_prefix(query)
+    prefix = or_(
+        User.username.ilike(pattern),
+        User.email.ilike(pattern),
+        User.full_name.ilike(pattern),
+        User.full_name.ilike("% " + pattern),
+    )
+    # `q <% colonne`: similarité de `q` avec un mot de la colonne (pg_trgm.word_similarity_threshold)
+    term = literal(query)
+    fuzzy = or_(term.op("<%")(User.username), term.op("<%")(User.email), term.op("<%")(User.full_name))
+    similarity = func.greatest(
+        func.word_similarity(term, User.username),
+        func.word_similarity(term, User.email),
+        func.word_similarity(term, func.coalesce(User.full_name, "")),
+    )
+    return db.query(User).filter(User.is_deleted == False, or_(prefix, fuzzy)).order_by(
+        case((prefix, 0), else_=1), similarity.desc(), User.username
+    ).limit(limit).all()
+
+
+def _search_index(db: Session, query: str, limit: int) -> List[User]:
+    index = _prefix_index(db)
+    ids = index.prefix(query, limit)
+    if len(ids) < limit:
+        ids += [user_id for user_id in index.fuzzy(query, limit) if user_id not in ids][:limit - len(ids)]
+    if not ids:
+        return []
+
+    users: Dict[int, User] = {
+        user.id: user
+        for user in db.query(User).filter(User.id.in_(ids), User.is_deleted == False)
+    }
+    return [users[user_id] for user_id in ids if user_id in users]
+
+
+def search_users(db: Session, query: str, limit: int = 20) -> List[User]:
+    """Utilisateurs non supprimés correspondant à `query`, les plus pertinents d'abord"""
+    query = query.strip().lower()
+    if not query:
+        return []
+    if db.get_bind().dialect.name == "postgresql":
+        return _search_postgresql(db, query, limit)
+    return _search_index(db, query, limit)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Vérification et débit des backends de cache (`app.core.cache`)
+
+Pour chaque backend (memory, sqlite, redis), vérifie le contrat commun puis
+mesure le débit get/set:
+
+    ttl            une clé expire après son TTL
+    tags           invalidate_tags supprime les clés étiquetées, et seulement elles
+    incr           compteurs atomiques (threads concurrents)
+    throttle       seau à jetons: exactement `limit` requêtes admises en rafale
+    single_flight  N threads sur une clé absente: le chargeur ne s'exécute qu'une fois
+    workers        idem entre processus (sqlite, redis): un seul calcul tous workers confondus
+    lock           un verrou expiré puis repris n'est pas libéré par son ancien détenteur (sqlite, redis)
+    errors         après une erreur Redis en milieu de pipeline, la commande suivante lit
+                   sa propre réponse (serveur factice uniquement: erreurs injectées)
+
+Sans --redis-url, le backend redis est testé contre `fake_redis.FakeRedisServer`.
+
+Usage:
+    python benchmarks/cache.py
+    python benchmarks/cache.py --backend sqlite --ops 20000
+    python benchmarks/cache.py --redis-url redis://localhost:6379/15
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+BACKENDS = ("memory", "sqlite", "redis")
+
+
+def check(name: str, condition: bool, detail: str = "") -> bool:
+    print(f"  {'✓' if condition else '✗'} {name}{'  ' + detail if detail and not condition else ''}")
+    return condition
+
+
+def run_threads(count: int, target) -> None:
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def _worker_get_or_set(url: str, key: str, barrier) -> None:
+    """Processus worker: même clé absente, chargeur lent qui compte ses appels"""
+    from app.core.cache import create_cache
+
+    cache = create_cache(url)
+
+    def loader():
+        cache.incr(key + ":loads", 1, ttl=60)
+        time.sleep(0.2)
+        return "valeur"
+
+    barrier.wait()
+    cache.get_or_set(key, loader, ttl=60)
+
+
+def verify(cache, url: str, fake=None) -> bool:
+    ok = True
+    cache.clear()
+
+    cache.set("ttl", 1, ttl=0.2)
+    present = cache.get("ttl") == 1
+    time.sleep(0.3)
+    ok &= check("ttl", present and cache.get("ttl") is None)
+
+    cache.set("tag:a", 1, tags=("t1",))
+    cache.set("tag:b", 2, tags=("t1", "t2"))
+    cache.set("tag:c", 3, tags=("t2",))
+    cache.invalidate_tags("t1")
+    ok &= check("tags", cache.get("tag:a") is None and cache.get("tag:b") is None and cache.get("tag:c") == 3)
+
+    run_threads(8, lambda: [cache.incr("counter", 1, ttl=60) for _ in range(100)])
+    total = cache.incr("counter", 0)
+    ok &= check("incr", total == 800, f"{total} != 800")
+
+    admitted = []
+    run_threads(8, lambda: admitted.extend(cache.throttle("bucket", 20, 60)[0] for _ in range(10)))
+    allowed, retry_after = cache.throttle("bucket", 20, 60)
+    ok &= check("throttle", admitted.count(True) == 20 and not allowed and 0 < retry_after <= 3,
+                f"{admitted.count(True)} admises, retry_after={retry_after:.2f}")
+
+    loads = []
+
+    def slow_loader():
+        loads.append(1)
+        time.sleep(0.1)
+        return {"calcul": "coûteux"}
+
+    results = []
+    run_threads(16, lambda: results.append(cache.get_or_set("flight", slow_loader, ttl=60)))
+    ok &= check("single_flight", len(loads) == 1 and all(r == {"calcul": "coûteux"} for r in results),
+                f"{len(loads)} chargements")
+
+    cache.set("update", {"a": 1})
+    updated = cache.update("update", lambda v: {**v, "b": 2}) and cache.get("update") == {"a": 1, "b": 2}
+    ok &= check("update", updated and not cache.update("absent", lambda v: v) and cache.get("absent") is None)
+
+    if url.startswith(("sqlite", "redis")):
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(4)
+        processes = [
+            context.Process(target=_worker_get_or_set, args=(url, "workers", barrier)) for _ in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        loads = cache.incr("workers:loads", 0)
+        ok &= check("workers", loads == 1 and cache.get("workers") == "valeur", f"{loads} chargements")
+
+        stale_token = cache._acquire("lock", 10.0, lease=0.1)
+        time.sleep(0.2)
+        token = cache._acquire("lock", 10.0, lease=10.0)
+        cache._release("lock", stale_token)
+        ok &= check("lock", token is not None and cache._acquire("lock", 0.05, lease=10.0) is None)
+        cache._release("lock", token)
+
+    if fake is not None:
+        from app.core.cache import CacheError
+
+        cache.set("a", "A")
+        cache.set("b", "B")
+        # SET en erreur, suivi de SADD et PEXPIRE dans le même pipeline
+        fake.fail_next("SET", "WRONGTYPE erreur injectée")
+        try:
+            cache.set("a", "A2", tags=("t",))
+            raised = False
+        except CacheError:
+            raised = True
+        ok &= check("errors", raised and cache.get("b") == "B" and cache.get("a") == "A")
+
+    cache.clear()
+    return ok
+
+
+def throughput(cache, ops: int) -> None:
+    value = {"id": 1, "dates": list(range(20)), "username": "employee_000001"}
+    start = time.perf_counter()
+    for i in range(ops):
+        cache.set(f"bench:{i % 1000}", value)
+    set_rate = ops / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(ops):
+        cache.get(f"bench:{i % 1000}")
+    get_rate = ops / (time.perf_counter() - start)
+    print(f"  set {set_rate:>10,.0f} ops/s   get {get_rate:>10,.0f} ops/s")
+    cache.clear()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Vérification et débit des backends de cache")
+    parser.add_argument("--backend", action="append", choices=BACKENDS)
+    parser.add_argument("--redis-url", help="Redis réel (défaut: serveur factice en processus)")
+    parser.add_argument("--ops", type=int, default=10000)
+    args = parser.parse_args()
+
+    from app.core.cache import create_cache
+
+    fake = None
+    ok = True
+    for backend in args.backend or BACKENDS:
+        if backend == "memory":
+            url = "memory://"
+        elif backend == "sqlite":
+            url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="cache_"), "cache.db")
+        elif args.redis_url:
+            url = args.redis_url
+        else:
+            from fake_redis import FakeRedisServer
+
+            fake = FakeRedisServer()
+            fake.start()
+            url = fake.url
+
+        print(f"{backend} ({url})")
+        cache = create_cache(url)
+        ok &= verify(cache, url, fake if backend == "redis" else None)
+        throughput(cache, args.ops)
+
+    if fake is not None:
+        fake.stop()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
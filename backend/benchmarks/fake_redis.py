@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Serveur compatible Redis (RESP2) minimal, en mémoire, pour tester `RedisCache`
+sans Redis installé
+
+Commandes: PING, AUTH, SELECT, GET, SET (EX/PX/NX), DEL, INCRBY, PEXPIRE,
+SADD, SMEMBERS, KEYS, SCAN, FLUSHDB, et EVAL pour les scripts de
+`app.core.cache` (émulés en Python, pas de Lua). Les autres commandes, ou une
+commande qui échoue (INCRBY sur une valeur non entière...), répondent une
+erreur `-ERR` sans couper la connexion, comme Redis.
+
+`server.fail_next("SET", "WRONGTYPE ...")` fait répondre une erreur à la
+prochaine commande SET, pour tester la gestion des erreurs côté client.
+
+Usage:
+    python benchmarks/fake_redis.py --port 6390
+    CACHE_URL=redis://localhost:6390/0 uvicorn app.main:app --workers 4
+
+En processus:
+    server = FakeRedisServer()
+    server.start()          # port libre choisi par le système
+    url = server.url        # redis://127.0.0.1:<port>/0
+    server.stop()
+"""
+import argparse
+import fnmatch
+import os
+import socketserver
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.cache import REDIS_RELEASE_SCRIPT, REDIS_THROTTLE_SCRIPT  # noqa: E402
+
+
+class _Store:
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.errors = {}
+        self.scans = {}
+        self.next_scan = 0
+        self.lock = threading.Lock()
+        self.scripts = {REDIS_RELEASE_SCRIPT: self._release, REDIS_THROTTLE_SCRIPT: self._throttle}
+
+    def _alive(self, key) -> bool:
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def _release(self, keys: list, argv: list):
+        if self._alive(keys[0]) and self.data[keys[0]] == argv[0]:
+            del self.data[keys[0]]
+            self.expires.pop(keys[0], None)
+            return 1
+        return 0
+
+    def _throttle(self, keys: list, argv: list):
+        now, increment, period = (float(arg) for arg in argv)
+        tat = float(self.data[keys[0]]) if self._alive(keys[0]) else 0.0
+        new_tat = max(tat, now) + increment
+        if new_tat - now > period:
+            return [0, b"%.6f" % (new_tat - now - period)]
+        self.data[keys[0]] = b"%.6f" % new_tat
+        self.expires[keys[0]] = time.monotonic() + (new_tat - now)
+        return [1, b"0"]
+
+    def execute(self, name: str, args: list):
+        with self.lock:
+            error = self.errors.pop(name, None)
+            if error is not None:
+                return Exception(error)
+            try:
+                return self._execute(name, args)
+            except ValueError:
+                return Exception("ERR value is not an integer or out of range")
+            except Exception as e:
+                return Exception(f"ERR {type(e).__name__}: {e}")
+
+    def _execute(self, name: str, args: list):
+        if name == "PING":
+            return "+PONG"
+        if name in ("AUTH", "SELECT"):
+            return "+OK"
+        if name == "GET":
+            if not self._alive(args[0]):
+                return None
+            value = self.data[args[0]]
+            if isinstance(value, set):
+                return Exception("WRONGTYPE Operation against a key holding the wrong kind of value")
+            return value
+        if name == "SET":
+            key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+            if b"NX" in options and self._alive(key):
+                return None
+            self.data[key] = value
+            self.expires.pop(key, None)
+            for unit, factor in ((b"PX", 0.001), (b"EX", 1.0)):
+                if unit in options:
+                    ttl = int(args[2 + options.index(unit) + 1]) * factor
+                    self.expires[key] = time.monotonic() + ttl
+            return "+OK"
+        if name == "DEL":
+            removed = 0
+            for key in args:
+                if self._alive(key):
+                    removed += 1
+                self.data.pop(key, None)
+                self.expires.pop(key, None)
+            return removed
+        if name == "INCRBY":
+            key = args[0]
+            current = int(self.data[key]) if self._alive(key) else 0
+            current += int(args[1])
+            self.data[key] = str(current).encode()
+            return current
+        if name == "PEXPIRE":
+            if not self._alive(args[0]):
+                return 0
+            self.expires[args[0]] = time.monotonic() + int(args[1]) / 1000
+            return 1
+        if name == "SADD":
+            if not self._alive(args[0]):
+                self.data[args[0]] = set()
+            members = self.data[args[0]]
+            before = len(members)
+            members.update(args[1:])
+            return len(members) - before
+        if name == "SMEMBERS":
+            return sorted(self.data[args[0]]) if self._alive(args[0]) else []
+        if name == "KEYS":
+            pattern = args[0].decode()
+            return [key for key in list(self.data) if self._alive(key) and fnmatch.fnmatchcase(key.decode(), pattern)]
+        if name == "SCAN":
+            cursor, options = int(args[0]), [a.upper() for a in args[1:]]
+            pattern = args[options.index(b"MATCH") + 2].decode() if b"MATCH" in options else "*"
+            count = int(args[options.index(b"COUNT") + 2]) if b"COUNT" in options else 10
+            # Comme Redis: une clé présente pendant tout le parcours est renvoyée,
+            # même si d'autres sont supprimées entre deux pages
+            if cursor == 0:
+                keys = sorted(key for key in list(self.data) if fnmatch.fnmatchcase(key.decode(), pattern))
+            else:
+                keys = self.scans.pop(cursor, [])
+            page, rest = keys[:count], keys[count:]
+            next_cursor = 0
+            if rest:
+                next_cursor = self.next_scan = self.next_scan + 1
+                self.scans[next_cursor] = rest
+            return [str(next_cursor).encode(), [key for key in page if self._alive(key)]]
+        if name == "EVAL":
+            script = self.scripts.get(args[0].decode())
+            if script is None:
+                return Exception("NOSCRIPT script non émulé par le serveur factice")
+            numkeys = int(args[1])
+            return script(args[2:2 + numkeys], args[2 + numkeys:])
+        if name == "FLUSHDB":
+            self.data.clear()
+            self.expires.clear()
+            return "+OK"
+        return Exception(f"ERR unknown command '{name}'")
+
+
+def _encode(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, Exception):
+        return f"-{value}\r\n".encode()
+    if isinstance(value, str):
+        return value.encode() + b"\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    return b"*%d\r\n" % len(value) + b"".join(_encode(item) for item in value)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        while True:
+            command = self._read_command()
+            if command is None:
+                return
+            reply = self.server.store.execute(command[0].decode().upper(), command[1:])
+            self.wfile.write(_encode(reply))
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.store = _Store()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def fail_next(self, command: str, message: str = "ERR erreur injectée") -> None:
+        """Répondre `-message` à la prochaine commande `command`"""
+        with self.store.lock:
+            self.store.errors[command.upper()] = message
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-redis", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serveur Redis factice (tests et benchmarks)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+
+    server = FakeRedisServer(args.host, args.port)
+    print(f"Redis factice sur {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
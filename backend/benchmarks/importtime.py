@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Profil du démarrage à froid de l'API basé sur `python -X importtime`
+
+Importe `app.main` dans un interpréteur neuf, agrège le temps d'import par
+paquet de premier niveau et vérifie (médianes sur plusieurs runs):
+  - la part de l'application: temps propre des modules `app.*`, construction
+    des routes comprise. C'est ce que le code du dépôt contrôle, et elle varie
+    peu d'une machine à l'autre;
+  - le démarrage à froid total, dominé par FastAPI, pydantic et SQLAlchemy,
+    donc par la machine: budget large, garde-fou contre un import lourd ajouté;
+  - qu'aucun sous-système chargé à la demande n'est importé au démarrage
+    (driver SQL, passlib/bcrypt, python-jose/cryptography, Google).
+
+Usage:
+    python benchmarks/importtime.py [--runs 5] [--app-budget-ms 350] [--budget-ms 1500] [--top 15]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budgets en ms: temps propre des modules app.* et import complet de app.main
+APP_IMPORT_BUDGET_MS = 350
+COLD_START_BUDGET_MS = 1500
+
+# Modules qui ne doivent être chargés qu'au premier usage
+DEFERRED_MODULES = (
+    "psycopg2",
+    "passlib",
+    "bcrypt",
+    "jose",
+    "cryptography",
+    "google",
+    "googleapiclient",
+)
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def profile_once(env: dict) -> list:
+    """Retourner [(module, self_us, cumulative_us, depth), ...] pour un import de app.main"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    rows = []
+    for line in stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Profil d'import de l'API (python -X importtime)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--app-budget-ms", type=float,
+                        default=float(os.environ.get("APP_IMPORT_BUDGET_MS", APP_IMPORT_BUDGET_MS)))
+    parser.add_argument("--budget-ms", type=float, default=float(os.environ.get("STARTUP_BUDGET_MS", COLD_START_BUDGET_MS)))
+    parser.add_argument("--top", type=int, default=15, help="Nombre de paquets affichés")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("DEBUG", "false")
+
+    runs = [profile_once(env) for _ in range(args.runs)]
+    totals_ms = [
+        next(cumulative for module, _, cumulative, _ in rows if module == "app.main") / 1000
+        for rows in runs
+    ]
+    app_ms = [
+        sum(self_us for module, self_us, _, _ in rows if module.split(".")[0] == "app") / 1000
+        for rows in runs
+    ]
+
+    # Temps propre agrégé par paquet de premier niveau (dernier run)
+    by_package = defaultdict(int)
+    for module, self_us, _, _ in runs[-1]:
+        by_package[module.split(".")[0]] += self_us
+
+    print(f"{'paquet':<24}{'ms':>10}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:<24}{self_us / 1000:>10.1f}")
+
+    app_median_ms = statistics.median(app_ms)
+    median_ms = statistics.median(totals_ms)
+    print(f"\nmodules app.*: médiane={app_median_ms:.1f} ms (budget {args.app_budget_ms:.0f} ms)")
+    print(f"import app.main: médiane={median_ms:.1f} ms (budget {args.budget_ms:.0f} ms, {args.runs} runs)")
+
+    failed = False
+    if app_median_ms > args.app_budget_ms:
+        print("✗ Budget d'import de l'application dépassé")
+        failed = True
+    if median_ms > args.budget_ms:
+        print("✗ Budget de démarrage à froid dépassé")
+        failed = True
+
+    loaded = sorted({
+        module.split(".")[0] for module, _, _, _ in runs[-1]
+        if module.split(".")[0] in DEFERRED_MODULES
+    })
+    if loaded:
+        print(f"✗ Modules chargés au démarrage alors qu'ils devraient être différés: {', '.join(loaded)}")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
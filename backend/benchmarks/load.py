@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Test de charge en processus (ASGI) sur les endpoints principaux
+
+Prépare une base (SQLite temporaire par défaut, ou DATABASE_URL), la migre,
+la peuple avec `synthetic.seed_organization`, puis envoie des requêtes
+concurrentes directement à l'application ASGI via httpx (sans réseau):
+
+    login, my-requests, team-calendar, list-all-leaves, approve
+
+Pour chaque scénario: p50/p95/p99, débit et erreurs. Les résultats sont
+enregistrés dans benchmarks/results/ et comparés au run précédent (ou à
+--baseline): une dégradation de p95 au-delà de --max-regression est signalée.
+
+Usage:
+    python benchmarks/load.py --users 1000 --requests 200 --concurrency 10
+    python benchmarks/load.py --scenario login --scenario my-requests
+    DATABASE_URL=postgresql://... python benchmarks/load.py --no-seed
+
+--no-seed utilise la base configurée telle quelle: elle n'est ni migrée (sa
+révision doit déjà être la dernière) ni peuplée, et seuls les scénarios en
+lecture sont lancés (la préparation ouvre tout de même une session par client,
+soit quelques jetons de rafraîchissement). `login` (un jeton par requête) et
+`approve` (valide les demandes PENDING existantes) écrivent: --allow-writes est
+alors exigé.
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = ("login", "my-requests", "team-calendar", "list-all-leaves", "approve")
+# Scénarios qui modifient la base (refusés sur une base existante sans --allow-writes)
+WRITE_SCENARIOS = ("login", "approve")
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def prepare_database(args) -> None:
+    """Migrer et peupler la base de benchmark (base existante: vérifier sa révision)"""
+    import manage
+    from alembic.script import ScriptDirectory
+    from app.core.database import get_session
+    from synthetic import seed_organization
+
+    if args.no_seed:
+        head = ScriptDirectory.from_config(manage.get_alembic_config()).get_current_head()
+        current = manage.get_current_revision()
+        if current != head:
+            raise SystemExit(f"Base en révision {current}, attendue {head}: lancer `python manage.py migrate`")
+        return
+
+    manage.main(["migrate"])
+
+    db = get_session()
+    try:
+        summary = seed_organization(db, args.users, args.teams, args.years, args.seed)
+    finally:
+        db.close()
+    print(f"Base peuplée: {summary['users']} utilisateurs, {summary['leaves']} congés")
+
+
+async def run_scenario(client, name: str, make_request, total: int, concurrency: int) -> dict:
+    """Exécuter `total` requêtes avec `concurrency` clients simultanés"""
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            response = await make_request(client, i)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+    }
+
+
+async def run_load(args) -> dict:
+    import httpx
+    from app.core.database import get_session
+    from app.core.config import Role
+    from app.main import app
+    from app.models.leave_request import LeaveRequest, LeaveStatus
+    from app.models.user import User
+    from synthetic import PASSWORD
+
+    db = get_session()
+    try:
+        employees = [u for (u,) in db.query(User.username).filter(
+            User.role == Role.EMPLOYEE, User.is_active == True  # noqa: E712
+        ).order_by(User.id).limit(50)]
+        manager = db.query(User.username).filter(
+            User.role == Role.MANAGER, User.is_active == True  # noqa: E712
+        ).order_by(User.id).first()[0]
+        pending_ids = [i for (i,) in db.query(LeaveRequest.id).filter(
+            LeaveRequest.status == LeaveStatus.PENDING
+        ).order_by(LeaveRequest.id)]
+    finally:
+        db.close()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login(username):
+            response = await client.post("/api/auth/login", json={"username": username, "password": PASSWORD})
+            response.raise_for_status()
+            return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        employee_headers = [await login(u) for u in employees[:args.concurrency]]
+        manager_headers = await login(manager)
+
+        requests = {
+            "login": lambda c, i: c.post(
+                "/api/auth/login", json={"username": employees[i % len(employees)], "password": PASSWORD}
+            ),
+            "my-requests": lambda c, i: c.get(
+                "/api/leaves/my-requests", headers=employee_headers[i % len(employee_headers)]
+            ),
+            "team-calendar": lambda c, i: c.get(
+                "/api/leaves/team/calendar", headers=employee_headers[i % len(employee_headers)]
+            ),
+            "list-all-leaves": lambda c, i: c.get("/api/leaves/", headers=manager_headers),
+            "approve": lambda c, i: c.post(
+                f"/api/leaves/{pending_ids[i]}/approve", headers=manager_headers
+            ),
+        }
+
+        results = {}
+        for name in args.scenario or SCENARIOS:
+            total = args.requests
+            if name == "login":
+                total = min(total, args.login_requests)
+            if name == "approve":
+                total = min(total, len(pending_ids))
+            if not total:
+                continue
+            results[name] = await run_scenario(client, name, requests[name], total, args.concurrency)
+            r = results[name]
+            print(f"{name:<16} n={r['requests']:<5} err={r['errors']:<3} {r['throughput_rps']:>8.1f} req/s  "
+                  f"p50={r['p50_ms']:>8.2f}  p95={r['p95_ms']:>8.2f}  p99={r['p99_ms']:>8.2f} ms")
+        return results
+
+
+def compare(results: dict, baseline_path: str, max_regression: float) -> bool:
+    """Comparer p95 au run de référence; retourner False en cas de régression"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["scenarios"]
+
+    ok = True
+    print(f"\nComparaison avec {os.path.basename(baseline_path)} (p95):")
+    for name, result in results.items():
+        if name not in baseline or not baseline[name]["p95_ms"]:
+            continue
+        before, after = baseline[name]["p95_ms"], result["p95_ms"]
+        change = (after - before) / before * 100
+        flag = ""
+        if change > max_regression:
+            flag, ok = "  ✗ régression", False
+        print(f"  {name:<16} {before:>8.2f} -> {after:>8.2f} ms ({change:+.1f}%){flag}")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Test de charge en processus des endpoints principaux")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--teams", type=int, default=20)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-seed", action="store_true",
+                        help="Utiliser la base DATABASE_URL telle quelle (ni migrée ni peuplée, lecture seule)")
+    parser.add_argument("--allow-writes", action="store_true",
+                        help="Avec --no-seed: autoriser login et approve, qui écrivent dans la base")
+    parser.add_argument("--requests", type=int, default=200, help="Requêtes par scénario")
+    parser.add_argument("--login-requests", type=int, default=50, help="Plafond pour login (bcrypt)")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS)
+    parser.add_argument("--baseline", help="Fichier de résultats de référence (défaut: dernier run)")
+    parser.add_argument("--max-regression", type=float, default=20.0, help="Dégradation p95 tolérée (%%)")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    if args.no_seed and not args.allow_writes:
+        writes = [name for name in args.scenario or () if name in WRITE_SCENARIOS]
+        if writes:
+            parser.error(f"--no-seed: {', '.join(writes)} écrit dans la base configurée, ajouter --allow-writes")
+        args.scenario = args.scenario or [name for name in SCENARIOS if name not in WRITE_SCENARIOS]
+
+    # Base jetable par défaut: le benchmark ne touche jamais la base configurée sans --no-seed
+    if not args.no_seed:
+        database_path = os.path.join(tempfile.mkdtemp(prefix="bench_"), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+    os.environ.setdefault("DEBUG", "false")
+    # Mesurer l'API, pas la limitation de débit (tous les clients partagent une IP)
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+    prepare_database(args)
+    results = asyncio.run(run_load(args))
+
+    previous = sorted(glob.glob(os.path.join(RESULTS_DIR, "load-*.json")))
+    baseline = args.baseline or (previous[-1] if previous else None)
+    ok = compare(results, baseline, args.max_regression) if baseline else True
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, "load-" + datetime.utcnow().strftime("%Y%m%dT%H%M%S") + ".json")
+        with open(path, "w") as f:
+            json.dump({
+                "created_at": datetime.utcnow().isoformat(),
+                "parameters": {k: v for k, v in vars(args).items() if k not in ("baseline",)},
+                "database": os.environ["DATABASE_URL"].split(":")[0],
+                "scenarios": results,
+            }, f, indent=2)
+        print(f"\nRésultats enregistrés: {os.path.relpath(path, BACKEND_DIR)}")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark du démarrage d'un worker API
+
+Mesure, dans des processus Python neufs, le temps d'import de `app.main`
+puis l'exécution des handlers de démarrage (ce que fait chaque worker
+uvicorn avant de servir). Aucune requête SQL ne doit partir à ce stade.
+
+Usage:
+    python benchmarks/startup.py [--runs 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Exécuté dans un interpréteur neuf: imprime les mesures en JSON
+PROBE = """
+import asyncio, json, time
+t0 = time.perf_counter()
+from app.main import app
+t1 = time.perf_counter()
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+statements = []
+event.listen(Engine, "before_cursor_execute", lambda *a, **k: statements.append(a[2]))
+
+asyncio.run(app.router.startup())
+t2 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "startup_ms": (t2 - t1) * 1000, "statements": len(statements)}))
+"""
+
+
+def run_once(env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Temps de démarrage d'un worker API")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("DEBUG", "false")
+
+    results = [run_once(env) for _ in range(args.runs)]
+
+    for key in ("import_ms", "startup_ms"):
+        values = [r[key] for r in results]
+        print(
+            f"{key:<12} médiane={statistics.median(values):8.1f}  "
+            f"min={min(values):8.1f}  max={max(values):8.1f}"
+        )
+
+    statements = max(r["statements"] for r in results)
+    print(f"requêtes SQL au démarrage: {statements}")
+
+    # Le démarrage doit rester sans DDL ni accès base
+    return 1 if statements else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
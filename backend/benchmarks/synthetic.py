@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Générateur d'organisation synthétique pour les benchmarks
+
+Crée des équipes (un manager chacune), des employés répartis dans les équipes
+et plusieurs années de congés avec des distributions réalistes:
+  - ~6 demandes par personne et par an (loi de Poisson);
+  - types pondérés (congés payés majoritaires, RTT, maladie, ...);
+  - durées dépendant du type, départs concentrés l'été et en fin d'année;
+  - statuts selon la date (passé: surtout validés, futur: beaucoup en attente).
+
+Tous les comptes ont le mot de passe `password` (un seul hachage bcrypt).
+
+Usage:
+    python benchmarks/synthetic.py --users 1000 --teams 20 --years 3
+    DATABASE_URL=postgresql://... python benchmarks/synthetic.py --users 10000
+"""
+import argparse
+import math
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+PASSWORD = "password"
+
+# (type, poids, durée moyenne en jours)
+LEAVE_TYPES = (
+    ("CONGE_PAYE", 60, 6),
+    ("RTT", 20, 1),
+    ("MALADIE", 12, 3),
+    ("CONGÉ_PARENTAL", 3, 20),
+    ("AUTRE", 5, 2),
+)
+
+# Poids mensuels des départs (janvier..décembre): pics en été et en décembre
+MONTH_WEIGHTS = (5, 6, 7, 8, 9, 7, 14, 16, 6, 7, 5, 10)
+
+COMMENTS = (
+    None, None, None, "Vacances en famille", "Mariage", "Déménagement",
+    "Rendez-vous médical", "Hospitalisation", "Garde d'enfant", "Voyage",
+)
+
+
+def _poisson(rng: random.Random, mean: float) -> int:
+    threshold, k, p = math.exp(-mean), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= threshold:
+            return k
+        k += 1
+
+
+def _status_for(rng: random.Random, start: datetime, now: datetime) -> str:
+    if start < now - timedelta(days=30):
+        return rng.choices(("APPROVED", "REJECTED", "CANCELLED"), (85, 10, 5))[0]
+    if start < now:
+        return rng.choices(("APPROVED", "REJECTED", "PENDING"), (80, 10, 10))[0]
+    return rng.choices(("PENDING", "APPROVED", "REJECTED"), (45, 50, 5))[0]
+
+
+def generate_leaves(rng: random.Random, user_ids, manager_ids, years: int, now: datetime):
+    """Générer les lignes leave_requests (dictionnaires prêts pour un INSERT groupé)"""
+    first_year = now.year - years + 1
+    types, weights = [t[0] for t in LEAVE_TYPES], [t[1] for t in LEAVE_TYPES]
+    durations = {t[0]: t[2] for t in LEAVE_TYPES}
+
+    for user_id in user_ids:
+        for year in range(first_year, now.year + 1):
+            for _ in range(_poisson(rng, 6)):
+                leave_type = rng.choices(types, weights)[0]
+                month = rng.choices(range(1, 13), MONTH_WEIGHTS)[0]
+                start = datetime(year, month, rng.randint(1, 28))
+                days = max(1, int(rng.expovariate(1 / durations[leave_type])))
+                end = start + timedelta(days=days - 1)
+                status = _status_for(rng, start, now)
+                created_at = start - timedelta(days=rng.randint(1, 60))
+
+                row = {
+                    "user_id": user_id,
+                    "start_date": start,
+                    "end_date": end,
+                    "leave_type": leave_type,
+                    "status": status,
+                    "comment": rng.choice(COMMENTS),
+                    "rejection_reason": "Période chargée" if status == "REJECTED" else None,
+                    "approved_by_id": rng.choice(manager_ids) if status in ("APPROVED", "REJECTED") else None,
+                    "approved_at": created_at + timedelta(days=1) if status in ("APPROVED", "REJECTED") else None,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+                yield row
+
+
+def seed_organization(db, users: int = 1000, teams: int = 20, years: int = 3, seed: int = 42,
+                      batch_size: int = 5000) -> dict:
+    """Peupler la base avec une organisation synthétique, retourner un résumé"""
+    from sqlalchemy import insert
+    from app.core.config import Role
+    from app.core.security import hash_password
+    from app.models.leave_request import LeaveRequest, LeaveStatus, LeaveType
+    from app.models.team import Team, team_members
+    from app.models.user import User
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    hashed = hash_password(PASSWORD)
+    teams = max(1, min(teams, users))
+
+    def user_row(username, role):
+        return {
+            "username": username,
+            "email": f"{username}@example.com",
+            "hashed_password": hashed,
+            "full_name": username.replace("_", " ").title(),
+            "role": role,
+            "is_active": rng.random() > 0.02,
+            "is_deleted": False,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    rows = [user_row("bench_admin", Role.ADMIN)]
+    rows += [user_row(f"manager_{i:04d}", Role.MANAGER) for i in range(teams)]
+    rows += [user_row(f"employee_{i:06d}", Role.EMPLOYEE) for i in range(users - teams)]
+    db.execute(insert(User), rows)
+
+    ids = dict(db.query(User.username, User.id).filter(
+        User.username.in_([r["username"] for r in rows[:teams + 1]])
+    ).all())
+    manager_ids = [ids[f"manager_{i:04d}"] for i in range(teams)]
+    employee_ids = [
+        user_id for (user_id,) in db.query(User.id).filter(User.role == Role.EMPLOYEE).order_by(User.id)
+    ]
+
+    db.execute(insert(Team), [
+        {"name": f"Équipe {i + 1}", "manager_id": manager_id, "is_active": True,
+         "created_at": now, "updated_at": now}
+        for i, manager_id in enumerate(manager_ids)
+    ])
+    team_ids = [team_id for (team_id,) in db.query(Team.id).order_by(Team.id)][-teams:]
+    memberships = [{"team_id": team_ids[i], "user_id": manager_id} for i, manager_id in enumerate(manager_ids)]
+    memberships += [{"team_id": rng.choice(team_ids), "user_id": user_id} for user_id in employee_ids]
+    db.execute(insert(team_members), memberships)
+
+    leave_count = 0
+    batch = []
+    for row in generate_leaves(rng, employee_ids + manager_ids, manager_ids, years, now):
+        row["leave_type"] = LeaveType[row["leave_type"]]
+        row["status"] = LeaveStatus[row["status"]]
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.execute(insert(LeaveRequest), batch)
+            leave_count += len(batch)
+            batch = []
+    if batch:
+        db.execute(insert(LeaveRequest), batch)
+        leave_count += len(batch)
+
+    db.commit()
+    return {"users": len(rows), "teams": teams, "leaves": leave_count, "password": PASSWORD}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Peupler une base avec une organisation synthétique")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--teams", type=int, default=20)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from app.core.database import get_session
+
+    db = get_session()
+    try:
+        summary = seed_organization(db, args.users, args.teams, args.years, args.seed)
+    finally:
+        db.close()
+
+    print(f"✓ {summary['users']} utilisateurs, {summary['teams']} équipes, {summary['leaves']} congés "
+          f"(mot de passe: {summary['password']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
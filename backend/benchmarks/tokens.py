@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Débit de signature et de vérification des tokens d'accès par backend
+
+Mesure, sur un seul cœur, les signatures et vérifications par seconde de
+chaque backend de `app.core.tokens` disponible:
+
+    hmac     HS256, bibliothèque standard, clé pré-dérivée (défaut)
+    pyjwt    HS256 via PyJWT (si installé)
+    jose     HS256 via python-jose
+    eddsa    Ed25519 via cryptography (clé générée pour le benchmark)
+
+Vérifie aussi que les tokens HS256 sont interchangeables entre backends.
+
+Usage:
+    python benchmarks/tokens.py
+    python benchmarks/tokens.py --seconds 2 --backend hmac --backend eddsa
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+BACKENDS = ("hmac", "pyjwt", "jose", "eddsa")
+PAYLOAD = {"sub": "employee_000001", "user_id": 1, "role": "employee"}
+
+
+def rate(fn, seconds: float) -> float:
+    """Appels par seconde de `fn` sur environ `seconds` secondes"""
+    calls, batch = 0, 100
+    start = time.perf_counter()
+    while True:
+        for _ in range(batch):
+            fn()
+        calls += batch
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return calls / elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Débit des backends de tokens")
+    parser.add_argument("--backend", action="append", choices=BACKENDS)
+    parser.add_argument("--seconds", type=float, default=1.0, help="Durée de mesure par opération")
+    args = parser.parse_args()
+
+    from app.core.tokens import create_token_backend, generate_ed25519_private_key
+
+    key_file = os.path.join(tempfile.mkdtemp(prefix="tokens_"), "ed25519.pem")
+    with open(key_file, "wb") as f:
+        f.write(generate_ed25519_private_key())
+
+    payload = dict(PAYLOAD, exp=int(time.time()) + 3600)
+    secret = "benchmark-secret"
+    reference = create_token_backend("HS256", "hmac", secret).encode(payload)
+
+    ok = True
+    print(f"{'backend':<8} {'signatures/s':>14} {'vérifications/s':>16}  compatibilité HS256")
+    for name in args.backend or BACKENDS:
+        try:
+            if name == "eddsa":
+                backend = create_token_backend("EdDSA", private_key_file=key_file)
+            else:
+                backend = create_token_backend("HS256", name, secret)
+        except (ValueError, ImportError) as e:
+            print(f"{name:<8} indisponible: {e}")
+            continue
+
+        token = backend.encode(payload)
+        assert backend.decode(token)["user_id"] == 1
+        compatible = "-"
+        if name != "eddsa":
+            compatible = "✓" if backend.decode(reference) == payload else "✗"
+            ok &= compatible == "✓"
+
+        sign_rate = rate(lambda: backend.encode(payload), args.seconds)
+        verify_rate = rate(lambda: backend.decode(token), args.seconds)
+        print(f"{name:<8} {sign_rate:>14,.0f} {verify_rate:>16,.0f}  {compatible}")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
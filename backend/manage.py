@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Commandes d'administration (hors du processus API)
+
+Usage:
+    python manage.py migrate            # Appliquer les migrations Alembic
+    python manage.py seed-admin         # Créer l'admin par défaut s'il n'existe pas
+    python manage.py check              # Vérifier la base (connexion, révision, admin)
+    python manage.py check-indexes      # EXPLAIN: les requêtes fréquentes utilisent leurs index
+    python manage.py partitions         # Partitions annuelles de leave_requests (PostgreSQL)
+    python manage.py archive-year 2024  # Archiver une année close (partition ou --parquet DIR)
+    python manage.py purge-tokens       # Supprimer les jetons de rafraîchissement périmés
+    python manage.py generate-signing-key --output jwt_ed25519.pem  # Clé EdDSA des tokens
+
+Le schéma et les données initiales ne sont plus créés au démarrage de l'API:
+ces commandes sont lancées une seule fois par déploiement, avant les workers.
+"""
+import argparse
+import os
+import re
+import sys
+from typing import Optional, Tuple
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import event, inspect, text
+from sqlalchemy.exc import OperationalError
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from app.core.database import engine, get_session  # noqa: E402
+from app.services.user import UserService  # noqa: E402
+
+
+def get_alembic_config() -> Config:
+    """Configuration Alembic pointant sur le dossier migrations/"""
+    config = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BASE_DIR, "migrations"))
+    return config
+
+
+def get_current_revision() -> str:
+    """Révision appliquée sur la base (None si jamais migrée)"""
+    with engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+
+def migrate(args) -> int:
+    """Appliquer les migrations jusqu'à la révision demandée"""
+    config = get_alembic_config()
+
+    # Base créée avant Alembic (ancien create_all au démarrage): marquer le schéma initial
+    tables = inspect(engine).get_table_names()
+    if "users" in tables and "alembic_version" not in tables:
+        print("Schéma existant sans historique Alembic: marquage en révision 0001")
+        command.stamp(config, "0001")
+
+    command.upgrade(config, args.revision)
+    print(f"✓ Base migrée: {get_current_revision()}")
+
+    created = _ensure_partitions(years_ahead=1)
+    if created:
+        print(f"✓ Partitions créées: {', '.join(created)}")
+    return 0
+
+
+def _ensure_partitions(years_ahead: int) -> list:
+    from app.services.partitions import PartitionService
+
+    db = get_session()
+    try:
+        return PartitionService.ensure_partitions(db, years_ahead=years_ahead)
+    finally:
+        db.close()
+
+
+def seed_admin(args) -> int:
+    """Créer l'utilisateur admin par défaut"""
+    password = args.password or os.environ.get("ADMIN_PASSWORD", "admin123")
+
+    db = get_session()
+    try:
+        admin = UserService.create_default_admin(
+            db, username=args.username, email=args.email, password=password
+        )
+    finally:
+        db.close()
+
+    if admin:
+        print(f"✓ Admin créé: {admin.username}")
+    else:
+        print("Un administrateur existe déjà, rien à faire")
+    return 0
+
+
+def check(args) -> int:
+    """Vérifier que la base est prête à servir l'API"""
+    ok = True
+
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        print("✓ Connexion à la base")
+    except Exception as e:
+        print(f"✗ Connexion à la base impossible: {e}")
+        return 1
+
+    head = ScriptDirectory.from_config(get_alembic_config()).get_current_head()
+    current = get_current_revision()
+    if current == head:
+        print(f"✓ Schéma à jour ({current})")
+    else:
+        print(f"✗ Schéma en révision {current}, attendu {head} (lancer: python manage.py migrate)")
+        ok = False
+
+    if ok:
+        from app.core.config import Role
+        from app.models.user import User
+
+        db = get_session()
+        try:
+            has_admin = db.query(User.id).filter(User.role == Role.ADMIN).first() is not None
+        finally:
+            db.close()
+
+        if has_admin:
+            print("✓ Administrateur présent")
+        else:
+            print("✗ Aucun administrateur (lancer: python manage.py seed-admin)")
+            ok = False
+
+    return 0 if ok else 1
+
+
+def _index_checks():
+    """(index attendu, description, appel de service) des requêtes fréquentes"""
+    from app.core.config import Role
+    from app.services.leave import LeaveService
+    from app.services.leave_search import LeaveSearchService
+
+    checks = [
+        ("ix_leave_requests_pending_created_at", "file d'attente des validations",
+         lambda db: LeaveService.list_pending_leaves(db, manager_id=0)),
+        ("ix_users_live_role", "utilisateurs par rôle",
+         lambda db: UserService.list_users(db, role=Role.MANAGER)),
+        ("ix_users_live_role", "utilisateurs actifs par rôle",
+         lambda db: UserService.list_users(db, role=Role.EMPLOYEE, is_active=True)),
+    ]
+    if engine.dialect.name == "postgresql":
+        checks += [
+            ("ix_users_username_trgm", "recherche dans l'annuaire",
+             lambda db: UserService.search_users(db, "dupont")),
+            ("ix_leave_requests_search_vector", "recherche plein texte des congés",
+             lambda db: LeaveSearchService.search(db, "mariage")),
+        ]
+    else:
+        # Annuaire: index en mémoire, sans SQL à vérifier
+        checks.append(("leave_requests_fts", "recherche plein texte des congés",
+                       lambda db: LeaveSearchService.search(db, "mariage")))
+    return checks
+
+
+def _captured_statements(call) -> list:
+    """Requêtes SQL (et paramètres) émises par un appel de service"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    db = get_session()
+    try:
+        call(db)
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", capture)
+    return statements
+
+
+def _explain(connection, statement: str, parameters) -> str:
+    """Plan d'exécution (texte) d'une requête, avec ses paramètres réels"""
+    if connection.dialect.name == "postgresql":
+        # Tables de test souvent petites: interdire le parcours séquentiel pour
+        # vérifier que l'index est utilisable, pas seulement qu'il est rentable
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        rows = connection.exec_driver_sql("EXPLAIN " + statement, parameters).all()
+    else:
+        rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def _index_table(index_name: str):
+    """Table portant l'index `index_name` (None: pas un index du modèle)"""
+    import app.models  # noqa: F401
+    from app.core.database import Base
+
+    for table in Base.metadata.tables.values():
+        if any(index.name == index_name for index in table.indexes):
+            return table.name
+    return None
+
+
+def _usable_on_sqlite(index_name: str, statements: list) -> bool:
+    """L'index peut-il servir l'une des requêtes? (INDEXED BY échoue sinon)
+
+    Sur une base neuve, sans statistiques (ANALYZE), SQLite préfère souvent un
+    autre index; l'équivalent de `enable_seqscan = off` sur PostgreSQL est de
+    lui imposer l'index attendu.
+    """
+    table = _index_table(index_name)
+    if table is None:
+        return False
+    for statement, parameters in statements:
+        forced = re.sub(rf"\bFROM {table}(\s)", rf"FROM {table} INDEXED BY {index_name}\1", statement, count=1)
+        if forced == statement:
+            continue
+        with engine.connect() as connection:
+            try:
+                if index_name in _explain(connection, forced, parameters):
+                    return True
+            except OperationalError:
+                # "no query solution": le prédicat de l'index partiel n'est pas prouvé
+                pass
+    return False
+
+
+def _index_names(index_name: str) -> set:
+    """L'index et, sur une table partitionnée (PostgreSQL), ses index de partition
+
+    Chaque partition reçoit son propre index, nommé automatiquement
+    (`leave_requests_y2026_created_at_idx`): c'est lui qui apparaît dans EXPLAIN.
+    """
+    names = {index_name}
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as connection:
+            names.update(connection.execute(text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(:name)"
+            ), {"name": index_name}).scalars())
+    return names
+
+
+def _check_index(index_name: str, call) -> Tuple[Optional[str], str]:
+    """EXPLAIN des requêtes d'un appel de service: ("utilisé" | "utilisable" | None, plan)"""
+    plans = []
+    statements = _captured_statements(call)
+    for statement, parameters in statements:
+        with engine.connect() as connection:
+            with connection.begin():
+                plans.append(_explain(connection, statement, parameters))
+
+    plan = "\n".join(plans)
+    if any(name in plan for name in _index_names(index_name)):
+        return "utilisé", plan
+    if engine.dialect.name == "sqlite" and _usable_on_sqlite(index_name, statements):
+        return "utilisable", plan
+    return None, plan
+
+
+def check_indexes(args) -> int:
+    """Vérifier par EXPLAIN que les requêtes fréquentes utilisent leurs index partiels"""
+    ok = True
+    for index_name, description, call in _index_checks():
+        verdict, plan = _check_index(index_name, call)
+        if verdict == "utilisé":
+            print(f"✓ {description}: {index_name}")
+        elif verdict == "utilisable":
+            print(f"✓ {description}: {index_name} (utilisable, base sans statistiques)")
+        else:
+            print(f"✗ {description}: {index_name} non utilisé (python manage.py migrate ?)")
+            if args.verbose:
+                print(plan)
+            ok = False
+    return 0 if ok else 1
+
+
+def partitions(args) -> int:
+    """Créer les partitions des années à venir et lister les partitions"""
+    from app.services.partitions import PartitionService
+
+    created = _ensure_partitions(years_ahead=args.years_ahead)
+    for name in created:
+        print(f"✓ Partition créée: {name}")
+
+    db = get_session()
+    try:
+        if not PartitionService.is_partitioned(db):
+            print("leave_requests n'est pas partitionnée (SQLite ou migration 0004 non appliquée)")
+            return 0
+        for partition in PartitionService.list_partitions(db):
+            print(f"  {partition['parent']:<24} {partition['name']:<28} {partition['bounds']:<60} ~{partition['rows']} ligne(s)")
+    finally:
+        db.close()
+    return 0
+
+
+def archive_year(args) -> int:
+    """Archiver une année close dont toutes les demandes sont traitées"""
+    from app.services.partitions import PartitionService
+
+    db = get_session()
+    try:
+        result = PartitionService.archive_year(db, args.year, parquet_dir=args.parquet)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+    finally:
+        db.close()
+
+    print(f"✓ {result['rows']} demande(s) de {result['year']} archivée(s) dans {result['destination']}")
+    return 0
+
+
+def purge_tokens(args) -> int:
+    """Supprimer les jetons de rafraîchissement expirés ou révoqués"""
+    from app.services.auth import AuthService
+
+    db = get_session()
+    try:
+        deleted = AuthService.purge_refresh_tokens(db, older_than_days=args.older_than_days)
+    finally:
+        db.close()
+
+    print(f"✓ {deleted} jeton(s) supprimé(s)")
+    return 0
+
+
+def generate_signing_key(args) -> int:
+    """Créer une clé privée Ed25519 pour signer les tokens (ALGORITHM=EdDSA)"""
+    from app.core.tokens import generate_ed25519_private_key
+
+    if os.path.exists(args.output) and not args.force:
+        print(f"✗ {args.output} existe déjà (--force pour l'écraser)")
+        return 1
+
+    descriptor = os.open(args.output, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descriptor, "wb") as f:
+        f.write(generate_ed25519_private_key())
+    print(f"✓ Clé écrite dans {args.output}: ALGORITHM=EdDSA JWT_PRIVATE_KEY_FILE={args.output}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Administration de l'API de gestion des congés")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Appliquer les migrations Alembic")
+    migrate_parser.add_argument("revision", nargs="?", default="head", help="Révision cible (défaut: head)")
+    migrate_parser.set_defaults(func=migrate)
+
+    seed_parser = subparsers.add_parser("seed-admin", help="Créer l'admin par défaut")
+    seed_parser.add_argument("--username", default="admin")
+    seed_parser.add_argument("--email", default="admin@example.com")
+    seed_parser.add_argument("--password", default=None, help="Défaut: $ADMIN_PASSWORD ou admin123")
+    seed_parser.set_defaults(func=seed_admin)
+
+    check_parser = subparsers.add_parser("check", help="Vérifier l'état de la base")
+    check_parser.set_defaults(func=check)
+
+    indexes_parser = subparsers.add_parser("check-indexes", help="Vérifier l'usage des index (EXPLAIN)")
+    indexes_parser.add_argument("--verbose", action="store_true", help="Afficher les plans en cas d'échec")
+    indexes_parser.set_defaults(func=check_indexes)
+
+    partitions_parser = subparsers.add_parser("partitions", help="Créer et lister les partitions annuelles")
+    partitions_parser.add_argument("--years-ahead", type=int, default=1, help="Années futures à préparer")
+    partitions_parser.set_defaults(func=partitions)
+
+    archive_parser = subparsers.add_parser("archive-year", help="Archiver une année close de leave_requests")
+    archive_parser.add_argument("year", type=int)
+    archive_parser.add_argument("--parquet", metavar="DIR", default=None,
+                                help="Exporter en Parquet (pyarrow) puis supprimer, au lieu d'une partition d'archive")
+    archive_parser.set_defaults(func=archive_year)
+
+    purge_parser = subparsers.add_parser("purge-tokens", help="Supprimer les jetons de rafraîchissement périmés")
+    purge_parser.add_argument("--older-than-days", type=int, default=7,
+                              help="Garder les jetons révoqués récents (détection de réutilisation)")
+    purge_parser.set_defaults(func=purge_tokens)
+
+    key_parser = subparsers.add_parser("generate-signing-key", help="Créer une clé Ed25519 de signature des tokens")
+    key_parser.add_argument("--output", default="jwt_ed25519.pem")
+    key_parser.add_argument("--force", action="store_true")
+    key_parser.set_defaults(func=generate_signing_key)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
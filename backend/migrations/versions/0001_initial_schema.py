@@ -0,0 +1,111 @@
+"""Schéma initial (users, teams, team_members, leave_requests)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLAlchemy stocke les noms des membres des Enum (ADMIN, PENDING, ...)
+role_enum = sa.Enum("ADMIN", "MANAGER", "EMPLOYEE", name="role")
+leave_type_enum = sa.Enum(
+    "CONGE_PAYE", "MALADIE", "RTT", "CONGÉ_PARENTAL", "AUTRE", name="leavetype"
+)
+leave_status_enum = sa.Enum(
+    "PENDING", "APPROVED", "REJECTED", "CANCELLED", name="leavestatus"
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("username", sa.String(length=100), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        sa.Column("hashed_password", sa.String(length=255), nullable=False),
+        sa.Column("full_name", sa.String(length=255), nullable=True),
+        sa.Column("role", role_enum, nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("is_deleted", sa.Boolean(), nullable=False),
+        sa.Column("google_calendar_token", sa.String(length=2048), nullable=True),
+        sa.Column("google_calendar_refresh_token", sa.String(length=1024), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "teams",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("description", sa.String(length=500), nullable=True),
+        sa.Column("manager_id", sa.Integer(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["manager_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_index("ix_teams_id", "teams", ["id"])
+
+    op.create_table(
+        "team_members",
+        sa.Column("team_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["team_id"], ["teams.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("team_id", "user_id"),
+    )
+
+    op.create_table(
+        "leave_requests",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("start_date", sa.DateTime(), nullable=False),
+        sa.Column("end_date", sa.DateTime(), nullable=False),
+        sa.Column("leave_type", leave_type_enum, nullable=False),
+        sa.Column("status", leave_status_enum, nullable=False),
+        sa.Column("comment", sa.Text(), nullable=True),
+        sa.Column("rejection_reason", sa.Text(), nullable=True),
+        sa.Column("approved_by_id", sa.Integer(), nullable=True),
+        sa.Column("approved_at", sa.DateTime(), nullable=True),
+        sa.Column("calendar_event_id", sa.String(length=255), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["approved_by_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_leave_requests_id", "leave_requests", ["id"])
+    op.create_index("ix_leave_requests_user_id", "leave_requests", ["user_id"])
+    op.create_index("ix_leave_requests_start_date", "leave_requests", ["start_date"])
+    op.create_index("ix_leave_requests_end_date", "leave_requests", ["end_date"])
+    op.create_index("ix_leave_requests_status", "leave_requests", ["status"])
+    op.create_index("ix_leave_requests_created_at", "leave_requests", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("leave_requests")
+    op.drop_table("team_members")
+    op.drop_table("teams")
+    op.drop_table("users")
+
+    bind = op.get_bind()
+    leave_status_enum.drop(bind, checkfirst=True)
+    leave_type_enum.drop(bind, checkfirst=True)
+    role_enum.drop(bind, checkfirst=True)
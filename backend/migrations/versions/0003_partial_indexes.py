@@ -0,0 +1,41 @@
+"""Index partiels des requêtes fréquentes (file d'attente, utilisateurs actifs)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Les Enum sont stockés par nom de membre: 'PENDING', pas 'pending'
+    op.create_index(
+        "ix_leave_requests_pending_created_at", "leave_requests", ["created_at"],
+        postgresql_where=sa.text("status = 'PENDING'"),
+        sqlite_where=sa.text("status = 'PENDING'"),
+    )
+    op.create_index(
+        "ix_users_live_role", "users", ["role", "is_active"],
+        postgresql_where=sa.text("NOT is_deleted"),
+        sqlite_where=sa.text("is_deleted = 0"),
+    )
+    # Statistiques à jour: sans elles SQLite préfère ix_leave_requests_status
+    # (égalité) et trie en mémoire au lieu de parcourir l'index partiel déjà trié
+    op.execute("ANALYZE leave_requests")
+    op.execute("ANALYZE users")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_live_role", table_name="users")
+    op.drop_index("ix_leave_requests_pending_created_at", table_name="leave_requests")
@@ -0,0 +1,144 @@
+"""Partitionnement annuel de leave_requests (PostgreSQL)
+
+leave_requests devient une table partitionnée par intervalle sur start_date:
+une partition par année (`leave_requests_y2026`) et une partition par défaut
+pour les dates hors des années créées. `leave_requests_archive` reçoit les
+années closes (python manage.py archive-year). La clé primaire inclut la clé
+de partitionnement: (id, start_date); les identifiants restent tirés de la
+séquence leave_requests_id_seq, conservée.
+
+Sur SQLite, la table reste unique: cette migration ne fait rien.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Types Enum déjà créés par 0001 (noms des membres)
+leave_type_enum = postgresql.ENUM(name="leavetype", create_type=False)
+leave_status_enum = postgresql.ENUM(name="leavestatus", create_type=False)
+
+COLUMNS = (
+    "id, user_id, start_date, end_date, leave_type, status, comment, rejection_reason, "
+    "approved_by_id, approved_at, calendar_event_id, created_at, updated_at"
+)
+
+
+def _leave_columns(with_sequence: bool) -> list:
+    id_default = sa.text("nextval('leave_requests_id_seq')") if with_sequence else None
+    return [
+        sa.Column("id", sa.Integer(), nullable=False, server_default=id_default),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("start_date", sa.DateTime(), nullable=False),
+        sa.Column("end_date", sa.DateTime(), nullable=False),
+        sa.Column("leave_type", leave_type_enum, nullable=False),
+        sa.Column("status", leave_status_enum, nullable=False),
+        sa.Column("comment", sa.Text(), nullable=True),
+        sa.Column("rejection_reason", sa.Text(), nullable=True),
+        sa.Column("approved_by_id", sa.Integer(), nullable=True),
+        sa.Column("approved_at", sa.DateTime(), nullable=True),
+        sa.Column("calendar_event_id", sa.String(length=255), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["approved_by_id"], ["users.id"]),
+    ]
+
+
+def _create_indexes() -> None:
+    """Index de 0001 et 0003, créés sur la table mère (propagés aux partitions)"""
+    op.create_index("ix_leave_requests_id", "leave_requests", ["id"])
+    op.create_index("ix_leave_requests_user_id", "leave_requests", ["user_id"])
+    op.create_index("ix_leave_requests_start_date", "leave_requests", ["start_date"])
+    op.create_index("ix_leave_requests_end_date", "leave_requests", ["end_date"])
+    op.create_index("ix_leave_requests_status", "leave_requests", ["status"])
+    op.create_index("ix_leave_requests_created_at", "leave_requests", ["created_at"])
+    op.create_index(
+        "ix_leave_requests_pending_created_at", "leave_requests", ["created_at"],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name != "postgresql":
+        return
+
+    # La séquence survit à l'ancienne table et alimente la nouvelle
+    op.execute("ALTER SEQUENCE leave_requests_id_seq OWNED BY NONE")
+
+    op.create_table(
+        "leave_requests_partitioned",
+        *_leave_columns(with_sequence=True),
+        sa.PrimaryKeyConstraint("id", "start_date", name="leave_requests_partitioned_pkey"),
+        postgresql_partition_by="RANGE (start_date)",
+    )
+
+    # Une partition par année présente dans les données, jusqu'à l'année prochaine
+    op.execute("""
+        DO $$
+        DECLARE
+            y integer;
+            current_year integer := extract(year FROM now())::integer;
+        BEGIN
+            FOR y IN SELECT generate_series(
+                LEAST(COALESCE((SELECT min(extract(year FROM start_date))::integer FROM leave_requests), current_year), current_year),
+                GREATEST(COALESCE((SELECT max(extract(year FROM start_date))::integer FROM leave_requests), current_year), current_year + 1)
+            ) LOOP
+                EXECUTE format(
+                    'CREATE TABLE leave_requests_y%s PARTITION OF leave_requests_partitioned FOR VALUES FROM (%L) TO (%L)',
+                    y, make_date(y, 1, 1), make_date(y + 1, 1, 1)
+                );
+            END LOOP;
+        END $$
+    """)
+    op.execute("CREATE TABLE leave_requests_default PARTITION OF leave_requests_partitioned DEFAULT")
+
+    op.execute(f"INSERT INTO leave_requests_partitioned ({COLUMNS}) SELECT {COLUMNS} FROM leave_requests")
+    op.drop_table("leave_requests")
+    op.rename_table("leave_requests_partitioned", "leave_requests")
+    op.execute("ALTER TABLE leave_requests RENAME CONSTRAINT leave_requests_partitioned_pkey TO leave_requests_pkey")
+    op.execute("ALTER SEQUENCE leave_requests_id_seq OWNED BY leave_requests.id")
+    _create_indexes()
+
+    # Années archivées: même structure, sans index secondaires
+    op.create_table(
+        "leave_requests_archive",
+        *_leave_columns(with_sequence=False),
+        sa.PrimaryKeyConstraint("id", "start_date", name="leave_requests_archive_pkey"),
+        postgresql_partition_by="RANGE (start_date)",
+    )
+    op.execute("ANALYZE leave_requests")
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER SEQUENCE leave_requests_id_seq OWNED BY NONE")
+    op.create_table(
+        "leave_requests_single",
+        *_leave_columns(with_sequence=True),
+        sa.PrimaryKeyConstraint("id", name="leave_requests_single_pkey"),
+    )
+    # Les années archivées en partition reviennent dans la table unique
+    op.execute(f"INSERT INTO leave_requests_single ({COLUMNS}) SELECT {COLUMNS} FROM leave_requests")
+    op.execute(f"INSERT INTO leave_requests_single ({COLUMNS}) SELECT {COLUMNS} FROM leave_requests_archive")
+    op.drop_table("leave_requests_archive")
+    op.drop_table("leave_requests")
+    op.rename_table("leave_requests_single", "leave_requests")
+    op.execute("ALTER TABLE leave_requests RENAME CONSTRAINT leave_requests_single_pkey TO leave_requests_pkey")
+    op.execute("ALTER SEQUENCE leave_requests_id_seq OWNED BY leave_requests.id")
+    _create_indexes()
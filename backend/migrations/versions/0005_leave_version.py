@@ -0,0 +1,33 @@
+"""Version des demandes de congé (concurrence optimiste)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _archive_tables() -> list:
+    # PostgreSQL: les partitions archivées doivent garder les colonnes de la table chaude
+    return ["leave_requests_archive"] if op.get_context().dialect.name == "postgresql" else []
+
+
+def upgrade() -> None:
+    for table in ["leave_requests"] + _archive_tables():
+        op.add_column(table, sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    for table in ["leave_requests"] + _archive_tables():
+        op.drop_column(table, "version")
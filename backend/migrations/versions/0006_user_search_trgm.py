@@ -0,0 +1,44 @@
+"""Index trigrammes de l'annuaire des utilisateurs (PostgreSQL, pg_trgm)
+
+Index GIN `gin_trgm_ops` sur username, full_name et email: préfixes (ILIKE)
+et recherche approchée (`<%`) de /api/users/search. Sur SQLite, la recherche
+utilise un index en mémoire: cette migration ne fait rien.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ("username", "full_name", "email")
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name != "postgresql":
+        return
+
+    # Extension fournie par postgresql-contrib (incluse dans l'image officielle)
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in COLUMNS:
+        op.create_index(
+            f"ix_users_{column}_trgm", "users", [column],
+            postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != "postgresql":
+        return
+
+    for column in reversed(COLUMNS):
+        op.drop_index(f"ix_users_{column}_trgm", table_name="users")
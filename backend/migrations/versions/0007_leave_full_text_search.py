@@ -0,0 +1,89 @@
+"""Recherche plein texte dans les commentaires et motifs de refus des congés
+
+PostgreSQL: colonne générée `search_vector` (tsvector, configuration french;
+commentaire pondéré A, motif de refus B) et index GIN. La colonne existe aussi
+sur leave_requests_archive, sans index: une partition archivée doit avoir les
+mêmes colonnes générées que sa table mère.
+
+SQLite: table FTS5 à contenu externe `leave_requests_fts` (unicode61, accents
+ignorés) tenue à jour par des triggers.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('french'::regconfig, coalesce(comment, '')), 'A') || "
+    "setweight(to_tsvector('french'::regconfig, coalesce(rejection_reason, '')), 'B')"
+)
+
+
+def _upgrade_postgresql() -> None:
+    for table in ("leave_requests", "leave_requests_archive"):
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED"
+        )
+    op.create_index(
+        "ix_leave_requests_search_vector", "leave_requests", ["search_vector"],
+        postgresql_using="gin",
+    )
+
+
+def _upgrade_sqlite() -> None:
+    op.execute(
+        "CREATE VIRTUAL TABLE leave_requests_fts USING fts5("
+        "comment, rejection_reason, content='leave_requests', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute("INSERT INTO leave_requests_fts(leave_requests_fts) VALUES ('rebuild')")
+    op.execute(
+        "CREATE TRIGGER leave_requests_fts_insert AFTER INSERT ON leave_requests BEGIN "
+        "INSERT INTO leave_requests_fts(rowid, comment, rejection_reason) "
+        "VALUES (new.id, new.comment, new.rejection_reason); END"
+    )
+    op.execute(
+        "CREATE TRIGGER leave_requests_fts_delete AFTER DELETE ON leave_requests BEGIN "
+        "INSERT INTO leave_requests_fts(leave_requests_fts, rowid, comment, rejection_reason) "
+        "VALUES ('delete', old.id, old.comment, old.rejection_reason); END"
+    )
+    op.execute(
+        "CREATE TRIGGER leave_requests_fts_update AFTER UPDATE OF comment, rejection_reason "
+        "ON leave_requests BEGIN "
+        "INSERT INTO leave_requests_fts(leave_requests_fts, rowid, comment, rejection_reason) "
+        "VALUES ('delete', old.id, old.comment, old.rejection_reason); "
+        "INSERT INTO leave_requests_fts(rowid, comment, rejection_reason) "
+        "VALUES (new.id, new.comment, new.rejection_reason); END"
+    )
+
+
+def upgrade() -> None:
+    dialect = op.get_context().dialect.name
+    if dialect == "postgresql":
+        _upgrade_postgresql()
+    elif dialect == "sqlite":
+        _upgrade_sqlite()
+
+
+def downgrade() -> None:
+    dialect = op.get_context().dialect.name
+    if dialect == "postgresql":
+        op.drop_index("ix_leave_requests_search_vector", table_name="leave_requests")
+        for table in ("leave_requests", "leave_requests_archive"):
+            op.drop_column(table, "search_vector")
+    elif dialect == "sqlite":
+        for trigger in ("insert", "delete", "update"):
+            op.execute(f"DROP TRIGGER leave_requests_fts_{trigger}")
+        op.execute("DROP TABLE leave_requests_fts")
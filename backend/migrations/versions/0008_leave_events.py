@@ -0,0 +1,81 @@
+"""Journal des demandes de congé (leave_events), en ajout seul
+
+Un événement par transition (création, modification, validation, refus),
+avec la version et le statut qui en résultent. Des triggers refusent toute
+modification ou suppression. Les demandes existantes n'ont pas d'historique:
+leur chronologie commence à leur prochaine écriture.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Noms des membres, comme les colonnes status existantes
+LEAVE_STATUSES = ("PENDING", "APPROVED", "REJECTED", "CANCELLED")
+
+
+def upgrade() -> None:
+    dialect = op.get_context().dialect.name
+    if dialect == "postgresql":
+        # Type déjà créé par 0001
+        status_type = postgresql.ENUM(name="leavestatus", create_type=False)
+    else:
+        status_type = sa.Enum(*LEAVE_STATUSES, name="leavestatus")
+
+    op.create_table(
+        "leave_events",
+        sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), nullable=False),
+        sa.Column("leave_id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("event_type", sa.String(length=20), nullable=False),
+        sa.Column("status", status_type, nullable=False),
+        sa.Column("actor_id", sa.Integer(), nullable=True),
+        sa.Column("changes", sa.JSON(), nullable=False),
+        sa.Column("occurred_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["actor_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_leave_events_leave_id_version", "leave_events", ["leave_id", "version"])
+
+    if dialect == "postgresql":
+        op.execute("""
+            CREATE FUNCTION leave_events_append_only() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                RAISE EXCEPTION 'leave_events est en ajout seul (% refusé)', TG_OP;
+            END $$
+        """)
+        op.execute(
+            "CREATE TRIGGER leave_events_append_only BEFORE UPDATE OR DELETE ON leave_events "
+            "FOR EACH ROW EXECUTE FUNCTION leave_events_append_only()"
+        )
+    elif dialect == "sqlite":
+        for operation in ("UPDATE", "DELETE"):
+            op.execute(
+                f"CREATE TRIGGER leave_events_no_{operation.lower()} BEFORE {operation} ON leave_events "
+                f"BEGIN SELECT RAISE(ABORT, 'leave_events est en ajout seul ({operation} refusé)'); END"
+            )
+
+
+def downgrade() -> None:
+    dialect = op.get_context().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP TRIGGER leave_events_append_only ON leave_events")
+        op.execute("DROP FUNCTION leave_events_append_only()")
+    elif dialect == "sqlite":
+        for operation in ("update", "delete"):
+            op.execute(f"DROP TRIGGER leave_events_no_{operation}")
+    op.drop_index("ix_leave_events_leave_id_version", table_name="leave_events")
+    op.drop_table("leave_events")
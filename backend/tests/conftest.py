@@ -0,0 +1,122 @@
+"""Configuration commune des tests
+
+L'environnement est fixé avant tout import de `app`: base SQLite jetable
+(jamais la DATABASE_URL du poste), cache en mémoire, limitation de débit
+désactivée.
+"""
+import os
+import sys
+import tempfile
+import threading
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "benchmarks"))
+
+TEST_DIR = tempfile.mkdtemp(prefix="gestion_absence_tests_")
+os.environ.update({
+    "DATABASE_URL": "sqlite:///" + os.path.join(TEST_DIR, "test.db"),
+    "CACHE_URL": "memory://",
+    "RATE_LIMIT_ENABLED": "false",
+    "QUERY_AUDIT_ENABLED": "false",
+    "DEBUG": "false",
+})
+
+
+@pytest.fixture
+def blocking_cache(monkeypatch):
+    """Cache mémoire qui se déclare bloquant et note le thread de chaque appel"""
+    from app.core import cache as cache_module, idempotency
+    from app.core.cache import LocalCache
+
+    class BlockingCache(LocalCache):
+        blocking_io = True
+
+        def __init__(self):
+            super().__init__()
+            self.threads = []
+
+        def _record(self):
+            self.threads.append(threading.current_thread())
+
+        def get(self, *args, **kwargs):
+            self._record()
+            return super().get(*args, **kwargs)
+
+        def throttle(self, *args, **kwargs):
+            self._record()
+            return super().throttle(*args, **kwargs)
+
+    cache = BlockingCache()
+    monkeypatch.setattr(cache_module, "get_cache", lambda: cache)
+    monkeypatch.setattr(idempotency, "get_cache", lambda: cache)
+    return cache
+
+
+PASSWORD = "password"
+
+
+@pytest.fixture(scope="session")
+def users():
+    """Base migrée (alembic) et peuplée: {username: id} d'un admin, d'un manager et de deux employés"""
+    import manage
+    from app.core.config import Role
+    from app.core.database import get_session
+    from app.schemas.user import UserCreate
+    from app.services.user import UserService
+
+    assert manage.main(["migrate"]) == 0
+    db = get_session()
+    try:
+        return {
+            username: UserService.create_user(db, UserCreate(
+                username=username, email=f"{username}@example.com", password=PASSWORD,
+                full_name=username.title(), role=role,
+            )).id
+            for username, role in (
+                ("admin", Role.ADMIN), ("manager", Role.MANAGER),
+                ("alice", Role.EMPLOYEE), ("bob", Role.EMPLOYEE),
+            )
+        }
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="session")
+def client(users):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def strict_client(users, monkeypatch):
+    """Application derrière l'audit SQL strict: un dépassement de budget fait échouer la requête"""
+    from fastapi.testclient import TestClient
+
+    from app.core.config import settings
+    from app.core.query_audit import QueryAuditMiddleware
+    from app.main import app
+
+    monkeypatch.setattr(settings, "QUERY_AUDIT_STRICT", True)
+    return TestClient(QueryAuditMiddleware(app), raise_server_exceptions=False)
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    """auth_headers("alice") -> en-tête Authorization d'une session de cet utilisateur"""
+    tokens = {}
+
+    def headers(username: str) -> dict:
+        if username not in tokens:
+            response = client.post("/api/auth/login", json={"username": username, "password": PASSWORD})
+            assert response.status_code == 200, response.text
+            tokens[username] = response.json()["access_token"]
+        return {"Authorization": f"Bearer {tokens[username]}"}
+
+    return headers
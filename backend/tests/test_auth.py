@@ -0,0 +1,50 @@
+"""Connexion et rafraîchissement: budgets SQL, rotation des jetons"""
+from app.core.config import settings
+from conftest import PASSWORD
+
+
+def test_login_and_refresh_stay_within_query_budget(strict_client):
+    login = strict_client.post("/api/auth/login", json={"username": "alice", "password": PASSWORD})
+    assert login.status_code == 200, login.text
+
+    refresh = strict_client.post("/api/auth/refresh", json={"refresh_token": login.json()["refresh_token"]})
+    assert refresh.status_code == 200, refresh.text
+    assert refresh.json()["username"] == "alice"
+
+
+def login(client, username: str) -> dict:
+    return client.post("/api/auth/login", json={"username": username, "password": PASSWORD}).json()
+
+
+def test_recently_replaced_token_gets_a_new_token_without_revoking(client):
+    session = login(client, "alice")
+
+    # Deux onglets présentent le même jeton
+    first = client.post("/api/auth/refresh", json={"refresh_token": session["refresh_token"]})
+    second = client.post("/api/auth/refresh", json={"refresh_token": session["refresh_token"]})
+
+    assert first.status_code == second.status_code == 200
+    for response in (first, second):
+        assert client.post("/api/auth/refresh", json={"refresh_token": response.json()["refresh_token"]}).status_code == 200
+
+
+def test_reuse_after_grace_period_revokes_session(client, monkeypatch):
+    monkeypatch.setattr(settings, "REFRESH_TOKEN_REUSE_GRACE_SECONDS", 0)
+    session = login(client, "bob")
+
+    first = client.post("/api/auth/refresh", json={"refresh_token": session["refresh_token"]})
+    replayed = client.post("/api/auth/refresh", json={"refresh_token": session["refresh_token"]})
+
+    assert first.status_code == 200
+    assert replayed.status_code == 401
+    # Réutilisation: toute la session est révoquée
+    assert client.post("/api/auth/refresh", json={"refresh_token": first.json()["refresh_token"]}).status_code == 401
+
+
+def test_token_of_logged_out_session_is_not_accepted(client):
+    session = login(client, "alice")
+    refreshed = client.post("/api/auth/refresh", json={"refresh_token": session["refresh_token"]}).json()
+
+    client.post("/api/auth/logout", json={"refresh_token": refreshed["refresh_token"]})
+
+    assert client.post("/api/auth/refresh", json={"refresh_token": session["refresh_token"]}).status_code == 401
@@ -0,0 +1,87 @@
+"""Micro-benchmarks de la couche service (pytest-benchmark, `benchmarks/micro.py` en plus petit)
+
+Ignorés si pytest-benchmark n'est pas installé (`pip install -r requirements-dev.txt`).
+`pytest --benchmark-skip` les saute, `pytest --benchmark-disable` les exécute une
+fois chacun comme de simples tests.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.core.security import create_access_token, decode_token
+from app.schemas.leave import LeaveRequestResponse
+from app.services.leave import LeaveService
+from app.services.user import UserService
+from micro import build_csv, build_leaves
+from synthetic import seed_organization
+
+
+@pytest.fixture(scope="module")
+def db():
+    """Organisation synthétique dans une base SQLite en mémoire, distincte de celle des tests"""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    seed_organization(session, users=200, teams=4)
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_list_team_leaves(benchmark, db):
+    month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(seconds=1)
+
+    def list_team_leaves():
+        db.expunge_all()
+        return LeaveService.list_team_leaves(db, month_start, month_end)
+
+    assert benchmark(list_team_leaves)
+
+
+def test_get_statistics(benchmark, db):
+    statistics = benchmark(LeaveService.get_statistics, db)
+
+    assert statistics["total"] > 0
+
+
+def test_from_orm_1k(benchmark):
+    leaves = build_leaves(1000)
+
+    responses = benchmark(lambda: [LeaveRequestResponse.from_orm(leave) for leave in leaves])
+
+    assert len(responses) == 1000
+
+
+def test_import_csv(benchmark, db):
+    rows = 5
+    prefixes = iter(range(1_000_000))
+
+    def import_csv(content):
+        # Pas de commit: la transaction est annulée après chaque tour
+        commit, db.commit = db.commit, db.flush
+        try:
+            return UserService.import_users_from_csv(db, content)
+        finally:
+            db.commit = commit
+            db.rollback()
+
+    # bcrypt domine: peu de tours
+    created, errors = benchmark.pedantic(
+        import_csv, setup=lambda: ((build_csv(rows, f"csv{next(prefixes)}_"),), {}), rounds=2
+    )
+
+    assert created == rows and not errors
+
+
+def test_decode_token(benchmark):
+    token = create_access_token({"sub": "employee", "user_id": 1, "role": "employee"})
+
+    assert benchmark(decode_token, token)["sub"] == "employee"
@@ -0,0 +1,122 @@
+"""Cache: backend Redis contre le serveur factice (`benchmarks/fake_redis.py`), verrous, étiquettes"""
+import time
+
+import pytest
+
+from app.core.cache import CacheBackend, CacheError, LocalCache, RedisCache, RedisConnection, SQLiteCache
+from fake_redis import FakeRedisServer
+
+
+@pytest.fixture
+def server():
+    server = FakeRedisServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def cache(server):
+    return RedisCache(server.url, prefix="test:")
+
+
+def test_error_mid_pipeline_leaves_connection_in_sync(server, cache):
+    cache.set("a", "A")
+    cache.set("b", "B")
+    # SET en erreur: les réponses de SADD et PEXPIRE doivent quand même être lues
+    server.fail_next("SET", "WRONGTYPE erreur injectée")
+    with pytest.raises(CacheError, match="WRONGTYPE"):
+        cache.set("a", "A2", tags=("t",))
+    assert cache.get("b") == "B"
+    assert cache.get("a") == "A"
+
+
+def test_server_error_reply_does_not_break_connection(cache):
+    cache.set("n", "pas un entier")
+    with pytest.raises(CacheError, match="not an integer"):
+        cache.incr("n")
+    assert cache.get("n") == "pas un entier"
+
+
+def test_protocol_error_closes_connection(server):
+    connection = RedisConnection(*server.server_address[:2])
+    connection._file.readline = lambda: b"?inattendu\r\n"
+    with pytest.raises(CacheError):
+        connection.execute("PING")
+    assert connection.closed
+
+
+def test_release_keeps_lock_taken_by_another_worker(cache):
+    stale_token = cache._acquire("job", 10.0, lease=0.05)
+    time.sleep(0.1)
+    token = cache._acquire("job", 10.0, lease=10.0)
+    assert token is not None
+
+    cache._release("job", stale_token)
+    assert cache._acquire("job", 0.01, lease=10.0) is None
+
+    cache._release("job", token)
+    assert cache._acquire("job", 0.01, lease=10.0) is not None
+
+
+@pytest.mark.parametrize("backend", ["redis", "sqlite"])
+def test_short_wait_does_not_shorten_the_lease(backend, cache, tmp_path):
+    if backend == "sqlite":
+        cache = SQLiteCache(str(tmp_path / "cache.db"))
+
+    with cache.lock("job", timeout=0.01, lease=10.0) as acquired:
+        assert acquired
+        time.sleep(0.05)
+        # Au-delà du temps d'attente du détenteur, le verrou est toujours tenu
+        assert cache._acquire("job", 0.01, lease=10.0) is None
+
+
+def test_local_cache_drops_keys_from_their_tags():
+    cache = LocalCache(maxsize=2)
+    cache.set("supprimee", 1, tags=("t",))
+    cache.set("expiree", 2, ttl=0.01, tags=("t",))
+    cache.delete("supprimee")
+    time.sleep(0.02)
+    assert cache.get("expiree") is None
+    assert cache._tags == {} and cache._key_tags == {}
+
+    for i in range(5):
+        cache.set(f"k{i}", i, tags=("t", f"k{i}"))
+
+    assert cache._tags == {"t": {"k3", "k4"}, "k3": {"k3"}, "k4": {"k4"}}
+    assert set(cache._key_tags) == {"k3", "k4"}
+
+
+def test_clear_scans_only_prefixed_keys(server, cache):
+    for i in range(2500):
+        cache.set(f"k{i}", i)
+    RedisCache(server.url, prefix="autre:").set("garde", 1)
+
+    cache.clear()
+
+    assert cache.get("k0") is None and cache.get("k2499") is None
+    assert RedisCache(server.url, prefix="autre:").get("garde") == 1
+
+
+def test_reconnects_after_server_side_close(server, cache):
+    cache.set("a", "A")
+    # Connexion fermée par le serveur pendant l'inactivité
+    cache._local.connection._sock.shutdown(2)
+    assert cache.get("a") == "A"
+
+
+def test_throttle_admits_burst_then_reports_retry_after(cache):
+    admitted = [cache.throttle("bucket", 5, 60)[0] for _ in range(8)]
+    allowed, retry_after = cache.throttle("bucket", 5, 60)
+
+    assert admitted == [True] * 5 + [False] * 3
+    assert not allowed and 0 < retry_after <= 12
+
+
+def test_backend_must_implement_the_interface():
+    class Incomplete(CacheBackend):
+        def get(self, key, default=None):
+            return default
+
+    with pytest.raises(TypeError):
+        Incomplete()
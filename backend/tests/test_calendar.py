@@ -0,0 +1,44 @@
+"""Instantanés mensuels du calendrier: validation concurrente d'un chargement"""
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.core.cache import LocalCache
+from app.models.leave_request import LeaveStatus
+from app.services import calendar
+from app.services.calendar import CalendarService
+
+
+def approved_leave(leave_id: int = 7):
+    return SimpleNamespace(
+        id=leave_id, status=LeaveStatus.APPROVED, employee_name="Alice", employee_email="alice@example.com",
+        start_date=datetime(2026, 3, 2), end_date=datetime(2026, 3, 6),
+    )
+
+
+def test_approval_during_month_load_is_not_lost(monkeypatch):
+    cache = LocalCache()
+    monkeypatch.setattr(calendar, "get_cache", lambda: cache)
+    key = CalendarService._key("all", datetime(2026, 3, 1))
+    leave = approved_leave()
+
+    # Chargement en cours: la base a été lue avant la validation
+    with cache.lock("calendar:all:load"):
+        apply = threading.Thread(target=CalendarService.apply_leave, args=(leave,))
+        apply.start()
+        time.sleep(0.1)
+        assert apply.is_alive()
+        cache.set(key, {})
+    apply.join(5)
+
+    assert leave.id in cache.get(key)
+
+
+def test_approval_for_uncached_month_creates_nothing(monkeypatch):
+    cache = LocalCache()
+    monkeypatch.setattr(calendar, "get_cache", lambda: cache)
+
+    CalendarService.apply_leave(approved_leave())
+
+    assert cache.get(CalendarService._key("all", datetime(2026, 3, 1))) is None
@@ -0,0 +1,87 @@
+"""Compression des réponses: corps d'un bloc et corps en plusieurs morceaux"""
+import asyncio
+import gzip
+import zlib
+
+import pytest
+
+from app.core.compression import CompressionMiddleware
+
+
+def run(app, accept_encoding: str = "gzip") -> list:
+    """Appel ASGI direct: messages envoyés par le middleware, dans l'ordre"""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=100)(scope, receive, send))
+    return sent
+
+
+def json_app(chunks):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        for i, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1})
+    return app
+
+
+def test_single_body_is_compressed_with_length():
+    body = b'{"leaves": [' + b'{"id": 1}, ' * 100 + b"]}"
+    start, message = run(json_app([body]))
+
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert int(headers[b"content-length"]) == len(message["body"]) < len(body)
+    assert gzip.decompress(message["body"]) == body
+
+
+def test_small_single_body_is_sent_as_is():
+    start, message = run(json_app([b'{"id": 1}']))
+
+    assert b"content-encoding" not in dict(start["headers"])
+    assert message["body"] == b'{"id": 1}'
+
+
+def test_streamed_body_is_compressed_chunk_by_chunk():
+    chunks = [b"ligne %d\n" % i * 50 for i in range(3)]
+
+    sent = run(json_app(chunks))
+    headers = dict(sent[0]["headers"])
+    bodies = sent[1:]
+
+    assert headers[b"content-encoding"] == b"gzip" and b"content-length" not in headers
+    assert len(bodies) == 3 and [m["more_body"] for m in bodies] == [True, True, False]
+    # Chaque morceau décompressable dès réception (pas de mise en mémoire du corps)
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert [decompressor.decompress(m["body"]) for m in bodies] == chunks
+
+
+def test_streamed_body_with_brotli():
+    brotli = pytest.importorskip("brotli")
+    chunks = [b'{"id": %d}\n' % i * 40 for i in range(3)]
+
+    sent = run(json_app(chunks), accept_encoding="br, gzip")
+
+    assert dict(sent[0]["headers"])[b"content-encoding"] == b"br"
+    decompressor = brotli.Decompressor()
+    assert [decompressor.process(m["body"]) for m in sent[1:]] == chunks
+
+
+@pytest.mark.parametrize("content_type", [b"image/png", b"application/octet-stream"])
+def test_incompressible_stream_is_passed_through(content_type):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", content_type)]})
+        await send({"type": "http.response.body", "body": b"x" * 500, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    sent = run(app)
+
+    assert b"content-encoding" not in dict(sent[0]["headers"])
+    assert sent[1]["body"] == b"x" * 500
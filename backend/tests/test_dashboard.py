@@ -0,0 +1,33 @@
+"""Tableau de bord: budget SQL, sections parallèles comptées par l'audit"""
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.query_audit import audit_queries
+from app.services.dashboard import DashboardService
+
+
+@pytest.mark.parametrize("username", ["alice", "manager", "admin"])
+def test_dashboard_stays_within_query_budget(strict_client, auth_headers, username):
+    response = strict_client.get("/api/dashboard", headers=auth_headers(username))
+
+    assert response.status_code == 200, response.text
+    assert response.json()["role_view"] == ("employee" if username == "alice" else username)
+
+
+def test_parallel_sections_are_audited(users, monkeypatch):
+    monkeypatch.setattr(settings, "DASHBOARD_PARALLEL_QUERIES", 2)
+    # Session de la requête vue comme PostgreSQL: chemin parallèle, même sur SQLite
+    db = SimpleNamespace(
+        get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="postgresql")),
+        commit=lambda: None,
+    )
+    section = lambda session: session.execute(text("SELECT 1")).scalar()
+
+    with audit_queries(label="dashboard") as audit:
+        result = DashboardService.run_sections(db, {"a": section, "b": section, "c": section})
+
+    assert result == {"a": 1, "b": 1, "c": 1}
+    assert audit.count == 3
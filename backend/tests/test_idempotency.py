@@ -0,0 +1,60 @@
+"""Middleware Idempotency-Key: rejeu, clé réutilisée, accès au cache hors boucle d'événements"""
+import threading
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.idempotency import IdempotencyMiddleware
+
+executions = []
+loop_threads = []
+
+
+async def create_leave(request):
+    loop_threads.append(threading.current_thread())
+    executions.append(await request.json())
+    return JSONResponse({"id": len(executions)}, status_code=201)
+
+
+def build_client():
+    executions.clear()
+    app = Starlette(routes=[Route("/api/leaves/", create_leave, methods=["POST"])])
+    return TestClient(IdempotencyMiddleware(app))
+
+
+def test_repeated_key_replays_first_response_off_the_event_loop(blocking_cache):
+    client = build_client()
+    headers = {"Idempotency-Key": "abc"}
+
+    first = client.post("/api/leaves/", json={"days": 2}, headers=headers)
+    second = client.post("/api/leaves/", json={"days": 2}, headers=headers)
+
+    assert first.status_code == second.status_code == 201
+    assert second.json() == first.json() == {"id": 1}
+    assert second.headers["idempotent-replayed"] == "true"
+    assert len(executions) == 1
+    assert blocking_cache.threads and not set(blocking_cache.threads) & set(loop_threads)
+
+
+def test_key_reused_for_another_body_is_rejected(blocking_cache):
+    client = build_client()
+    headers = {"Idempotency-Key": "abc"}
+
+    client.post("/api/leaves/", json={"days": 2}, headers=headers)
+    response = client.post("/api/leaves/", json={"days": 3}, headers=headers)
+
+    assert response.status_code == 422
+    assert len(executions) == 1
+
+
+def test_key_reused_for_another_query_is_rejected(blocking_cache):
+    client = build_client()
+    headers = {"Idempotency-Key": "abc"}
+
+    client.post("/api/leaves/?reason=AAA", json={}, headers=headers)
+    response = client.post("/api/leaves/?reason=BBB", json={}, headers=headers)
+
+    assert response.status_code == 422
+    assert len(executions) == 1
@@ -0,0 +1,40 @@
+"""Index partiels: les requêtes fréquentes peuvent les utiliser (`manage.py check-indexes`)"""
+import pytest
+
+import manage
+from app.services.leave import LeaveService
+
+
+def test_check_indexes_passes_on_fresh_database(users, capsys):
+    assert manage.main(["check-indexes"]) == 0
+    assert "✗" not in capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    "index_name, call", [(index, call) for index, _, call in manage._index_checks()],
+    ids=[description for _, description, _ in manage._index_checks()],
+)
+def test_explain_uses_expected_index(users, index_name, call):
+    verdict, plan = manage._check_index(index_name, call)
+
+    assert verdict is not None, f"{index_name} absent du plan:\n{plan}"
+
+
+def test_pending_queue_is_filtered_by_literal_status(users):
+    statements = manage._captured_statements(lambda db: LeaveService.list_pending_leaves(db, manager_id=0))
+
+    # Un paramètre lié (status = ?) ne correspond pas au prédicat de l'index partiel
+    assert any("status = 'PENDING'" in statement for statement, _ in statements)
+
+
+def test_bound_status_cannot_use_partial_index(users):
+    def bound_status_query(db):
+        from app.models.leave_request import LeaveRequest, LeaveStatus
+
+        db.query(LeaveRequest).filter(LeaveRequest.status == LeaveStatus.PENDING).order_by(
+            LeaveRequest.created_at.desc()
+        ).all()
+
+    statements = manage._captured_statements(bound_status_query)
+
+    assert not manage._usable_on_sqlite("ix_leave_requests_pending_created_at", statements)
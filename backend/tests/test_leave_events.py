@@ -0,0 +1,89 @@
+"""Écriture par lots du journal des congés: lots refusés et file pleine"""
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.core.config import settings
+from app.services import leave_events
+from app.services.leave_events import LEAVE_EVENTS_LOST, EventWriter
+
+
+def lost(reason: str) -> float:
+    return LEAVE_EVENTS_LOST._values.get((reason,), 0)
+
+
+@pytest.fixture
+def written(monkeypatch):
+    """Faux `_insert`: refuse leave_id -1, base indisponible tant que `down` est vrai"""
+    state = SimpleNamespace(rows=[], down=False)
+
+    def fake_insert(events):
+        if state.down:
+            raise OperationalError("INSERT", {}, Exception("connection refused"))
+        if any(e["leave_id"] == -1 for e in events):
+            raise IntegrityError("INSERT", {}, Exception("constraint failed"))
+        state.rows.extend(events)
+
+    monkeypatch.setattr(leave_events, "_insert", fake_insert)
+    monkeypatch.setattr(settings, "LEAVE_EVENTS_MAX_ATTEMPTS", 2)
+    return state
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+
+def test_rejected_event_is_dropped_and_batch_written(written):
+    writer = EventWriter(batch_size=10, flush_seconds=0.05, queue_size=100)
+    before = lost("rejected")
+    writer.put([{"leave_id": 1}, {"leave_id": -1}, {"leave_id": 2}])
+    try:
+        wait_for(lambda: len(written.rows) == 2 and not writer._inflight)
+    finally:
+        writer.stop(5)
+
+    assert [e["leave_id"] for e in written.rows] == [1, 2]
+    assert lost("rejected") == before + 1
+
+
+def test_unavailable_database_keeps_the_batch(written):
+    written.down = True
+    writer = EventWriter(batch_size=10, flush_seconds=0.05, queue_size=100)
+    writer.put([{"leave_id": 1}, {"leave_id": 2}])
+    try:
+        # Au-delà de LEAVE_EVENTS_MAX_ATTEMPTS: rien n'est abandonné
+        time.sleep(1.8)
+        assert len(writer.pending(1) + writer.pending(2)) == 2
+        written.down = False
+        wait_for(lambda: len(written.rows) == 2)
+    finally:
+        writer.stop(5)
+
+
+def test_failed_overflow_write_does_not_raise(written, monkeypatch):
+    writer = EventWriter(batch_size=10, flush_seconds=0.05, queue_size=1)
+    monkeypatch.setattr(writer, "_start", lambda: None)
+    written.down = True
+    before = lost("overflow")
+
+    writer.put([{"leave_id": 1}, {"leave_id": 2}])
+
+    assert writer.pending(1) and lost("overflow") == before + 1
+
+
+def test_enqueue_after_commit_never_raises(monkeypatch):
+    class BrokenWriter:
+        def put(self, events):
+            raise RuntimeError("thread de journal indisponible")
+
+    monkeypatch.setattr(leave_events, "get_writer", lambda: BrokenWriter())
+    before = lost("enqueue")
+
+    leave_events._enqueue_committed(SimpleNamespace(info={leave_events._SESSION_KEY: [{"leave_id": 1}]}))
+
+    assert lost("enqueue") == before + 1
@@ -0,0 +1,124 @@
+"""Écritures sur les demandes: If-Match, double validation, Idempotency-Key, chronologie"""
+import uuid
+
+import pytest
+
+from app.core.cache import CacheError, LocalCache
+
+
+def leave_body(day: int = 2, comment: str = "Vacances") -> dict:
+    return {
+        "start_date": f"2031-03-{day:02d}T00:00:00",
+        "end_date": f"2031-03-{day + 2:02d}T00:00:00",
+        "leave_type": "conge_paye",
+        "comment": comment,
+    }
+
+
+@pytest.fixture
+def pending_leave(client, auth_headers):
+    response = client.post("/api/leaves/", json=leave_body(), headers=auth_headers("alice"))
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_stale_if_match_is_rejected(client, auth_headers, pending_leave):
+    url = f"/api/leaves/{pending_leave['id']}"
+    etag = client.get(url, headers=auth_headers("alice")).headers["ETag"]
+    assert etag == '"1"'
+
+    first = client.put(url, json={"comment": "Ski"}, headers={**auth_headers("alice"), "If-Match": etag})
+    stale = client.put(url, json={"comment": "Mer"}, headers={**auth_headers("alice"), "If-Match": etag})
+
+    assert first.status_code == 200 and first.headers["ETag"] == '"2"'
+    assert stale.status_code == 409
+    assert stale.headers["ETag"] == '"2"'
+    assert client.get(url, headers=auth_headers("alice")).json()["comment"] == "Ski"
+
+
+def test_second_approval_is_a_conflict(client, auth_headers, pending_leave):
+    url = f"/api/leaves/{pending_leave['id']}/approve"
+
+    first = client.post(url, headers=auth_headers("manager"))
+    second = client.post(url, headers=auth_headers("manager"))
+
+    assert first.status_code == 200 and first.json()["status"] == "approved"
+    assert second.status_code == 409
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+
+def test_repeated_idempotency_key_creates_one_leave(client, auth_headers):
+    headers = {**auth_headers("bob"), "Idempotency-Key": str(uuid.uuid4())}
+    body = leave_body(day=10, comment=f"Rejeu {uuid.uuid4()}")
+
+    first = client.post("/api/leaves/", json=body, headers=headers)
+    second = client.post("/api/leaves/", json=body, headers=headers)
+
+    assert first.status_code == second.status_code == 201
+    assert second.headers["idempotent-replayed"] == "true"
+    assert second.json()["id"] == first.json()["id"]
+    mine = client.get("/api/leaves/my-requests", headers=auth_headers("bob")).json()
+    assert [leave["comment"] for leave in mine].count(body["comment"]) == 1
+
+
+def test_idempotency_key_reused_for_another_body_is_rejected(client, auth_headers):
+    headers = {**auth_headers("bob"), "Idempotency-Key": str(uuid.uuid4())}
+
+    assert client.post("/api/leaves/", json=leave_body(day=12), headers=headers).status_code == 201
+    response = client.post("/api/leaves/", json=leave_body(day=20), headers=headers)
+
+    assert response.status_code == 422
+
+
+def test_timeline_replays_each_write(client, auth_headers, pending_leave):
+    leave_id = pending_leave["id"]
+    client.put(f"/api/leaves/{leave_id}", json={"comment": "Ski"}, headers=auth_headers("alice"))
+    client.post(f"/api/leaves/{leave_id}/approve", headers=auth_headers("manager"))
+
+    response = client.get(f"/api/leaves/{leave_id}/timeline", headers=auth_headers("alice"))
+
+    assert response.status_code == 200
+    timeline = response.json()
+    assert [(e["version"], e["event_type"], e["status"]) for e in timeline] == [
+        (1, "created", "pending"), (2, "updated", "pending"), (3, "approved", "approved"),
+    ]
+    assert timeline[0]["actor_name"] == "alice" and timeline[2]["actor_name"] == "manager"
+    assert timeline[1]["state"]["comment"] == "Ski"
+    assert timeline[2]["state"] == {**timeline[1]["state"], **timeline[2]["changes"],
+                                    "status": "approved", "version": 3}
+    assert client.get(f"/api/leaves/{leave_id}/timeline", headers=auth_headers("bob")).status_code == 403
+
+
+class BrokenCache(LocalCache):
+    """Cache partagé injoignable: chaque appel lève CacheError"""
+
+    def get(self, *args, **kwargs):
+        raise CacheError("connexion refusée")
+
+    set = update = delete = _acquire = get
+
+
+def test_writes_succeed_when_the_cache_is_down(client, auth_headers, monkeypatch):
+    from app.services import calendar, heatmap, user
+
+    for module in (user, calendar, heatmap):
+        monkeypatch.setattr(module, "get_cache", BrokenCache)
+
+    created = client.post("/api/leaves/", json=leave_body(day=16), headers=auth_headers("alice"))
+    assert created.status_code == 201, created.text
+    assert created.json()["employee_name"] == "alice"
+
+    approved = client.post(f"/api/leaves/{created.json()['id']}/approve", headers=auth_headers("manager"))
+    assert approved.status_code == 200, approved.text
+    assert approved.json()["status"] == "approved"
+
+
+def test_employee_cannot_set_status_through_update(client, auth_headers, pending_leave):
+    url = f"/api/leaves/{pending_leave['id']}"
+    headers = {**auth_headers("alice"), "If-Match": '"1"'}
+
+    response = client.put(url, json={"status": "approved"}, headers=headers)
+
+    assert response.status_code == 422
+    leave = client.get(url, headers=auth_headers("alice")).json()
+    assert leave["status"] == "pending" and leave["version"] == 1
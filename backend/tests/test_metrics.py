@@ -0,0 +1,39 @@
+"""/metrics: accès restreint et mesure des requêtes SQL en erreur"""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.core.metrics import DB_QUERY_DURATION, instrument_sqlalchemy
+
+
+def test_metrics_require_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer autre"}).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert response.status_code == 200
+    assert "http_requests_in_flight" in response.text
+
+
+def test_metrics_without_token_refuse_remote_clients(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+
+    # TestClient se présente comme l'hôte "testclient", pas comme un client local
+    assert client.get("/metrics").status_code == 403
+
+
+def test_failed_query_leaves_nothing_on_the_connection():
+    instrument_sqlalchemy()
+    engine = create_engine("sqlite://")
+    count = DB_QUERY_DURATION._values.get((), [None, 0.0, 0])[2]
+
+    with engine.connect() as connection:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM table_absente"))
+        connection.execute(text("SELECT 1"))
+
+        assert not connection.info.get("metrics_query_start")
+    assert DB_QUERY_DURATION._values[()][2] == count + 1
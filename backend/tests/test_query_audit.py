@@ -0,0 +1,19 @@
+"""Audit SQL: requêtes en erreur"""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.query_audit import audit_queries, install_query_audit
+
+
+def test_failed_query_leaves_nothing_on_the_connection():
+    install_query_audit()
+    engine = create_engine("sqlite://")
+
+    with engine.connect() as connection, audit_queries(label="test") as audit:
+        with pytest.raises(OperationalError):
+            connection.execute(text("SELECT * FROM table_absente"))
+        connection.execute(text("SELECT 1"))
+
+        assert not connection.info.get("audit_query_start")
+    assert audit.count == 1
@@ -0,0 +1,54 @@
+"""Limitation de débit: appel du cache hors boucle d'événements, en-têtes CORS des 429"""
+import threading
+
+from starlette.applications import Starlette
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core import cache as cache_module
+from app.core.cache import LocalCache
+from app.core.ratelimit import RateLimitMiddleware
+
+
+loop_threads = []
+
+
+async def items(request):
+    loop_threads.append(threading.current_thread())
+    return PlainTextResponse("ok")
+
+
+def build_app():
+    inner = Starlette(routes=[Route("/api/items", items)])
+    return CORSMiddleware(RateLimitMiddleware(inner, limits="read=2/minute"), allow_origins=["*"])
+
+
+def test_blocking_cache_is_called_off_the_event_loop(blocking_cache):
+    client = TestClient(build_app())
+
+    statuses = [client.get("/api/items").status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 429]
+    assert len(blocking_cache.threads) == 3
+    assert not set(blocking_cache.threads) & set(loop_threads)
+
+
+def test_rate_limited_response_carries_cors_headers(monkeypatch):
+    cache = LocalCache()
+    monkeypatch.setattr(cache_module, "get_cache", lambda: cache)
+    client = TestClient(build_app())
+    headers = {"Origin": "http://dashboard.example"}
+
+    responses = [client.get("/api/items", headers=headers) for _ in range(3)]
+
+    assert responses[-1].status_code == 429
+    assert responses[-1].headers["access-control-allow-origin"] == "*"
+    assert int(responses[-1].headers["retry-after"]) >= 1
+
+
+def test_cors_is_the_outermost_middleware():
+    from app.main import app
+
+    assert app.user_middleware[0].cls is CORSMiddleware
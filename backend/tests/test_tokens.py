@@ -0,0 +1,59 @@
+"""Vérification des tokens: backend par défaut et vérificateur HMAC minimal"""
+import time
+
+import pytest
+
+from app.core.config import Settings
+from app.core.tokens import CompactJWTBackend, HMACBackend, TokenBackend, TokenError, create_token_backend
+
+B64URL_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+
+
+def test_default_backend_is_hardened_hmac():
+    assert Settings.model_fields["JWT_BACKEND"].default == "hmac"
+    assert isinstance(create_token_backend("HS256", secret="secret"), HMACBackend)
+
+
+def test_hmac_and_jose_tokens_are_interchangeable():
+    hmac_backend = create_token_backend("HS256", "hmac", "secret")
+    jose_backend = create_token_backend("HS256", "jose", "secret")
+    claims = {"sub": "1", "exp": int(time.time()) + 60}
+
+    assert jose_backend.decode(hmac_backend.encode(claims)) == claims
+    assert hmac_backend.decode(jose_backend.encode(claims)) == claims
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        TokenBackend()
+    with pytest.raises(TypeError):
+        CompactJWTBackend()
+
+
+@pytest.fixture
+def hmac_backend():
+    return create_token_backend("HS256", "hmac", "secret")
+
+
+def test_hmac_rejects_non_canonical_signature(hmac_backend):
+    token = hmac_backend.encode({"sub": "1"})
+    header, payload, signature = token.split(".")
+    # 32 octets sur 43 caractères: les 2 bits de poids faible du dernier sont du remplissage
+    last = B64URL_ALPHABET.index(signature[-1])
+    twin = signature[:-1] + B64URL_ALPHABET[last ^ 1]
+
+    assert hmac_backend.decode(token)["sub"] == "1"
+    for forged in (f"{header}.{payload}.{twin}", token + "=", f"{header}.{payload}.{signature[:20]}+{signature[21:]}"):
+        with pytest.raises(TokenError):
+            hmac_backend.decode(forged)
+
+
+@pytest.mark.parametrize("claims", [
+    {"exp": time.time() - 1},
+    {"nbf": time.time() + 3600},
+    {"iat": "hier"},
+    {"exp": True},
+])
+def test_hmac_checks_registered_claims(hmac_backend, claims):
+    with pytest.raises(TokenError):
+        hmac_backend.decode(hmac_backend.encode({"sub": "1", **claims}))
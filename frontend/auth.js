@@ -0,0 +1,67 @@
+// Session partagée par les tableaux de bord: le token d'accès (30 min) est
+// renouvelé via /api/auth/refresh avec le jeton de rafraîchissement, sans
+// redemander le mot de passe.
+const AUTH_API_URL = 'http://localhost:8000';
+let pendingRefresh = null;
+
+// Un seul rafraîchissement à la fois par page: le jeton de rafraîchissement est
+// à usage unique (entre onglets, le serveur tolère un jeton tout juste remplacé)
+function refreshAccessToken() {
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (!refreshToken) {
+        return Promise.resolve(false);
+    }
+    if (!pendingRefresh) {
+        pendingRefresh = fetch(`${AUTH_API_URL}/api/auth/refresh`, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({refresh_token: refreshToken})
+        })
+            .then(async response => {
+                if (!response.ok) return false;
+                const data = await response.json();
+                localStorage.setItem('token', data.access_token);
+                localStorage.setItem('refresh_token', data.refresh_token);
+                return true;
+            })
+            .catch(() => false)
+            .finally(() => { pendingRefresh = null; });
+    }
+    return pendingRefresh;
+}
+
+// fetch avec le token courant; sur 401, rafraîchir puis réessayer une fois
+async function authFetch(url, options = {}) {
+    const withToken = () => ({
+        ...options,
+        headers: {...(options.headers || {}), 'Authorization': `Bearer ${localStorage.getItem('token')}`}
+    });
+
+    const usedToken = localStorage.getItem('token');
+    let response = await fetch(url, withToken());
+    // Un autre onglet a pu rafraîchir la session entre-temps: réessayer avec
+    // son token plutôt que présenter un jeton de rafraîchissement déjà consommé
+    if (response.status === 401
+        && (localStorage.getItem('token') !== usedToken || await refreshAccessToken())) {
+        response = await fetch(url, withToken());
+    }
+    if (response.status === 401) {
+        localStorage.clear();
+        window.location.href = '/frontend/index.html';
+    }
+    return response;
+}
+
+// Déconnexion: révoquer la session côté serveur puis oublier les jetons
+function endSession() {
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (refreshToken) {
+        fetch(`${AUTH_API_URL}/api/auth/logout`, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({refresh_token: refreshToken}),
+            keepalive: true
+        }).catch(() => {});
+    }
+    localStorage.clear();
+}